@@ -0,0 +1,62 @@
+"""
+Benchmark: Tier 3 throughput vs. batch size.
+
+Drives ClassificationBatcher + LocalAIHost against the local Ollama stand-in
+with a burst of concurrent classifications and prints one JSON line per
+batch size.
+
+Usage: python benchmarks/bench_batching.py [--files 64] [--threads 16]
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from ai.batcher import ClassificationBatcher
+from ai.local_client import LocalAIHost
+from stub_servers import OllamaStubServer
+
+
+def run(batch_size: int, files: int, threads: int, server: OllamaStubServer) -> dict:
+    client = LocalAIHost(server.chat_url, "stub-text", "stub-vision")
+    batcher = ClassificationBatcher(client, window_ms=20, max_batch_size=batch_size)
+    names = [f"unknown_file_{i}.xyz" for i in range(files)]
+
+    server.request_count = 0
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(batcher.classify, names))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "batch_size": batch_size,
+        "files": files,
+        "threads": threads,
+        "seconds": round(elapsed, 4),
+        "files_per_sec": round(files / elapsed, 1),
+        "http_requests": server.request_count,
+        "fallbacks": sum(1 for r in results if r != server.category),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--sizes", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    server = OllamaStubServer().start()
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            print(json.dumps(run(size, args.files, args.threads, server)))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Benchmark: end-to-end throughput of FileWatcher → TaskDispatcher → SentinelWorker.
+
+Writes synthetic downloads into a temporary folder watched by the real
+watcher and dispatcher, processed by a real worker process whose AI
+backends are local stand-in servers. Runs on Linux with no network.
+
+Stages (per file, milliseconds):
+  watch  - file renamed into place → dispatcher callback (includes readiness wait)
+  queue  - dispatched → worker thread starts on it
+  route  - tier decision, including any AI call
+  move   - moving the file into its category folder
+  total  - file renamed into place → file moved
+
+Usage: python benchmarks/bench_end_to_end.py [--mode LOCAL] [--scenario burst] [--files 200]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.gaming_detector import GamingDetector
+from core.sentinel_worker import SentinelWorker
+from core.task_dispatcher import TaskDispatcher
+from core.watcher import FileWatcher
+from stub_servers import GeminiStubServer, OllamaStubServer
+from synthetic_downloads import SyntheticDownloads
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (Linux reports KB)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def descendant_pids(parent: int) -> list[int]:
+    """Live descendants of `parent`, from /proc (empty where there is none)."""
+    children = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])  # comm may contain spaces
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    found, stack = [], [parent]
+    while stack:
+        for pid in children.get(stack.pop(), []):
+            found.append(pid)
+            stack.append(pid)
+    return found
+
+
+def proc_peak_rss_mb(pid: int) -> float | None:
+    """VmHWM (peak RSS) of a live process."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def proc_role(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            cmdline = f.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return "child"
+    return "resource_tracker" if "resource_tracker" in cmdline else "child"
+
+
+class ChildRssSampler:
+    """
+    Peak RSS of every child process, sampled while the benchmark runs, so
+    spares, respawned workers and helpers that exit before the end are
+    reported too, not only the worker that handled the last file.
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peaks = {}  # pid -> MB
+        self.roles = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self) -> "ChildRssSampler":
+        self._thread.start()
+        return self
+
+    def sample(self):
+        for pid in descendant_pids(os.getpid()):
+            rss = proc_peak_rss_mb(pid)
+            if rss is not None:
+                self.peaks[pid] = max(rss, self.peaks.get(pid, 0.0))
+                self.roles.setdefault(pid, proc_role(pid))
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()  # Last look before the children are stopped
+
+    def report(self, roles: dict, reported: dict) -> dict:
+        """pid -> {"role", "peak_rss_mb"}; `reported` holds what processes measured themselves."""
+        pids = sorted(set(self.peaks) | set(reported))
+        return {str(pid): {"role": roles.get(pid) or self.roles.get(pid, "child"),
+                           "peak_rss_mb": max(self.peaks.get(pid, 0.0), reported.get(pid, 0.0))}
+                for pid in pids}
+
+
+class BenchWorker(SentinelWorker):
+    """SentinelWorker that reports per-file timings over a result queue."""
+
+    def __init__(self, job_queue, config, secrets, result_queue):
+        super().__init__(job_queue, config, secrets)
+        self.bench_queue = result_queue  # not result_queue: no metrics snapshots mixed in
+        self._timings = threading.local()
+
+    def _setup_logging(self):
+        import logging
+        logging.basicConfig(level=logging.WARNING)
+        self.logger = logging.getLogger("BenchWorker")
+        self.bench_queue.put({"ready": True})
+
+    def _init_engine(self):
+        if self.workflow_engine is None:
+            super()._init_engine()
+            self._instrument(self.workflow_engine)
+
+    def _instrument(self, engine):
+        """Time the tier decision and the move without changing what they do."""
+        timings = self._timings
+
+        def timed(name, func):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    setattr(timings, name, (time.perf_counter() - start) * 1000)
+            return wrapper
+
+        route = engine.route_to_engine
+
+        def route_and_record(*args, **kwargs):
+            category, tier = route(*args, **kwargs)
+            timings.tier = tier
+            return category, tier
+
+        engine.route_to_engine = timed("route_ms", route_and_record)
+        engine._move_file = timed("move_ms", engine._move_file)
+
+    def handle_task(self, file_path: str, enqueued_at: float = None):
+        started = time.time()
+        self._timings.__dict__.clear()
+        super().handle_task(file_path, enqueued_at)
+        self.bench_queue.put(dict(
+            self._timings.__dict__, path=file_path, started=started,
+            finished=time.time(), pid=os.getpid(), rss_mb=peak_rss_mb()
+        ))
+
+
+def bench_worker_entry(job_queue, config, secrets, result_queue):
+    BenchWorker(job_queue, config, secrets, result_queue).run_worker_loop()
+
+
+class BenchDispatcher(TaskDispatcher):
+    """Records when the watcher handed each file over and when it was queued."""
+
+    def __init__(self, detector, job_queue):
+        super().__init__(detector, job_queue)
+        self.handed_over = {}
+        self.dispatched = {}
+
+    def on_file_created(self, file_path: str):
+        self.handed_over[file_path] = time.time()
+        super().on_file_created(file_path)
+        self.dispatched[file_path] = time.time()
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    if len(values) == 1:
+        values = values * 2
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": round(cuts[49], 2), "p95": round(cuts[94], 2), "p99": round(cuts[98], 2)}
+
+
+def bench_config(mode: str, downloads: str, state_dir: str, ollama: OllamaStubServer,
+                 gemini: GeminiStubServer) -> dict:
+    return {
+        "general": {"downloads_path": downloads},
+        "privacy": {"mode": mode, "sensitive_keywords": ["tax", "bank", "password"]},
+        "ai": {
+            "enabled": mode != "RULES_ONLY",
+            "local_url": ollama.chat_url,
+            "gemini_base_url": gemini.base_url,
+            "gemini_rpm": 100000,
+            "gemini_tpm": 100000000,
+            "learned_enabled": False,
+        },
+        "performance": {"background_reclassify": False},
+        "index": {"path": os.path.join(state_dir, "file_index.db")},  # not the repo's config/
+    }
+
+
+def run(args) -> dict:
+    ollama = OllamaStubServer(base_latency=args.ollama_ms / 1000, item_latency=0.005,
+                              jitter=args.jitter, error_rate=args.error_rate).start()
+    gemini = GeminiStubServer(base_latency=args.gemini_ms / 1000, jitter=args.jitter,
+                              error_rate=args.error_rate).start()
+    context = multiprocessing.get_context("spawn")  # Same start method as Windows
+    job_queue, result_queue = context.Queue(), context.Queue()
+
+    # State lives outside the watched folder, so writing it triggers no file events
+    with tempfile.TemporaryDirectory() as downloads, tempfile.TemporaryDirectory() as state_dir:
+        config = bench_config(args.mode, downloads, state_dir, ollama, gemini)
+        sampler = ChildRssSampler().start()
+        worker = context.Process(target=bench_worker_entry, daemon=True,
+                                 args=(job_queue, config, {"GEMINI_API_KEY": "bench"}, result_queue))
+        worker.start()
+        result_queue.get(timeout=60)  # Worker imports done
+
+        dispatcher = BenchDispatcher(GamingDetector(cpu_threshold=101), job_queue)
+        watcher = FileWatcher(downloads, dispatcher.on_file_created)
+        dispatcher.start()
+        watcher.start()
+
+        generator = SyntheticDownloads(seed=args.seed, size_scale=args.size_scale)
+        written = {}
+        start = time.time()
+        for i, (name, size) in enumerate(generator.generate(args.files)):
+            if args.scenario == "steady":
+                time.sleep(max(0.0, start + i / args.rate - time.time()))
+            path = SyntheticDownloads.write(downloads, name, size)
+            written[path] = time.time()
+
+        results = []
+        last_progress = time.time()
+        while len(results) < len(written) and time.time() - last_progress < args.timeout:
+            try:
+                results.append(result_queue.get(timeout=1))
+                last_progress = time.time()
+            except Exception:
+                continue
+
+        watcher.stop()
+        dispatcher.stop()
+        sampler.stop()
+        worker.terminate()
+        worker.join(timeout=5)
+    ollama.stop()
+    gemini.stop()
+
+    stages = {"watch": [], "queue": [], "route": [], "move": [], "total": []}
+    tiers = {}
+    for r in results:
+        path = r["path"]
+        stages["watch"].append((dispatcher.handed_over[path] - written[path]) * 1000)
+        stages["queue"].append((r["started"] - dispatcher.dispatched[path]) * 1000)
+        stages["route"].append(r.get("route_ms", 0.0))
+        stages["move"].append(r.get("move_ms", 0.0))
+        stages["total"].append((r["finished"] - written[path]) * 1000)
+        tiers[r.get("tier", "error")] = tiers.get(r.get("tier", "error"), 0) + 1
+
+    reported = {}
+    for r in results:
+        reported[r["pid"]] = max(r["rss_mb"], reported.get(r["pid"], 0.0))
+
+    elapsed = max((r["finished"] for r in results), default=start) - start
+    return {
+        "mode": args.mode,
+        "scenario": args.scenario,
+        "files": len(written),
+        "processed": len(results),
+        "files_per_sec": round(len(results) / elapsed, 1) if elapsed > 0 else None,
+        "stages_ms": {name: percentiles(values) for name, values in stages.items()},
+        "tiers": tiers,
+        "peak_rss_mb": {
+            "master": peak_rss_mb(),
+            "children": sampler.report({worker.pid: "worker"}, reported),
+        },
+        "stub_errors": {"ollama": ollama.error_count, "gemini": gemini.error_count},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", default="LOCAL", choices=["RULES_ONLY", "LOCAL", "CLOUD", "CASCADE"])
+    parser.add_argument("--scenario", default="burst", choices=["burst", "steady"])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=20.0, help="files/sec for the steady scenario")
+    parser.add_argument("--ollama-ms", type=float, default=40.0)
+    parser.add_argument("--gemini-ms", type=float, default=300.0)
+    parser.add_argument("--jitter", type=float, default=0.3, help="log-normal sigma of stub latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--size-scale", type=float, default=0.01, help="shrink synthetic file sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="give up after this long without progress")
+    args = parser.parse_args()
+    print(json.dumps(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: file index write cost and query latency at 1M rows.
+
+  record_us     cost of FileIndex.record() on the calling (task) thread,
+                p50/p99 over every call
+  write_rows_s  rows per second the writer thread commits (batched
+                transactions, FTS trigger and rollup upserts included)
+  queries       median latency over --repeat runs of the IndexReader
+                calls find.py makes, against the full database
+
+Rows are synthetic decisions spread over the last year (destinations do
+not exist, so no stat or hash cost: see index.hash for that). A second
+phase records --live-files real files with hash "sample" to show the
+per-file writer cost including stat + hash.
+
+Usage: python benchmarks/bench_file_index.py [--rows 1000000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.file_index import FileIndex, IndexReader  # noqa: E402
+
+CATEGORIES = ["Documents", "Images", "Videos", "Audio", "Archives", "Installers", "Code", "Financial"]
+TIERS = ["Tier1_Rules", "Tier1_Rules", "Tier1_Rules", "Tier2_Learned", "Tier3_Cloud_Content"]
+WORDS = ["report", "photo", "scan", "setup", "backup", "notes", "draft", "final", "export", "meeting",
+         "holiday", "budget", "contract", "slides", "track", "clip", "release", "screenshot"]
+EXTENSIONS = {"Documents": ".pdf", "Images": ".jpg", "Videos": ".mp4", "Audio": ".mp3", "Archives": ".zip",
+              "Installers": ".exe", "Code": ".py", "Financial": ".pdf"}
+
+
+def synthetic_names(rows: int, rng: random.Random):
+    for i in range(rows):
+        category = rng.choice(CATEGORIES)
+        # One rare word every ~50k rows: the "where did that one file go" case
+        word = "invoice" if i % 50_000 == 0 else rng.choice(WORDS)
+        name = f"{word}_{rng.randrange(10_000):04d}{EXTENSIONS[category]}"
+        yield name, category, rng.choice(TIERS)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2), len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--live-files", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "file_index.db")
+        index = FileIndex(db, hash_mode="off", batch_size=500)
+        now = time.time()
+        year = 365 * 86400
+        costs = []
+        start = time.perf_counter()
+        for i, (name, category, tier) in enumerate(synthetic_names(args.rows, rng)):
+            decided_at = now - year + year * i / args.rows  # Appended in time order, like the worker
+            src = f"/home/user/Downloads/{name}"
+            dest = f"/home/user/Downloads/{category}/{name}"
+            t0 = time.perf_counter()
+            index.record(src, dest, category, tier, decided_at)
+            costs.append(time.perf_counter() - t0)
+        enqueued = time.perf_counter() - start
+        index.close(timeout=3600)
+        written = time.perf_counter() - start
+
+        result = {
+            "rows": args.rows,
+            "record_us_p50": round(percentile(costs, 0.5) * 1e6, 2),
+            "record_us_p99": round(percentile(costs, 0.99) * 1e6, 2),
+            "enqueue_s": round(enqueued, 1),
+            "write_rows_s": round(args.rows / written),
+            "db_mb": round(sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 2 ** 20, 1),
+        }
+
+        reader = IndexReader(db)
+        yesterday = now - 86400
+        queries = {
+            "rare_word": lambda: reader.search("invoice"),
+            "common_word": lambda: reader.search("report"),
+            "prefix_two_words": lambda: reader.search("scre 12"),
+            "word_since_1d": lambda: reader.search("report", since=yesterday),
+            "category_newest": lambda: reader.search(category="Financial"),
+            "word_and_category": lambda: reader.search("budget", category="Installers", limit=50),
+            "since_30d_no_words": lambda: reader.search(since=now - 30 * 86400, limit=100),
+            "daily_rollup_30d": lambda: reader.daily(30),
+        }
+        result["queries_ms"] = {}
+        for label, query in queries.items():
+            median_ms, count = timed(query, args.repeat)
+            result["queries_ms"][label] = {"median_ms": median_ms, "results": count}
+        reader.close()
+
+        # Real files: writer-side stat + sample hash per decision
+        live_dir = os.path.join(tmp, "live")
+        os.makedirs(live_dir)
+        paths = []
+        for i in range(args.live_files):
+            path = os.path.join(live_dir, f"file{i}.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(256 * 1024))
+            paths.append(path)
+        index = FileIndex(db, hash_mode="sample")
+        start = time.perf_counter()
+        for path in paths:
+            index.record(path, path, "Other", "Tier1_Fallback")
+        index.close(timeout=600)
+        result["live_sample_hash_rows_s"] = round(args.live_files / (time.perf_counter() - start))
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
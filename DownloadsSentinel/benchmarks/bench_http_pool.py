@@ -0,0 +1,62 @@
+"""
+Benchmark: per-call HTTP overhead of LocalAIHost.
+
+Compares bare requests.post (a new TCP connection per call, as before)
+with the pooled keep-alive session, against a zero-latency Ollama stand-in.
+
+Usage: python benchmarks/bench_http_pool.py [--calls 500]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from ai.local_client import LocalAIHost
+from stub_servers import OllamaStubServer
+
+
+def _payload() -> dict:
+    return {
+        "model": "stub-text",
+        "messages": [{"role": "user", "content": "Filename: a.xyz\nCategory:"}],
+        "stream": False,
+    }
+
+
+def per_call_us(post, url: str, calls: int) -> float:
+    post(url, json=_payload(), timeout=30)  # warm-up
+    start = time.perf_counter()
+    for _ in range(calls):
+        post(url, json=_payload(), timeout=30).json()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    server = OllamaStubServer(base_latency=0, item_latency=0).start()
+    client = LocalAIHost(server.chat_url, "stub-text", "stub-vision")
+    try:
+        before = per_call_us(requests.post, server.chat_url, args.calls)
+        after = per_call_us(client.session.post, client.chat_url, args.calls)
+    finally:
+        client.close()
+        server.stop()
+
+    print(json.dumps({
+        "calls": args.calls,
+        "bare_post_us": round(before, 1),
+        "pooled_session_us": round(after, 1),
+        "saved_us": round(before - after, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
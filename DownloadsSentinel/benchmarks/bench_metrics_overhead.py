@@ -0,0 +1,53 @@
+"""
+Benchmark: cost of one metrics observation.
+
+Measures Histogram.observe, Histogram.observe_since (including the
+perf_counter call) and Counter.inc, per call, in nanoseconds.
+
+Usage: python benchmarks/bench_metrics_overhead.py [--calls 1000000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.metrics import MetricsRegistry
+
+
+def per_call_ns(func, args: list, calls: int) -> float:
+    start = time.perf_counter()
+    for value in args:
+        func(value)
+    elapsed = time.perf_counter() - start
+    # Subtract the bare loop so only the observation is counted
+    start = time.perf_counter()
+    for value in args:
+        pass
+    loop = time.perf_counter() - start
+    return round((elapsed - loop) / calls * 1e9, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    histogram = registry.stage("bench")
+    counter = registry.counter("bench_total")
+    values = [random.lognormvariate(2, 2) for _ in range(args.calls)]
+    starts = [time.perf_counter()] * args.calls
+
+    print(json.dumps({
+        "observe_ns": per_call_ns(histogram.observe, values, args.calls),
+        "observe_since_ns": per_call_ns(histogram.observe_since, starts, args.calls),
+        "counter_inc_ns": per_call_ns(lambda _: counter.inc(), values, args.calls),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: CPU cost of one polling pass over a large downloads folder.
+
+Fills a temporary folder with N files (default 10,000) and measures the
+PollingBackend's snapshot + diff, per poll, in CPU and wall milliseconds:
+  idle    - nothing changed since the previous poll
+  changed - a handful of files renamed from .part to their final names
+Also reports the baseline listing cost of os.listdir for comparison.
+
+Usage: python benchmarks/bench_polling.py [--entries 10000] [--polls 20]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.watch_backends import PollingBackend
+
+
+class CountingHandler:
+    def __init__(self):
+        self.events = 0
+
+    def dispatch(self, event):
+        self.events += 1
+
+
+def measure(func, polls: int) -> dict:
+    cpu, wall = [], []
+    for _ in range(polls):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        func()
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+    return {"cpu_ms": round(statistics.median(cpu), 2), "wall_ms": round(statistics.median(wall), 2)}
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as folder:
+        for i in range(args.entries):
+            with open(os.path.join(folder, f"file_{i:06d}.bin"), "wb") as f:
+                f.write(b"x")
+
+        handler = CountingHandler()
+        backend = PollingBackend(folder, handler)
+        backend.poll()  # Baseline snapshot
+
+        idle = measure(backend.poll, args.polls)
+
+        counter = iter(range(10**9))
+
+        def changed_poll():
+            # Includes writing and renaming the files (microseconds each)
+            for _ in range(args.changes):
+                name = os.path.join(folder, f"dl_{next(counter)}.zip")
+                with open(name + ".part", "wb") as f:
+                    f.write(b"x")
+                backend.poll()
+                os.rename(name + ".part", name)
+            backend.poll()
+
+        changed = measure(changed_poll, args.polls)
+        listdir = measure(lambda: os.listdir(folder), args.polls)
+
+    return {
+        "entries": args.entries,
+        "polls": args.polls,
+        "idle_poll": idle,
+        f"poll_with_{args.changes}_renames": {k: round(v / (args.changes + 1), 2) for k, v in changed.items()},
+        "os_listdir": listdir,
+        "events_dispatched": handler.events,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--changes", type=int, default=5, help="renames per changed poll")
+    args = parser.parse_args()
+    print(json.dumps(run(args)))
+
+
+if __name__ == "__main__":
+    main()
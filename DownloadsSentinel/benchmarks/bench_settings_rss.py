@@ -0,0 +1,93 @@
+"""
+Benchmark: master RSS across settings window open/close cycles.
+
+  in_process       - the old way: the window (customtkinter/Tk) runs on a
+                     thread inside the master, which keeps the toolkit
+  separate_process - SettingsLauncher: a spawned child owns the window
+
+Each mode runs in a fresh interpreter that first imports the master's
+modules, then opens and closes the window `--cycles` times, reporting
+the master's RSS before and after every cycle. Windows close after
+`--open-seconds` (the launcher's child is terminated, as if closed).
+
+Without a display Tk cannot create the window; the cycle still pays for
+importing the toolkit and the failed Tk() call, and `window` says so.
+
+Usage: python benchmarks/bench_settings_rss.py [--cycles 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+CHILD = r'''
+import json, os, shutil, sys, tempfile, threading, time
+import psutil
+import main  # The master's own imports
+from ui.settings_launcher import SettingsLauncher
+
+mode, cycles, open_seconds = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+tmp = tempfile.mkdtemp()
+config_path = os.path.join(tmp, "config.json")
+shutil.copy(os.path.join(os.path.dirname(os.path.abspath(main.__file__)), "..", "config", "config.json"),
+            config_path)
+rss = lambda: round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+window = {"status": "opened"}
+
+def in_process_cycle():
+    def run():
+        try:
+            from ui.settings import SettingsWindow
+            app = SettingsWindow(config_path)
+            app.after(int(open_seconds * 1000), app.on_close)
+            app.mainloop()
+        except Exception as e:
+            window["status"] = f"{type(e).__name__}: {e}"
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join()
+
+def separate_process_cycle():
+    closed = threading.Event()
+    launcher = SettingsLauncher(config_path, on_closed=closed.set)
+    launcher.open()
+    if not closed.wait(open_seconds):
+        launcher.process.terminate()
+        closed.wait(10)
+    elif launcher.process.exitcode:
+        window["status"] = f"child exited with code {launcher.process.exitcode}"
+
+if __name__ == "__main__":
+    samples = [rss()]
+    for _ in range(cycles):
+        (in_process_cycle if mode == "in_process" else separate_process_cycle)()
+        time.sleep(0.5)
+        samples.append(rss())
+    shutil.rmtree(tmp)
+    print(json.dumps({"rss_mb": samples, "growth_mb": round(samples[-1] - samples[0], 1),
+                      "window": window["status"]}))
+'''
+
+
+def run_mode(mode: str, cycles: int, open_seconds: float) -> dict:
+    result = subprocess.run([sys.executable, "-c", CHILD, mode, str(cycles), str(open_seconds)],
+                            cwd=SRC_DIR, capture_output=True, text=True, timeout=300)
+    if result.returncode:
+        return {"error": result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--open-seconds", type=float, default=1.5)
+    args = parser.parse_args()
+    print(json.dumps({mode: run_mode(mode, args.cycles, args.open_seconds)
+                      for mode in ("in_process", "separate_process")}))
+
+
+if __name__ == "__main__":
+    main()
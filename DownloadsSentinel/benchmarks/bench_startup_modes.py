@@ -0,0 +1,156 @@
+"""
+Benchmark: headless daemon vs tray (GUI) mode startup and footprint.
+
+Runs `src/main.py` as a real subprocess against a throwaway config and
+downloads folder (RULES_ONLY, persistent worker) and measures:
+  ready_ms       - process start → "Sentinel Active" logged/printed
+  master_rss_mb  - master resident memory once settled (worker excluded)
+  worker_rss_mb  - worker resident memory at the same moment
+  drain_exit_ms  - SIGTERM → process exited (headless), with `--files`
+                   dropped just before the signal
+  organized      - how many of those files were filed before exit
+
+GUI mode needs a display for pystray; without one the run reports the
+error, and `gui_import` falls back to the cost of importing the GUI
+stack (pystray, PIL, customtkinter) on top of the master's modules.
+GUI mode logs to the project's logs/ folder like a normal run.
+
+Usage: python benchmarks/bench_startup_modes.py [--rounds 3] [--files 20]
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MAIN = os.path.join(ROOT_DIR, 'src', 'main.py')
+READY_MARKERS = ("Sentinel Active",)
+ERROR_LINE = re.compile(r"^[\w.]+(?:Error|Exception): .*$", re.MULTILINE)
+
+
+def bench_config(downloads: str) -> dict:
+    with open(os.path.join(ROOT_DIR, 'config', 'config.json')) as f:
+        config = json.load(f)
+    config["general"].update(downloads_path=downloads, setup_complete=True)
+    config["privacy"]["mode"] = "RULES_ONLY"
+    config["worker"] = {"lifecycle": "persistent"}
+    config["metrics"] = {"port": None, "snapshot_interval_seconds": 0}
+    return config
+
+
+def rss_mb(pid: int) -> float:
+    return round(psutil.Process(pid).memory_info().rss / 1024 / 1024, 1)
+
+
+def run_once(headless: bool, files: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        downloads = os.path.join(tmp, "downloads")
+        os.mkdir(downloads)
+        config_path = os.path.join(tmp, "config.json")
+        with open(config_path, "w") as f:
+            json.dump(bench_config(downloads), f)
+        out_path = os.path.join(tmp, "out.txt")
+
+        args = [sys.executable, "-u", MAIN, "--config", config_path]
+        if headless:
+            args.append("--headless")
+        start = time.perf_counter()
+        with open(out_path, "w") as out:
+            process = subprocess.Popen(args, stdout=out, stderr=subprocess.STDOUT)
+
+        def output():
+            with open(out_path, encoding="utf-8", errors="replace") as f:
+                return f.read()
+
+        ready_ms = None
+        while time.perf_counter() - start < 30 and process.poll() is None:
+            text = output()
+            if any(marker in text for marker in READY_MARKERS):
+                ready_ms = (time.perf_counter() - start) * 1000
+                break
+            if "Traceback" in text:
+                time.sleep(0.5)  # Let the exception line follow
+                break
+            time.sleep(0.005)
+        if ready_ms is None:
+            process.kill()
+            process.wait()
+            errors = ERROR_LINE.findall(output())
+            return {"error": errors[0] if errors else f"exit code {process.returncode}"}
+
+        time.sleep(2)  # Settle: startup scan done, worker idle
+        master = psutil.Process(process.pid)
+        workers = master.children()
+        result = {
+            "ready_ms": round(ready_ms, 1),
+            "master_rss_mb": rss_mb(process.pid),
+            "worker_rss_mb": round(sum(rss_mb(child.pid) for child in workers), 1),
+        }
+
+        for i in range(files):
+            with open(os.path.join(downloads, f"report_{i}.pdf"), "w") as f:
+                f.write("x")
+        time.sleep(0.5)  # Let the watcher queue them
+        stop = time.perf_counter()
+        process.send_signal(signal.SIGTERM if headless else signal.SIGINT)
+        try:
+            process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        result["drain_exit_ms"] = round((time.perf_counter() - stop) * 1000, 1)
+        documents = os.path.join(downloads, "Documents")
+        result["organized"] = len(os.listdir(documents)) if os.path.isdir(documents) else 0
+        result["exit_code"] = process.returncode
+        return result
+
+
+def gui_import_cost() -> dict:
+    """What tray mode adds to the master: import time and RSS of the GUI stack."""
+    code = ("import time, psutil; t = time.perf_counter(); import main; base = time.perf_counter() - t; "
+            "rss = psutil.Process().memory_info().rss; import PIL.Image, customtkinter\n"
+            "try:\n    import pystray; tray = True\nexcept Exception: tray = False\n"
+            "print(base, time.perf_counter() - t, rss, psutil.Process().memory_info().rss, tray)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.join(ROOT_DIR, 'src'),
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode:
+        return {"error": result.stderr.strip().splitlines()[-1]}
+    base, total, base_rss, gui_rss, tray = result.stdout.split()
+    return {
+        "master_import_ms": round(float(base) * 1000, 1),
+        "with_gui_import_ms": round(float(total) * 1000, 1),
+        "master_rss_mb": round(int(base_rss) / 1024 / 1024, 1),
+        "with_gui_rss_mb": round(int(gui_rss) / 1024 / 1024, 1),
+        "pystray_loaded": tray == "True",
+    }
+
+
+def summarize(runs: list[dict]) -> dict:
+    ok = [run for run in runs if "error" not in run]
+    if not ok:
+        return runs[0]
+    return {key: round(statistics.median(run[key] for run in ok), 1) for key in ok[0]} | {"rounds": len(ok)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps({
+        "headless": summarize([run_once(True, args.files) for _ in range(args.rounds)]),
+        "gui": summarize([run_once(False, args.files) for _ in range(1)]),
+        "gui_import": gui_import_cost(),
+    }))
+
+
+if __name__ == "__main__":
+    main()
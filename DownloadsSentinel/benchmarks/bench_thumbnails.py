@@ -0,0 +1,80 @@
+"""
+Benchmark: vision upload size and preparation latency per image.
+
+"Before" is the old path (read the whole file, base64-encode it).
+"After" is prepare_image() followed by base64. Without --corpus a
+synthetic set of camera-sized photos and PNG screenshots is generated.
+
+Usage: python benchmarks/bench_thumbnails.py [--corpus DIR] [--max-side 768]
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PIL import Image, ImageDraw
+
+from ai.image_prep import prepare_image
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
+
+
+def make_corpus(directory: str, count: int = 4):
+    """Camera-like 4000x3000 JPEGs and 1920x1080 PNG screenshots."""
+    rng = random.Random(0)
+    for i in range(count):
+        photo = Image.effect_noise((4000, 3000), 64).convert("RGB")
+        photo.save(os.path.join(directory, f"IMG_{i:04d}.jpg"), quality=92)
+
+        shot = Image.new("RGB", (1920, 1080), (240, 240, 240))
+        draw = ImageDraw.Draw(shot)
+        for _ in range(200):
+            x, y = rng.randrange(1900), rng.randrange(1060)
+            draw.rectangle((x, y, x + rng.randrange(20, 300), y + 14), fill=(rng.randrange(256), 40, 90))
+        shot.save(os.path.join(directory, f"Screenshot {i}.png"))
+
+
+def measure(path: str, max_side: int) -> dict:
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        before = base64.b64encode(f.read())
+    before_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    data, _ = prepare_image(path, max_side)
+    after = base64.b64encode(data)
+    after_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "file": os.path.basename(path),
+        "before_bytes": len(before),
+        "after_bytes": len(after),
+        "before_ms": round(before_ms, 2),
+        "after_ms": round(after_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus")
+    parser.add_argument("--max-side", type=int, default=768)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if not corpus:
+            make_corpus(tmp)
+            corpus = tmp
+        for name in sorted(os.listdir(corpus)):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                print(json.dumps(measure(os.path.join(corpus, name), args.max_side)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: time-to-category for single-file local classification.
+
+Compares the old request shape (stream: False, no generation limits)
+with LocalAIHost.classify_text_qwen (limits, stop sequence, streaming with
+early stop) against a chatty Ollama stand-in.
+
+Usage: python benchmarks/bench_time_to_category.py [--calls 20] [--token-ms 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from ai.local_client import LocalAIHost
+from stub_servers import OllamaStubServer
+
+
+def unbounded_classify(client: LocalAIHost, filename: str) -> str:
+    """The pre-change request: wait for the full, unbounded completion."""
+    response = client.session.post(
+        client.chat_url,
+        json={
+            "model": client.text_model,
+            "messages": [{"role": "user", "content": f"Filename: {filename}\nCategory:"}],
+            "stream": False
+        },
+        timeout=60
+    )
+    return response.json()["message"]["content"].strip()
+
+
+def measure(func, calls: int) -> dict:
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        func(f"unknown_file_{i}.xyz")
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": round(statistics.median(timings), 1), "max_ms": round(max(timings), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--token-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = OllamaStubServer(base_latency=0.02, item_latency=0,
+                              token_latency=args.token_ms / 1000, chatty=True).start()
+    client = LocalAIHost(server.chat_url, "stub-text", "stub-vision")
+    try:
+        before = measure(lambda name: unbounded_classify(client, name), args.calls)
+        after = measure(client.classify_text_qwen, args.calls)
+    finally:
+        client.close()
+        server.stop()
+
+    print(json.dumps({"calls": args.calls, "unbounded": before, "constrained_streaming": after}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: worker spawn latency, cold process vs prewarmed spare.
+
+Drives a real WorkerSupervisor (spawn start method, as on Windows) in the
+on_demand lifecycle. Each round drops one file with an unknown extension
+(so the first task goes through the engine and the local AI client) and
+measures:
+  ready_ms       - spawn (or spare activation) → worker loop running
+  first_file_ms  - task queued → file moved into its category folder
+  idle_rss_mb    - resident memory of what stays up between bursts
+                   (nothing for cold, the spare for prewarmed)
+
+Usage: python benchmarks/bench_worker_spawn.py [--rounds 5]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import psutil
+
+from core.log_pipeline import start_listener
+from core.worker_supervisor import WorkerSupervisor
+from stub_servers import OllamaStubServer
+
+
+def bench_config(downloads: str, state_dir: str, ollama: OllamaStubServer, prewarm: bool) -> dict:
+    return {
+        "general": {"downloads_path": downloads},
+        "privacy": {"mode": "LOCAL", "sensitive_keywords": []},
+        "ai": {"enabled": True, "local_url": ollama.chat_url, "learned_enabled": False,
+               "batch_max_size": 1},
+        "performance": {"background_reclassify": False},
+        "worker": {"lifecycle": "on_demand", "idle_exit_seconds": 0.5, "prewarm_spare": prewarm},
+        "logging": {"level": "WARNING"},
+        "index": {"path": os.path.join(state_dir, "file_index.db")},  # not the repo's config/
+    }
+
+
+def wait_for(predicate, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def pump(supervisor: WorkerSupervisor, result_queue, ready: dict):
+    """Forward worker messages to the supervisor, as the master's result loop does."""
+    while True:
+        try:
+            kind, pid, payload = result_queue.get_nowait()
+        except queue.Empty:
+            return
+        if kind == "ready":
+            ready[pid] = (payload - supervisor._spawned_at.get(pid, payload)) * 1000
+        supervisor.handle_message(kind, pid, payload)
+
+
+def rss_mb(process) -> float | None:
+    if process is None or not process.is_alive():
+        return None
+    return round(psutil.Process(process.pid).memory_info().rss / 1024 / 1024, 1)
+
+
+def run_mode(prewarm: bool, rounds: int, ollama: OllamaStubServer) -> dict:
+    context = multiprocessing.get_context("spawn")
+    result_queue, log_queue = context.Queue(), context.Queue()
+    ready_ms, first_file_ms, idle_rss = [], [], []
+    with tempfile.TemporaryDirectory() as downloads, tempfile.TemporaryDirectory() as log_dir:
+        config = bench_config(downloads, log_dir, ollama, prewarm)
+        # Worker logs go to a throwaway file, not logs/worker.log
+        listener = start_listener(log_queue, log_dir, 'bench.log', config)
+        supervisor = WorkerSupervisor(config, {}, result_queue, log_queue, context=context)
+        supervisor.start()
+        if prewarm:
+            time.sleep(3)  # Let the spare finish its imports
+
+        for i in range(rounds):
+            idle_rss.append(rss_mb(supervisor._spare[0]) if supervisor._spare else 0.0)
+            path = os.path.join(downloads, f"download_{i}.xyz")
+            with open(path, "w") as f:
+                f.write("x")
+            ready = {}
+            start = time.time()
+            supervisor.put((path, start))
+            moved = wait_for(lambda: not os.path.exists(path) or pump(supervisor, result_queue, ready))
+            first_file_ms.append((time.time() - start) * 1000 if moved else None)
+            wait_for(lambda: pump(supervisor, result_queue, ready) or ready)
+            ready_ms.extend(ready.values())
+
+            # Let the worker retire and exit (and the next spare warm up)
+            wait_for(lambda: pump(supervisor, result_queue, ready) or (
+                supervisor.process is None and not supervisor._retiring
+                and (not prewarm or supervisor._spare is not None)))
+            if prewarm:
+                time.sleep(3)
+        supervisor.stop()
+        listener.stop()
+
+    def median(values):
+        values = [v for v in values if v is not None]
+        return round(statistics.median(values), 1) if values else None
+
+    return {"ready_ms": median(ready_ms), "first_file_ms": median(first_file_ms),
+            "idle_rss_mb": median(idle_rss), "rounds": rounds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    ollama = OllamaStubServer(base_latency=0.02).start()
+    try:
+        print(json.dumps({
+            "cold": run_mode(False, args.rounds, ollama),
+            "prewarmed_spare": run_mode(True, args.rounds, ollama),
+        }))
+    finally:
+        ollama.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Offline evaluation: LOCAL vs CLOUD vs CASCADE on a labelled filename corpus.
+
+Every row that reaches Tier 3 is classified once by the local model (with
+confidence) and once by Gemini; each mode and cascade threshold is then
+scored from those answers, so a threshold sweep costs no extra calls.
+Uses the real backends from config/config.json and config/secrets.json.
+
+Corpus: CSV with a header and columns `path,label`. `path` may be a bare
+filename or a real file (content analysis is used where the cloud client can).
+
+Usage: python benchmarks/evaluate_cascade.py corpus.csv [--thresholds 0.5,0.7,0.9] [--limit 200]
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from ai.resilience import AIUnavailableError
+from ai.workflow_engine import WorkflowEngine
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config')
+
+
+def load_json(name: str) -> dict:
+    path = os.path.join(CONFIG_DIR, name)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def collect(engine: WorkflowEngine, rows: list[dict]) -> list[dict]:
+    """Run the cheap tiers, then both AI backends, once per corpus row."""
+    samples = []
+    for row in rows:
+        path = row["path"]
+        filename = os.path.basename(path)
+        sample = {"label": row["label"], "early": None}
+        if engine.privacy_filter.is_sensitive(filename):
+            sample["early"] = engine.privacy_filter.get_secure_destination()
+        else:
+            sample["early"] = engine.rule_engine.classify(filename)
+        if sample["early"] is None:
+            (sample["local"], sample["confidence"]), sample["local_ms"] = timed(
+                engine.local_client.classify_with_confidence, filename)
+            try:
+                (sample["cloud"], _), sample["cloud_ms"] = timed(
+                    engine._classify_cloud, path, filename, None)
+            except AIUnavailableError:
+                sample["cloud"], sample["cloud_ms"] = None, None
+        samples.append(sample)
+    return samples
+
+
+def score(samples: list[dict], mode: str, threshold: float = None) -> dict:
+    correct, latencies, cloud_calls, tiers = 0, [], 0, {}
+    for s in samples:
+        if s["early"] is not None:
+            answer, tier, ms = s["early"], "Tier0/1", 0.0
+        elif mode == "LOCAL" or (mode == "CASCADE" and s["confidence"] >= threshold):
+            answer, tier, ms = s["local"], "Tier3_Local", s["local_ms"]
+        elif s["cloud"] is None:
+            answer, tier, ms = s["local"], "Tier3_Local", s["local_ms"]
+        else:
+            cloud_calls += 1
+            answer, tier = s["cloud"], "Tier3_Cloud"
+            ms = s["cloud_ms"] + (s["local_ms"] if mode == "CASCADE" else 0)
+        correct += answer == s["label"]
+        latencies.append(ms)
+        tiers[tier] = tiers.get(tier, 0) + 1
+    result = {
+        "mode": mode,
+        "accuracy": round(correct / len(samples), 3),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "cloud_calls": cloud_calls,
+        "tiers": tiers,
+    }
+    if threshold is not None:
+        result["threshold"] = threshold
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("corpus")
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.8,0.9")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.corpus, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))[:args.limit]
+
+    engine = WorkflowEngine(load_json("config.json"), load_json("secrets.json"))
+    if not engine.local_client or not engine.gemini_client:
+        sys.exit("Both the local model and a Gemini API key are needed for this evaluation")
+
+    samples = collect(engine, rows)
+    print(json.dumps(score(samples, "LOCAL")))
+    print(json.dumps(score(samples, "CLOUD")))
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        print(json.dumps(score(samples, "CASCADE", threshold)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Local stand-in AI servers for benchmarks.
+
+OllamaStubServer speaks enough of the Ollama API (/api/chat,
+/v1/chat/completions and /api/generate) for LocalAIHost, and records
+the keep_alive of every native request; GeminiStubServer speaks enough of the
+Gemini REST API (models/*:generateContent) for GeminiClient.
+
+Latency is simulated as a fixed per-request cost plus a per-item cost,
+mimicking prompt processing, optionally with log-normal jitter and a
+rate of injected 503 errors. Ollama requests are serialized like its
+default OLLAMA_NUM_PARALLEL=1.
+A "chatty" server keeps generating after the category, one token per
+token_latency, unless max_tokens or a stop sequence cuts it short.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive capable
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # Silence per-request logging
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_injected_error(self) -> bool:
+        """Fail this request with a 503 at the server's error_rate."""
+        if random.random() >= self.server.error_rate:
+            return False
+        self.server.error_count += 1
+        self._send_json({"error": {"code": 503, "message": "injected failure",
+                                   "status": "UNAVAILABLE"}}, status=503)
+        return True
+
+
+class _StubServer(ThreadingHTTPServer):
+    """Shared latency/error model, run in a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, handler, port: int = 0, base_latency: float = 0.04,
+                 item_latency: float = 0.005, category: str = "Documents",
+                 parallel: int = 1, jitter: float = 0.0, error_rate: float = 0.0):
+        super().__init__(("127.0.0.1", port), handler)
+        self.base_latency = base_latency
+        self.item_latency = item_latency
+        self.category = category
+        self.jitter = jitter          # sigma of a log-normal multiplier; 0 = fixed latency
+        self.error_rate = error_rate  # fraction of requests answered with 503
+        self.request_count = 0
+        self.error_count = 0
+        self._slots = threading.Semaphore(parallel)
+        self._thread = None
+
+    def infer(self, items: int):
+        """Simulate model time for a prompt covering `items` filenames."""
+        latency = self.base_latency + self.item_latency * items
+        if self.jitter:
+            latency *= random.lognormvariate(0, self.jitter)
+        with self._slots:
+            time.sleep(latency)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _OllamaHandler(_StubHandler):
+
+    def _stream_tokens(self, tokens: list[str]):
+        """Send tokens as OpenAI-style server-sent events, one per token_latency."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for token in tokens:
+                time.sleep(self.server.token_latency)
+                chunk = {"choices": [{"delta": {"content": token}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client stopped reading early
+
+    def _stream_native(self, tokens: list[str]):
+        """Send tokens as /api/chat JSON lines, one per token_latency."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for token in tokens:
+                time.sleep(self.server.token_latency)
+                chunk = {"message": {"role": "assistant", "content": token}, "done": False}
+                self.wfile.write((json.dumps(chunk) + "\n").encode("utf-8"))
+            self.wfile.write((json.dumps({"message": {"role": "assistant", "content": ""},
+                                          "done": True}) + "\n").encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _answer(self, prompt: str, max_tokens: int | None, stop: list[str] | None,
+                stream: bool, send_stream) -> str | None:
+        """Content for a chat prompt; None once a streamed answer was sent."""
+        server = self.server
+        match = re.search(r"Filenames: (\[.*\])", prompt)
+        if match:
+            names = json.loads(match.group(1))
+            server.infer(len(names))
+            # Pretty-printed, as models often do; a newline stop sequence truncates it
+            content = json.dumps([server.category] * len(names), indent=2)
+            for s in stop or []:
+                content = content.split(s)[0]
+            return content
+        server.infer(1)
+        tokens = server.answer_tokens(max_tokens, stop)
+        if stream:
+            send_stream(tokens)
+            return None
+        for _ in tokens:
+            time.sleep(server.token_latency)
+        return "".join(tokens)
+
+    def do_POST(self):
+        server = self.server
+        request = self._read_json()
+        server.request_count += 1
+        if self._send_injected_error():
+            return
+
+        if "keep_alive" in request:
+            server.keep_alive_seen.append((self.path, request.get("model"), request["keep_alive"]))
+
+        if self.path == "/api/chat":
+            options = request.get("options", {})
+            content = self._answer(request["messages"][-1]["content"], options.get("num_predict"),
+                                   options.get("stop"), request.get("stream", True), self._stream_native)
+            if content is not None:
+                self._send_json({"model": request.get("model"), "done": True,
+                                 "message": {"role": "assistant", "content": content}})
+        elif self.path == "/v1/chat/completions":
+            content = self._answer(request["messages"][-1]["content"], request.get("max_tokens"),
+                                   request.get("stop"), request.get("stream"), self._stream_tokens)
+            if content is not None:
+                self._send_json({"choices": [{"message": {"role": "assistant", "content": content}}]})
+        elif self.path == "/api/generate":
+            if request.get("prompt"):
+                server.infer(1)
+            self._send_json({"model": request.get("model"), "response": server.category, "done": True})
+        else:
+            self.send_error(404)
+
+
+class OllamaStubServer(_StubServer):
+    """Ollama-compatible stand-in, run in a background thread."""
+
+    def __init__(self, port: int = 0, base_latency: float = 0.04,
+                 item_latency: float = 0.005, category: str = "Documents",
+                 parallel: int = 1, token_latency: float = 0.0, chatty: bool = False,
+                 jitter: float = 0.0, error_rate: float = 0.0):
+        super().__init__(_OllamaHandler, port, base_latency, item_latency, category,
+                         parallel, jitter, error_rate)
+        self.token_latency = token_latency
+        self.chatty = chatty
+        self.keep_alive_seen = []  # (path, model, keep_alive) per request that set one
+
+    def answer_tokens(self, max_tokens: int | None, stop: list[str] | None) -> list[str]:
+        """Tokens of a single-file answer, honouring max_tokens and stop sequences."""
+        tokens = [self.category]
+        if self.chatty:
+            tokens += ["\n", "\n", "This"] + [" file looks like a document."] * 60
+        if stop:
+            for i, token in enumerate(tokens):
+                if any(s in token for s in stop):
+                    tokens = tokens[:i]
+                    break
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        return tokens
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.base_url}/v1/chat/completions"
+
+
+class _GeminiHandler(_StubHandler):
+    def do_POST(self):
+        server = self.server
+        request = self._read_json()
+        server.request_count += 1
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            self.send_error(404)
+            return
+        if self._send_injected_error():
+            return
+
+        parts = [p for c in request.get("contents", []) for p in c.get("parts", [])]
+        prompt = " ".join(p.get("text", "") for p in parts)
+        match = re.search(r"Files: (\[.*\])", prompt)
+        items = len(json.loads(match.group(1))) if match else 1
+        server.infer(items)
+
+        schema = request.get("generationConfig", {}).get("responseSchema", {})
+        allowed = schema.get("enum") or schema.get("items", {}).get("enum") or [server.category]
+        category = server.category if server.category in allowed else allowed[0]
+        text = json.dumps([category] * items) if match else category
+        self._send_json({
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                            "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": items},
+        })
+
+
+class GeminiStubServer(_StubServer):
+    """Gemini-compatible stand-in; point GeminiClient(base_url=...) at it."""
+
+    def __init__(self, port: int = 0, base_latency: float = 0.3,
+                 item_latency: float = 0.01, category: str = "Documents",
+                 parallel: int = 64, jitter: float = 0.0, error_rate: float = 0.0):
+        super().__init__(_GeminiHandler, port, base_latency, item_latency, category,
+                         parallel, jitter, error_rate)
@@ -0,0 +1,86 @@
+"""
+Synthetic downloads generator for benchmarks.
+
+Produces a realistic mix of names, extensions and sizes: installers and
+archives that Tier 1 handles, screenshots and scans, sensitive documents
+for Tier 0, and vague names with unknown extensions that reach Tier 3.
+Files are written the way browsers do: into a `.part` file that is
+renamed to its final name when complete.
+"""
+import os
+import random
+
+# Leading bytes so content sniffing and image decoding see plausible files
+MAGIC = {
+    ".pdf": b"%PDF-1.7\n",
+    ".png": b"\x89PNG\r\n\x1a\n",
+    ".jpg": b"\xff\xd8\xff\xe0",
+    ".zip": b"PK\x03\x04",
+    ".exe": b"MZ",
+}
+
+# (weight, extension, name templates, median size in KB)
+PROFILES = [
+    (14, ".pdf", ["invoice_{n}", "Statement_{date}", "paper-{n}", "manual_v{v}"], 400),
+    (12, ".jpg", ["IMG_{n}", "photo_{date}", "DSC{n}"], 2500),
+    (10, ".png", ["Screenshot {date} at {time}", "image ({v})"], 300),
+    (8, ".zip", ["project-{n}", "assets_{v}", "archive ({v})"], 8000),
+    (6, ".exe", ["setup_{n}", "installer-x64-{v}"], 40000),
+    (6, ".docx", ["report_q{v}_{date}", "CV_{n}", "notes {date}"], 80),
+    (5, ".mp4", ["video_{date}", "clip{n}"], 30000),
+    (5, ".mp3", ["track {v}", "podcast_{date}"], 5000),
+    (4, ".txt", ["readme", "notes_{n}", "log_{date}"], 4),
+    (4, ".py", ["script_{n}", "main", "utils_{v}"], 6),
+    (3, ".csv", ["export_{date}", "data_{n}"], 200),
+    (3, ".pdf", ["tax_return_{date}", "bank_statement_{n}"], 300),  # Tier 0
+    (10, "", ["download", "file_{n}", "{hex}", "document ({v})"], 100),  # no extension
+    (10, ".xyz", ["untitled_{n}", "export_{hex}", "data_{date}"], 50),  # unknown extension
+]
+
+
+class SyntheticDownloads:
+    """Seeded stream of (filename, size_bytes) pairs and a writer for them."""
+
+    def __init__(self, seed: int = 0, max_size: int = 64 * 1024 * 1024, size_scale: float = 1.0):
+        self.random = random.Random(seed)
+        self.max_size = max_size
+        self.size_scale = size_scale  # shrink every file, e.g. to spare disk in long runs
+        self.weights = [p[0] for p in PROFILES]
+        self._serial = 0
+
+    def _fill(self, template: str) -> str:
+        r = self.random
+        return template.format(
+            n=r.randint(1, 99999),
+            v=r.randint(1, 9),
+            date=f"{r.randint(2019, 2026)}-{r.randint(1, 12):02d}-{r.randint(1, 28):02d}",
+            time=f"{r.randint(0, 23):02d}.{r.randint(0, 59):02d}.{r.randint(0, 59):02d}",
+            hex=f"{r.getrandbits(32):08x}",
+        )
+
+    def next(self) -> tuple[str, int]:
+        _, ext, templates, median_kb = self.random.choices(PROFILES, self.weights)[0]
+        self._serial += 1
+        # Unique names so files never collide in the target folder
+        name = f"{self._fill(self.random.choice(templates))}_{self._serial}{ext}"
+        size = int(median_kb * 1024 * self.size_scale * self.random.lognormvariate(0, 0.8))
+        return name, max(16, min(size, self.max_size))
+
+    def generate(self, count: int) -> list[tuple[str, int]]:
+        return [self.next() for _ in range(count)]
+
+    @staticmethod
+    def write(directory: str, name: str, size: int, chunk: int = 1024 * 1024) -> str:
+        """Write like a browser: `<name>.part`, then rename. Returns the final path."""
+        final_path = os.path.join(directory, name)
+        part_path = final_path + ".part"
+        header = MAGIC.get(os.path.splitext(name)[1].lower(), b"")
+        with open(part_path, "wb") as f:
+            f.write(header)
+            remaining = size - len(header)
+            block = b"\0" * chunk
+            while remaining > 0:
+                f.write(block[:remaining])
+                remaining -= chunk
+        os.replace(part_path, final_path)
+        return final_path
@@ -0,0 +1,355 @@
+"""
+ArchiveInspector - Tier 2 classification of archives by their contents
+
+Reads only archive metadata, never member data:
+  ZIP  - the End Of Central Directory record (one read from the end of
+         the file, ZIP64 aware), then the central directory itself
+  tar  - the 512-byte member headers, seeking over member data; for
+         .tar.gz/.tgz/.tar.bz2/.tar.xz the stream has to be decompressed
+         to reach the next header, so the budget runs out sooner
+  .gz  - a single compressed file: its inner name decides
+
+Every inspection has a hard budget of bytes read from disk and entries
+scanned; a profile built from the first part of a huge archive is
+still a profile (marked truncated). 7z and rar need their own codecs
+and stay in "Archives".
+
+Profiles: installers (setup.exe, .msi, mostly binaries), source trees
+(project files or mostly code), or whatever category most members fall
+in (images, documents, audio, ...) if it clears `min_share`.
+"""
+import bz2
+import collections
+import gzip
+import logging
+import lzma
+import os
+import struct
+import time
+from fnmatch import fnmatchcase
+
+from core.metrics import registry
+
+ZIP_EOCD = b"PK\x05\x06"
+ZIP64_LOCATOR = b"PK\x06\x07"
+ZIP64_EOCD = b"PK\x06\x06"
+ZIP_CENTRAL_HEADER = b"PK\x01\x02"
+ZIP_EOCD_SIZE = 22
+ZIP_MAX_COMMENT = 0xFFFF
+TAR_BLOCK = 512
+SKIP_CHUNK = 64 * 1024
+
+TAR_SUFFIXES = {".tar": None, ".tgz": gzip, ".tbz2": bz2, ".txz": lzma}
+COMPRESSED_TAR = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+
+INSTALLER_EXTENSIONS = {".exe", ".msi", ".dll", ".pkg", ".deb", ".rpm", ".appimage", ".dmg", ".cab"}
+INSTALLER_NAMES = ["setup*.exe", "install*.exe", "*.msi"]
+CODE_EXTENSIONS = {".py", ".js", ".ts", ".tsx", ".jsx", ".java", ".kt", ".c", ".cc", ".cpp", ".h",
+                   ".hpp", ".cs", ".go", ".rs", ".rb", ".php", ".swift", ".scala", ".sh", ".lua",
+                   ".html", ".css", ".vue"}
+PROJECT_MARKERS = {"setup.py", "pyproject.toml", "package.json", "makefile", "cmakelists.txt",
+                   "go.mod", "cargo.toml", "pom.xml", "build.gradle", "gemfile", ".gitignore"}
+IGNORED_PARTS = ("__macosx/", ".ds_store", "thumbs.db", "desktop.ini")
+
+
+class ArchiveProfile:
+    """What an archive holds, by category, from the entries that were scanned."""
+
+    def __init__(self, kind: str):
+        self.kind = kind  # "zip" or "tar"
+        self.counts = collections.Counter()  # category -> members
+        self.files = 0
+        self.installers = 0
+        self.installer_names = 0
+        self.code = 0
+        self.project_markers = 0
+        self.total_size = 0  # uncompressed bytes of the scanned members
+        self.truncated = False  # budget ran out before the end
+        self.bytes_read = 0
+        self.elapsed_ms = 0.0
+
+    def __repr__(self):
+        return (f"ArchiveProfile({self.kind}, files={self.files}, {dict(self.counts.most_common(3))}, "
+                f"truncated={self.truncated})")
+
+
+class _Budget:
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes_read = 0
+        self.entries = 0
+
+    def allows(self, nbytes: int = 0) -> bool:
+        return self.bytes_read + nbytes <= self.max_bytes and self.entries < self.max_entries
+
+
+class ArchiveInspector:
+    def __init__(self, rule_engine, max_bytes: int = 1024 * 1024, max_entries: int = 5000,
+                 min_share: float = 0.6):
+        self.rule_engine = rule_engine
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.min_share = min_share
+        self.logger = logging.getLogger("ArchiveInspector")
+        self._inspect_time = registry.stage("archive_inspect")
+
+    @classmethod
+    def from_config(cls, config: dict, rule_engine) -> "ArchiveInspector | None":
+        """None when archives.inspect is off."""
+        settings = config.get("archives", {})
+        if not settings.get("inspect", True):
+            return None
+        return cls(rule_engine,
+                   max_bytes=settings.get("max_bytes", 1024 * 1024),
+                   max_entries=settings.get("max_entries", 5000),
+                   min_share=settings.get("min_share", 0.6))
+
+    # -- classification ---------------------------------------------------
+
+    def classify(self, file_path: str) -> str | None:
+        """The archive's content category, or None to keep it in "Archives"."""
+        profile = self.inspect(file_path)
+        return self.category_for(profile) if profile is not None else None
+
+    def category_for(self, profile: ArchiveProfile) -> str | None:
+        files = profile.files
+        if not files:
+            return None
+        if profile.installer_names or profile.installers / files >= 0.3:
+            return "Installers"
+        if profile.project_markers or profile.code / files >= self.min_share:
+            return "Code"
+        category, count = profile.counts.most_common(1)[0]
+        if count / files >= self.min_share and category not in ("Archives", "Other"):
+            return category
+        return None
+
+    def _add_entry(self, profile: ArchiveProfile, name: str, size: int):
+        lower_name = name.replace("\\", "/").lower()
+        if lower_name.endswith("/") or any(part in lower_name for part in IGNORED_PARTS):
+            return
+        basename = lower_name.rsplit("/", 1)[-1]
+        _, ext = os.path.splitext(basename)
+        profile.files += 1
+        profile.total_size += size
+        profile.counts[self.rule_engine.match_extension(basename) or "Other"] += 1
+        if ext in INSTALLER_EXTENSIONS:
+            profile.installers += 1
+        if any(fnmatchcase(basename, pattern) for pattern in INSTALLER_NAMES):
+            profile.installer_names += 1
+        if ext in CODE_EXTENSIONS:
+            profile.code += 1
+        if basename in PROJECT_MARKERS:
+            profile.project_markers += 1
+
+    # -- reading ----------------------------------------------------------
+
+    def inspect(self, file_path: str) -> ArchiveProfile | None:
+        """Profile of a ZIP or tar(.gz/.bz2/.xz) archive; None if unreadable or another format."""
+        start = time.perf_counter()
+        lower_name = file_path.lower()
+        budget = _Budget(self.max_bytes, self.max_entries)
+        try:
+            with open(file_path, "rb") as f:
+                magic = f.read(4)
+                budget.bytes_read += len(magic)
+                f.seek(0)
+                if magic.startswith(b"PK"):
+                    profile = self._inspect_zip(f, budget)
+                else:
+                    profile = self._inspect_tar(f, lower_name, budget)
+        except (OSError, EOFError, ValueError, struct.error, lzma.LZMAError) as e:
+            self.logger.debug(f"Cannot inspect {os.path.basename(file_path)}: {e}")
+            profile = None
+        elapsed = time.perf_counter() - start
+        self._inspect_time.observe(elapsed * 1000)
+        if profile is not None:
+            profile.bytes_read = budget.bytes_read
+            profile.elapsed_ms = elapsed * 1000
+            self.logger.debug(f"Inspected {os.path.basename(file_path)} in {profile.elapsed_ms:.1f} ms: "
+                              f"{profile}")
+        return profile
+
+    def _inspect_zip(self, f, budget: _Budget) -> ArchiveProfile | None:
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        # EOCD is the last record, followed only by an optional comment
+        tail_size = min(file_size, ZIP_EOCD_SIZE + ZIP_MAX_COMMENT + 20)
+        f.seek(file_size - tail_size)
+        tail = f.read(tail_size)
+        budget.bytes_read += len(tail)
+        eocd_pos = tail.rfind(ZIP_EOCD)
+        if eocd_pos < 0 or len(tail) - eocd_pos < ZIP_EOCD_SIZE:
+            return None
+        (_, _, _, _, total_entries, cd_size, cd_offset, _) = struct.unpack(
+            "<4s4H2LH", tail[eocd_pos:eocd_pos + ZIP_EOCD_SIZE])
+        record_end = file_size - tail_size + eocd_pos  # where the central directory ends
+
+        # ZIP64 end records sit just before the EOCD; writers may add them even when the
+        # 32-bit fields still fit, and then the directory ends before them
+        locator = tail[eocd_pos - 20:eocd_pos] if eocd_pos >= 20 else b""
+        if locator.startswith(ZIP64_LOCATOR):
+            eocd64_offset = struct.unpack("<4sLQL", locator)[2]
+            locator_pos = record_end - 20
+            for offset in (locator_pos - 56, eocd64_offset):  # Usually adjacent; else as recorded
+                f.seek(offset)
+                record = f.read(56)
+                budget.bytes_read += len(record)
+                if record.startswith(ZIP64_EOCD):
+                    total_entries, cd_size, cd_offset = struct.unpack("<QQQ", record[32:56])
+                    record_end = offset
+                    break
+            else:
+                return None
+        elif cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+            return None
+        # Measured from the end, so data prepended to the archive (self-extractors) is fine
+        cd_start = record_end - cd_size
+
+        profile = ArchiveProfile("zip")
+        to_read = min(cd_size, max(0, budget.max_bytes - budget.bytes_read))
+        profile.truncated = to_read < cd_size
+        f.seek(cd_start)
+        directory = f.read(to_read)
+        budget.bytes_read += len(directory)
+
+        pos = 0
+        while pos + 46 <= len(directory):
+            if directory[pos:pos + 4] != ZIP_CENTRAL_HEADER:
+                break
+            if not budget.allows():
+                profile.truncated = True
+                break
+            flags = struct.unpack_from("<H", directory, pos + 8)[0]
+            size, name_len, extra_len, comment_len = struct.unpack_from("<L3H", directory, pos + 24)
+            raw_name = directory[pos + 46:pos + 46 + name_len]
+            if len(raw_name) < name_len:
+                profile.truncated = True
+                break
+            name = raw_name.decode("utf-8" if flags & 0x800 else "cp437", errors="replace")
+            self._add_entry(profile, name, size)
+            budget.entries += 1
+            pos += 46 + name_len + extra_len + comment_len
+        if budget.entries < total_entries and not profile.truncated:
+            profile.truncated = True
+        return profile
+
+    def _open_tar_stream(self, f, lower_name: str):
+        """(stream, raw file) for a tar, or (None, None) if the name does not say tar."""
+        base, ext = os.path.splitext(lower_name)
+        if ext in TAR_SUFFIXES:
+            codec = TAR_SUFFIXES[ext]
+        elif ext in COMPRESSED_TAR and base.endswith(".tar"):
+            codec = COMPRESSED_TAR[ext]
+        else:
+            return None, None
+        if codec is None:
+            return f, f
+        if codec is gzip:
+            return gzip.GzipFile(fileobj=f, mode="rb"), f
+        return codec.open(f, "rb"), f
+
+    def _inspect_tar(self, f, lower_name: str, budget: _Budget) -> ArchiveProfile | None:
+        stream, raw = self._open_tar_stream(f, lower_name)
+        if stream is None:
+            return self._inspect_single_gz(lower_name)
+        compressed = stream is not raw
+        profile = ArchiveProfile("tar")
+        long_name = None
+
+        def spent():
+            return raw.tell() if compressed else budget.bytes_read
+
+        while True:
+            if spent() + TAR_BLOCK > budget.max_bytes or not budget.allows():
+                profile.truncated = True
+                break
+            header = stream.read(TAR_BLOCK)
+            if not compressed:
+                budget.bytes_read += len(header)
+            if len(header) < TAR_BLOCK or header == bytes(TAR_BLOCK):
+                break  # End of archive
+            if header[257:262] != b"ustar" and not self._tar_checksum_ok(header):
+                return None if not profile.files else profile
+            size = self._tar_size(header[124:136])
+            typeflag = header[156:157]
+            data_blocks = -(-size // TAR_BLOCK) * TAR_BLOCK
+
+            if typeflag in (b"L", b"x"):
+                # GNU long name / pax header: the next member's real name is in the data
+                data = stream.read(min(data_blocks, 4 * TAR_BLOCK))
+                if not compressed:
+                    budget.bytes_read += len(data)
+                long_name = self._long_name(typeflag, data[:size])
+                if not self._skip(stream, raw, data_blocks - len(data), budget.max_bytes):
+                    profile.truncated = True
+                    break
+                continue
+
+            name = long_name or header[:100].split(b"\0", 1)[0].decode("utf-8", errors="replace")
+            if not long_name and header[257:262] == b"ustar":
+                prefix = header[345:500].split(b"\0", 1)[0].decode("utf-8", errors="replace")
+                if prefix:
+                    name = f"{prefix}/{name}"
+            long_name = None
+            if typeflag in (b"0", b"\0", b"7"):  # Regular files only
+                self._add_entry(profile, name, size)
+            budget.entries += 1
+            if not self._skip(stream, raw, data_blocks, budget.max_bytes):
+                profile.truncated = True
+                break
+        if compressed:
+            budget.bytes_read = raw.tell()
+        return profile
+
+    @staticmethod
+    def _skip(stream, raw, nbytes: int, max_bytes: int) -> bool:
+        """Move past member data. False if that would break the byte budget."""
+        if stream is raw:
+            stream.seek(nbytes, os.SEEK_CUR)  # Plain tar: nothing is read
+            return True
+        # Compressed: the only way past is to decompress, a chunk at a time
+        while nbytes > 0:
+            if raw.tell() > max_bytes:
+                return False
+            chunk = stream.read(min(nbytes, SKIP_CHUNK))
+            if not chunk:
+                break
+            nbytes -= len(chunk)
+        return True
+
+    @staticmethod
+    def _tar_size(field: bytes) -> int:
+        if field[0] & 0x80:  # Base-256 (GNU) for members over 8 GB
+            return int.from_bytes(field[1:], "big")
+        digits = field.split(b"\0", 1)[0].strip()
+        return int(digits, 8) if digits else 0
+
+    @staticmethod
+    def _tar_checksum_ok(header: bytes) -> bool:
+        try:
+            expected = int(header[148:156].split(b"\0", 1)[0].strip() or b"0", 8)
+        except ValueError:
+            return False
+        return expected == sum(header[:148]) + 8 * 32 + sum(header[156:])
+
+    @staticmethod
+    def _long_name(typeflag: bytes, data: bytes) -> str | None:
+        if typeflag == b"L":
+            return data.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        for record in data.split(b"\n"):
+            _, _, field = record.partition(b" ")
+            key, _, value = field.partition(b"=")
+            if key == b"path":
+                return value.decode("utf-8", errors="replace")
+        return None
+
+    def _inspect_single_gz(self, lower_name: str) -> ArchiveProfile | None:
+        """report.csv.gz is one compressed file: profile it by the inner name."""
+        base, ext = os.path.splitext(lower_name)
+        if ext not in COMPRESSED_TAR or not os.path.splitext(base)[1]:
+            return None
+        profile = ArchiveProfile("single")
+        self._add_entry(profile, os.path.basename(base), 0)
+        return profile
@@ -0,0 +1,167 @@
+"""
+ClassificationBatcher - Tier 3 Micro-Batching
+
+Collects filenames from concurrent worker threads for a short window
+and sends them to the AI client as one structured prompt.
+"""
+import concurrent.futures
+import json
+import logging
+import queue
+import threading
+import time
+
+from ai.categories import normalize_category
+from ai.deadline import Deadline, DeadlineExceeded
+
+
+def parse_batch_response(text: str, count: int, categories: list[str] = None) -> list[str | None]:
+    """
+    Parse a JSON array of categories out of a model response.
+    Returns one entry per filename; None marks items that need a fallback.
+    When `categories` is given, answers outside that set also count as unusable.
+    """
+    start = text.find("[")
+    end = text.rfind("]")
+    if start == -1 or end <= start:
+        return [None] * count
+
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return [None] * count
+
+    # A short or padded array cannot be matched back to filenames reliably
+    if not isinstance(items, list) or len(items) != count:
+        return [None] * count
+
+    results = []
+    for item in items:
+        if isinstance(item, str) and item.strip():
+            if categories:
+                results.append(normalize_category(item, categories, default=None))
+            else:
+                results.append(item.strip())
+        else:
+            results.append(None)
+    return results
+
+
+class ClassificationBatcher:
+    """
+    Sits in front of a Tier 3 client (anything with classify/classify_batch).
+    Worker threads call classify() and block until their batch returns.
+    One batch is in flight at a time; files arriving meanwhile form the next one.
+    """
+
+    IDLE_EXIT = 5  # seconds without work before the dispatch thread exits
+
+    def __init__(self, client, window_ms: int = 50, max_batch_size: int = 8):
+        self.client = client
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.logger = logging.getLogger("ClassificationBatcher")
+        self._pending = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._callers = 0  # classify() calls waiting on a batch result
+
+    def classify(self, filename: str, deadline: Deadline = None) -> str:
+        """
+        Classify a single filename, sharing the request with concurrent callers.
+        Raises DeadlineExceeded if the batch has not answered by `deadline`.
+        """
+        if self.max_batch_size <= 1:
+            return self.client.classify(filename, deadline=deadline)
+
+        future = concurrent.futures.Future()
+        with self._lock:
+            self._callers += 1
+        self._pending.put((filename, deadline, future))
+        self._ensure_running()
+
+        try:
+            category = future.result(timeout=deadline.timeout(None) if deadline else None)
+        except concurrent.futures.TimeoutError:
+            # The batch still completes; only this caller stops waiting for it
+            raise DeadlineExceeded("file deadline exceeded while batching")
+        finally:
+            with self._lock:
+                self._callers -= 1
+        if category is None:
+            # Per-item fallback runs on the caller's thread, not the dispatcher
+            category = self.client.classify(filename, deadline=deadline)
+        return category
+
+    def _ensure_running(self):
+        """Start the dispatch thread on demand."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self, first) -> list:
+        """
+        Gather items until the window closes or the batch is full. A file
+        with no other caller waiting goes out at once: the usual single
+        download should not sit out the window for company that is not coming.
+        """
+        batch = [first]
+        with self._lock:
+            alone = self._callers <= 1
+        if alone:
+            return batch
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self):
+        """Background thread: collect, send, demultiplex."""
+        while True:
+            try:
+                first = self._pending.get(timeout=self.IDLE_EXIT)
+            except queue.Empty:
+                with self._lock:
+                    # Re-check under the lock so a racing classify() restarts us
+                    if self._pending.empty():
+                        self._thread = None
+                        return
+                continue
+            self._dispatch(self._collect_batch(first))
+
+    def _dispatch(self, batch: list):
+        """Send one batch and hand each result back to its waiting caller."""
+        filenames = [filename for filename, _, _ in batch]
+
+        if len(batch) == 1:
+            results = [None]  # Caller falls back to the single-item prompt
+        else:
+            try:
+                results = self.client.classify_batch(filenames, deadline=self._earliest_deadline(batch))
+                self.logger.info(f"Batch of {len(batch)} classified")
+            except DeadlineExceeded:
+                # Callers past their deadline have given up; the rest fall back
+                self.logger.info(f"Batch of {len(batch)} ran past the earliest file deadline")
+                results = [None] * len(batch)
+            except Exception as e:
+                self.logger.error(f"Batch classification error: {e}")
+                results = [None] * len(batch)
+
+        if not isinstance(results, list) or len(results) != len(batch):
+            results = [None] * len(batch)
+
+        for (_, _, future), category in zip(batch, results):
+            future.set_result(category)
+
+    @staticmethod
+    def _earliest_deadline(batch: list) -> Deadline | None:
+        """The tightest bounded deadline in the batch: the request must not outlast it."""
+        bounded = [deadline for _, deadline, _ in batch if deadline and deadline.expires_at is not None]
+        return min(bounded, key=lambda deadline: deadline.expires_at) if bounded else None
@@ -0,0 +1,62 @@
+"""
+Category helpers shared by the Tier 3 clients.
+
+Maps free-form model output back onto a known category set, both for
+complete answers and for partially streamed ones.
+"""
+import re
+
+# Leading noise models like to emit before the answer
+_PREAMBLE = re.compile(r'^[\s"\'`*\[]*(?:category\s*[:\-]\s*)?[\s"\'`*]*', re.IGNORECASE)
+
+
+def _strip_preamble(text: str) -> str:
+    return _PREAMBLE.sub("", text, count=1)
+
+
+def normalize_category(text: str, categories: list[str], default: str | None = "Other") -> str | None:
+    """
+    Map a model answer onto the known category set.
+    Tries an exact match first, then the earliest category mentioned as a word.
+    """
+    candidate = _strip_preamble(text).strip().rstrip('."\'`*]').strip()
+    for name in categories:
+        if candidate.lower() == name.lower():
+            return name
+
+    best, best_pos = default, len(text) + 1
+    lower_text = text.lower()
+    # Longest names first so "Documents (scanned)" beats "Documents" at the same spot
+    for name in sorted(categories, key=len, reverse=True):
+        match = re.search(r'(?<!\w)' + re.escape(name.lower()) + r'(?!\w)', lower_text)
+        if match and match.start() < best_pos:
+            best, best_pos = name, match.start()
+    return best
+
+
+def match_streamed_category(text: str, categories: list[str]) -> str | None:
+    """
+    Decide whether a partially streamed answer already names a category.
+    Returns the category once it is unambiguous, or None to keep reading.
+    """
+    candidate = _strip_preamble(text).lower()
+    if not candidate:
+        return None
+
+    # A longer category could still be completing ("Documents" vs "Documents (scanned)")
+    for name in categories:
+        key = name.lower()
+        if len(key) > len(candidate) and key.startswith(candidate):
+            return None
+
+    complete = None
+    for name in categories:
+        key = name.lower()
+        if candidate.startswith(key):
+            rest = candidate[len(key):]
+            # Need a delimiter after the name so "Art" does not match "Artwork"
+            delimited = not rest[0].isalnum() if rest else not key[-1].isalnum()
+            if delimited:
+                if complete is None or len(name) > len(complete):
+                    complete = name
+    return complete
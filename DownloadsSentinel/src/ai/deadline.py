@@ -0,0 +1,44 @@
+"""
+Deadline - Per-file latency budget
+
+Created once per file by the WorkflowEngine and handed down to the AI
+clients, which clip their own timeouts to whatever budget is left.
+"""
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    """The file's latency budget ran out before Tier 3 answered."""
+
+
+class Deadline:
+    """A point in time after which a file must stop waiting on slow tiers."""
+
+    MIN_TIMEOUT = 0.05  # never hand a zero/negative timeout to a socket
+
+    def __init__(self, seconds: float | None):
+        # None means unbounded (e.g. background re-classification)
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self):
+        """Raise DeadlineExceeded if the budget is spent."""
+        if self.expired():
+            raise DeadlineExceeded("file deadline exceeded")
+
+    def timeout(self, cap: float | None) -> float | None:
+        """`cap` clipped to the remaining budget (None = no cap)."""
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        self.check()
+        if cap is not None:
+            remaining = min(cap, remaining)
+        return max(self.MIN_TIMEOUT, remaining)
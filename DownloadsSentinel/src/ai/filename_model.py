@@ -0,0 +1,164 @@
+"""
+FilenameClassifier - Tier 2 Learned Matching
+
+A small naive-Bayes model over hashed character n-grams of the filename,
+trained incrementally from the engine's own Tier 3 decisions. Answers in
+microseconds, so repetitive downloads ("Screenshot 2026-…") stop costing
+an LLM round trip once the model has seen a few of them.
+"""
+import os
+import re
+import tempfile
+import threading
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the tier is simply skipped
+    np = None
+
+_DIGITS = re.compile(r"\d")
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class FilenameClassifier:
+    """
+    Multinomial naive Bayes on L1-normalized hashed n-gram counts.
+    Confidence is the posterior of the winning category; callers escalate
+    to Tier 3 below their threshold.
+    """
+
+    NGRAM_SIZES = (2, 3, 4)
+    ALPHA = 0.1  # Laplace smoothing
+
+    def __init__(self, n_features: int = 2 ** 16, min_samples: int = 50):
+        if np is None:
+            raise ImportError("FilenameClassifier requires numpy")
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.n_features = n_features
+        self.min_samples = min_samples  # stay silent until trained on this many files
+
+        self.classes = []
+        self.feature_counts = np.zeros((0, n_features), dtype=np.float32)
+        self.class_counts = np.zeros(0, dtype=np.float64)
+        self.unsaved = 0  # updates since the last save
+        self._log_probs = None  # cached (log prior, log likelihood), rebuilt after updates
+        self._lock = threading.Lock()
+
+    # ---- Features ----
+
+    def features(self, filename: str):
+        """Hashed n-gram indices of a filename (digits folded, so dates and counters generalize)."""
+        text = "^" + _DIGITS.sub("0", filename.lower()) + "$"
+        mask = self.n_features - 1
+        return np.fromiter(
+            (zlib.crc32(text[i:i + n].encode("utf-8")) & mask
+             for n in self.NGRAM_SIZES for i in range(len(text) - n + 1)),
+            dtype=np.int64
+        )
+
+    # ---- Training ----
+
+    def learn(self, filename: str, category: str):
+        """Add one labelled example (a Tier 3 decision)."""
+        idx = self.features(filename)
+        with self._lock:
+            row = self._class_row(category)
+            if len(idx):
+                np.add.at(self.feature_counts[row], idx, 1.0 / len(idx))
+            self.class_counts[row] += 1
+            self.unsaved += 1
+            self._log_probs = None
+
+    def _class_row(self, category: str) -> int:
+        if category not in self.classes:
+            self.classes.append(category)
+            self.feature_counts = np.vstack(
+                [self.feature_counts, np.zeros((1, self.n_features), dtype=np.float32)])
+            self.class_counts = np.append(self.class_counts, 0.0)
+        return self.classes.index(category)
+
+    @property
+    def sample_count(self) -> int:
+        return int(self.class_counts.sum())
+
+    def _model(self):
+        """(log prior, log likelihood) arrays, rebuilt lazily after updates."""
+        with self._lock:
+            if self._log_probs is None:
+                prior = np.log(self.class_counts / self.class_counts.sum())
+                smoothed = self.feature_counts + self.ALPHA
+                likelihood = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+                self._log_probs = (prior, likelihood.astype(np.float32))
+            return self._log_probs
+
+    # ---- Prediction ----
+
+    def predict(self, filename: str) -> tuple[str | None, float]:
+        """Return (category, confidence), or (None, 0.0) while untrained."""
+        return self.predict_batch([filename])[0]
+
+    def predict_batch(self, filenames: list[str]) -> list[tuple[str | None, float]]:
+        """Vectorized predict for backlog scans."""
+        if not filenames:
+            return []
+        if self.sample_count < self.min_samples or len(self.classes) < 2:
+            return [(None, 0.0)] * len(filenames)
+
+        prior, likelihood = self._model()
+        rows = [self.features(name) for name in filenames]
+        lengths = np.array([len(r) for r in rows])
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        # Gather every n-gram column once, then sum per filename. Scaling by
+        # 1/sqrt(n) sits between the raw sum (always ~100% sure) and the L1
+        # average (never sure), so unfamiliar names land well below the threshold.
+        gathered = likelihood[:, np.concatenate(rows)]
+        scores = np.add.reduceat(gathered, offsets, axis=1) / np.sqrt(np.maximum(lengths, 1))
+        scores = scores + prior[:, None]
+
+        scores -= scores.max(axis=0)
+        posterior = np.exp(scores)
+        posterior /= posterior.sum(axis=0)
+        best = posterior.argmax(axis=0)
+        return [(self.classes[b], float(posterior[b, i])) for i, b in enumerate(best)]
+
+    # ---- Persistence ----
+
+    def save(self, path: str):
+        """Write the model atomically (a crash never leaves a torn file)."""
+        with self._lock:
+            classes = np.array(self.classes, dtype=str)
+            feature_counts = self.feature_counts.copy()
+            class_counts = self.class_counts.copy()
+            snapshot_updates = self.unsaved
+        # A unique temp file per save: concurrent writers (threads, an outgoing and
+        # an incoming worker) never write into each other's file
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                        dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, classes=classes, feature_counts=feature_counts,
+                                    class_counts=class_counts)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            # Only once the file is in place; updates learned meanwhile stay unsaved
+            self.unsaved -= snapshot_updates
+
+    @classmethod
+    def load(cls, path: str, min_samples: int = 50) -> "FilenameClassifier":
+        """Load a saved model, or start empty if none exists."""
+        if not os.path.exists(path):
+            return cls(min_samples=min_samples)
+        with np.load(path, allow_pickle=False) as data:
+            model = cls(n_features=data["feature_counts"].shape[1], min_samples=min_samples)
+            model.classes = [str(c) for c in data["classes"]]
+            model.feature_counts = data["feature_counts"].astype(np.float32)
+            model.class_counts = data["class_counts"].astype(np.float64)
+        return model
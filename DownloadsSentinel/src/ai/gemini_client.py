@@ -6,10 +6,16 @@ Can analyze file contents for ambiguous cases.
 Updated to use the new google-genai SDK.
 """
 from google import genai
-import base64
-import mimetypes
+import json
 import os
 import logging
+import threading
+
+from ai.batcher import parse_batch_response
+from ai.categories import normalize_category
+from ai.image_prep import prepare_image
+from ai.deadline import Deadline, DeadlineExceeded
+from ai.resilience import AIUnavailableError, CircuitBreaker, TokenBucket, call_with_retry
 
 
 class GeminiClient:
@@ -20,18 +26,124 @@ class GeminiClient:
     
     # File size limit for content upload (10MB)
     MAX_CONTENT_SIZE = 10 * 1024 * 1024
+    # Images are downscaled before upload, so larger originals are fine
+    MAX_IMAGE_SIZE = 50 * 1024 * 1024
+    # Gemini tiles images at 768px; more detail is wasted upload
+    VISION_MAX_SIDE = 768
     
     # Supported file types for content analysis
     TEXT_EXTENSIONS = {'.txt', '.md', '.py', '.js', '.html', '.css', '.json', '.xml', '.csv', '.log'}
     IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
     
-    def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash"):
+    # Category sets per prompt; responses are constrained to these
+    NAME_CATEGORIES = ["Images", "Documents", "Installers", "Audio", "Video", "Archives", "Code", "Other"]
+    TEXT_CATEGORIES = ["Documents", "Code", "Financial", "Spreadsheet", "Config", "Other"]
+    IMAGE_CATEGORIES = ["Photos", "Screenshots", "Art", "Documents (scanned)", "Memes", "Icons", "Other"]
+    
+    # Category names are a few tokens; anything longer is the model rambling
+    MAX_CATEGORY_TOKENS = 8
+    
+    # Retry policy for transient errors (429, 5xx, network)
+    MAX_ATTEMPTS = 3
+    BACKOFF_BASE = 1.0   # seconds; doubles per attempt, full jitter
+    BACKOFF_MAX = 20.0
+    # Longest a request may queue for rate-limit tokens before we give up on the cloud
+    MAX_QUEUE_WAIT = 30
+    # Gemini bills roughly 258 tokens per image tile
+    IMAGE_TOKENS = 258
+    # Per-request HTTP timeout when a deadline is set (seconds)
+    HTTP_TIMEOUT = 60
+    
+    def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash",
+                 rpm: int = 15, tpm: int = 1_000_000,
+                 breaker_threshold: int = 5, breaker_reset: float = 60,
+                 base_url: str = None):
         self.api_key = api_key
         self.model_name = model_name
-        self.client = genai.Client(api_key=api_key)
+        # base_url: alternative endpoint (proxy, or a local stand-in for benchmarks)
+        http_options = genai.types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
         self.logger = logging.getLogger("GEMINI")
+        
+        # Client-side quota enforcement and outage detection
+        self.request_bucket = TokenBucket(rpm)
+        self.token_bucket = TokenBucket(tpm)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset, name="GEMINI.breaker")
+        self.queued_requests = 0
+        self._queue_lock = threading.Lock()
+    
+    def metrics(self) -> dict:
+        """Breaker state and rate-limit backlog for monitoring."""
+        return {
+            "breaker_state": self.breaker.state,
+            "queued_requests": self.queued_requests,
+        }
+    
+    def _estimate_tokens(self, contents) -> int:
+        """Rough input token count (~4 characters per token)."""
+        parts = contents if isinstance(contents, list) else [contents]
+        return sum(len(p) // 4 if isinstance(p, str) else self.IMAGE_TOKENS for p in parts)
+    
+    def _generate(self, contents, config, deadline: Deadline = None):
+        """
+        Rate-limited, retried generate_content call.
+        Raises AIUnavailableError when the breaker is open, the rate-limit
+        queue is saturated, or retries are exhausted, and DeadlineExceeded
+        when the file's latency budget runs out first.
+        """
+        # Fail fast instead of queueing for quota behind a known outage
+        if self.breaker.state == CircuitBreaker.OPEN:
+            raise AIUnavailableError("Gemini circuit open")
+        
+        max_wait = deadline.timeout(self.MAX_QUEUE_WAIT) if deadline else self.MAX_QUEUE_WAIT
+        with self._queue_lock:
+            self.queued_requests += 1
+        try:
+            acquired = self.request_bucket.acquire(1, max_wait)
+            if acquired and not self.token_bucket.acquire(self._estimate_tokens(contents), max_wait):
+                self.request_bucket.refund(1)  # No request goes out, so it must not use up rpm
+                acquired = False
+            if not acquired:
+                if deadline:
+                    deadline.check()
+                raise AIUnavailableError("Gemini rate-limit queue saturated")
+        finally:
+            with self._queue_lock:
+                self.queued_requests -= 1
+        
+        if deadline and deadline.remaining() is not None:
+            # Bound the HTTP call itself by what is left of the budget
+            config.http_options = genai.types.HttpOptions(
+                timeout=int(deadline.timeout(self.HTTP_TIMEOUT) * 1000)
+            )
+        
+        return call_with_retry(
+            lambda: self.client.models.generate_content(
+                model=self.model_name, contents=contents, config=config
+            ),
+            self.breaker, self.MAX_ATTEMPTS, self.BACKOFF_BASE, self.BACKOFF_MAX,
+            deadline=deadline
+        )
+    
+    def _category_config(self, categories: list[str]):
+        """Generation config that forces the answer to be one of `categories`."""
+        return genai.types.GenerateContentConfig(
+            temperature=0,
+            max_output_tokens=self.MAX_CATEGORY_TOKENS,
+            response_mime_type="text/x.enum",
+            response_schema={"type": "STRING", "enum": categories}
+        )
+    
+    def _batch_config(self, categories: list[str], count: int):
+        """Generation config for a JSON array of `count` categories."""
+        return genai.types.GenerateContentConfig(
+            temperature=0,
+            max_output_tokens=self.MAX_CATEGORY_TOKENS * count,
+            response_mime_type="application/json",
+            response_schema={"type": "ARRAY", "items": {"type": "STRING", "enum": categories}}
+        )
 
-    def classify(self, file_name: str) -> str:
+    def classify(self, file_name: str, deadline: Deadline = None) -> str:
         """
         Classifies the file based on its name only.
         Returns a category string.
@@ -40,24 +152,68 @@ class GeminiClient:
         prompt = f"""
         You are a file organizer. Categorize the following file based on its name.
         Return ONLY the category name.
-        Categories: Images, Documents, Installers, Audio, Video, Archives, Code, Other.
+        Categories: {", ".join(self.NAME_CATEGORIES)}.
         
         File: {file_name}
         Category:
         """
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
+            response = self._generate(
+                contents=prompt,
+                config=self._category_config(self.NAME_CATEGORIES),
+                deadline=deadline
             )
-            result = response.text.strip()
+            result = normalize_category(response.text, self.NAME_CATEGORIES)
             self.logger.info(f"Response: Category '{result}'")
             return result
+        except (AIUnavailableError, DeadlineExceeded):
+            raise
         except Exception as e:
             self.logger.error(f"Error: {e}")
             return "Other"
     
-    def classify_with_content(self, file_path: str) -> str:
+    def classify_batch(self, file_names: list[str], deadline: Deadline = None) -> list[str | None]:
+        """
+        Classifies several files by name in one API call.
+        Returns one category per file; None where the answer was unusable.
+        """
+        self.logger.info(f"API Call (filename batch): {len(file_names)} files")
+        prompt = f"""
+        You are a file organizer. Categorize each of the following files based on its name.
+        Return ONLY a JSON array of category names, one per file, in the same order.
+        Categories: {", ".join(self.NAME_CATEGORIES)}.
+        
+        Files: {json.dumps(file_names)}
+        Categories:
+        """
+        try:
+            response = self._generate(
+                contents=prompt,
+                config=self._batch_config(self.NAME_CATEGORIES, len(file_names)),
+                deadline=deadline
+            )
+            return parse_batch_response(response.text, len(file_names), self.NAME_CATEGORIES)
+        except (AIUnavailableError, DeadlineExceeded):
+            raise
+        except Exception as e:
+            self.logger.error(f"Batch error: {e}")
+            return [None] * len(file_names)
+    
+    def can_analyze_content(self, file_path: str) -> bool:
+        """True if classify_with_content would upload the file's contents."""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext not in self.TEXT_EXTENSIONS and ext not in self.IMAGE_EXTENSIONS:
+            return False
+        try:
+            return os.path.getsize(file_path) <= self._size_limit(ext)
+        except OSError:
+            return False
+    
+    def _size_limit(self, ext: str) -> int:
+        """Largest file whose contents we are willing to process."""
+        return self.MAX_IMAGE_SIZE if ext in self.IMAGE_EXTENSIONS else self.MAX_CONTENT_SIZE
+    
+    def classify_with_content(self, file_path: str, deadline: Deadline = None) -> str:
         """
         Classifies the file by analyzing its CONTENTS.
         Used for ambiguous filenames.
@@ -72,24 +228,26 @@ class GeminiClient:
             file_size = os.path.getsize(file_path)
             
             # Check file size limit
-            if file_size > self.MAX_CONTENT_SIZE:
+            if file_size > self._size_limit(ext):
                 self.logger.warning(f"File too large ({file_size} bytes), falling back to filename")
-                return self.classify(filename)
+                return self.classify(filename, deadline)
             
             # Determine analysis method based on file type
             if ext in self.TEXT_EXTENSIONS:
-                return self._analyze_text_file(file_path, filename)
+                return self._analyze_text_file(file_path, filename, deadline)
             elif ext in self.IMAGE_EXTENSIONS:
-                return self._analyze_image_file(file_path, filename)
+                return self._analyze_image_file(file_path, filename, deadline)
             else:
                 # For other file types, try to read as text or fall back
-                return self._analyze_binary_file(file_path, filename)
+                return self._analyze_binary_file(file_path, filename, deadline)
                 
+        except (AIUnavailableError, DeadlineExceeded):
+            raise
         except Exception as e:
             self.logger.error(f"Content analysis error: {e}")
             return "Other"
     
-    def _analyze_text_file(self, file_path: str, filename: str) -> str:
+    def _analyze_text_file(self, file_path: str, filename: str, deadline: Deadline = None) -> str:
         """Analyze text-based file content."""
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -99,7 +257,7 @@ class GeminiClient:
             prompt = f"""
             Analyze this file and categorize it.
             Return ONLY the category name.
-            Categories: Documents, Code, Financial, Spreadsheet, Config, Other.
+            Categories: {", ".join(self.TEXT_CATEGORIES)}.
             
             Filename: {filename}
             
@@ -111,60 +269,56 @@ class GeminiClient:
             Category:
             """
             
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
+            response = self._generate(
+                contents=prompt,
+                config=self._category_config(self.TEXT_CATEGORIES),
+                deadline=deadline
             )
-            result = response.text.strip()
+            result = normalize_category(response.text, self.TEXT_CATEGORIES, default="Documents")
             self.logger.info(f"Text analysis result: '{result}'")
             return result
             
+        except (AIUnavailableError, DeadlineExceeded):
+            raise
         except Exception as e:
             self.logger.error(f"Text analysis error: {e}")
             return "Documents"
     
-    def _analyze_image_file(self, file_path: str, filename: str) -> str:
+    def _analyze_image_file(self, file_path: str, filename: str, deadline: Deadline = None) -> str:
         """Analyze image content using Gemini Vision."""
         try:
-            with open(file_path, 'rb') as f:
-                image_data = f.read()
-            
-            # Determine MIME type
-            mime_type, _ = mimetypes.guess_type(file_path)
-            if not mime_type:
-                mime_type = 'image/jpeg'
+            # Downscale to what the model looks at instead of uploading the original
+            image_data, mime_type = prepare_image(file_path, self.VISION_MAX_SIDE)
             
-            prompt = """
+            prompt = f"""
             Analyze this image and categorize it.
             Return ONLY the category name.
-            Categories: Photos, Screenshots, Art, Documents (scanned), Memes, Icons, Other.
+            Categories: {", ".join(self.IMAGE_CATEGORIES)}.
             
             Category:
             """
             
-            # New SDK uses inline data format
-            response = self.client.models.generate_content(
-                model=self.model_name,
+            # Raw bytes; the SDK encodes them once when building the request
+            response = self._generate(
                 contents=[
                     prompt,
-                    {
-                        "inline_data": {
-                            "mime_type": mime_type,
-                            "data": base64.b64encode(image_data).decode('utf-8')
-                        }
-                    }
-                ]
+                    genai.types.Part.from_bytes(data=image_data, mime_type=mime_type)
+                ],
+                config=self._category_config(self.IMAGE_CATEGORIES),
+                deadline=deadline
             )
             
-            result = response.text.strip()
+            result = normalize_category(response.text, self.IMAGE_CATEGORIES, default="Images")
             self.logger.info(f"Image analysis result: '{result}'")
             return result
             
+        except (AIUnavailableError, DeadlineExceeded):
+            raise
         except Exception as e:
             self.logger.error(f"Image analysis error: {e}")
             return "Images"
     
-    def _analyze_binary_file(self, file_path: str, filename: str) -> str:
+    def _analyze_binary_file(self, file_path: str, filename: str, deadline: Deadline = None) -> str:
         """For binary files, analyze the filename and extension."""
         # For binary files we can't easily analyze, just use filename
-        return self.classify(filename)
+        return self.classify(filename, deadline)
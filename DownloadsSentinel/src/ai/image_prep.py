@@ -0,0 +1,53 @@
+"""
+Image Pre-processing - Vision Upload Stage
+
+Shrinks images to the resolution a vision model actually uses before
+they are uploaded, so a 12MP photo costs tens of KB instead of megabytes.
+"""
+import io
+import os
+
+# Upper bound on decoded pixels per task (~64MB as RGBA). JPEGs are
+# decoded at reduced scale via draft mode, so only huge PNG/BMP/GIF
+# files can hit this; those are skipped rather than decoded in full.
+MAX_DECODE_PIXELS = 16 * 1024 * 1024
+
+PASSTHROUGH_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+class ImageTooLargeError(ValueError):
+    """Raised when an image cannot be decoded within MAX_DECODE_PIXELS."""
+
+
+def prepare_image(file_path: str, max_side: int = 768, image_format: str = "JPEG",
+                  quality: int = 80) -> tuple[bytes, str]:
+    """
+    Decode `file_path` at reduced resolution and re-encode it compactly.
+    Returns (image_bytes, mime_type).
+    """
+    from PIL import Image  # Only the worker pays for Pillow
+
+    with Image.open(file_path) as img:
+        source_format = img.format
+        # JPEG: let libjpeg decode straight to 1/2, 1/4 or 1/8 scale
+        img.draft("RGB", (max_side, max_side))
+
+        if img.width * img.height > MAX_DECODE_PIXELS:
+            raise ImageTooLargeError(f"{img.width}x{img.height} exceeds decode budget")
+
+        # First frame only for animations; thumbnail() uses reduce() before resampling
+        img.seek(0)
+        frame = img.convert("RGB")
+        frame.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+        buffer = io.BytesIO()
+        frame.save(buffer, format=image_format, quality=quality)
+
+    # Small, well-compressed originals (flat screenshots, icons) can beat the
+    # re-encode; send them as-is when the model accepts the format.
+    if source_format in PASSTHROUGH_FORMATS and os.path.getsize(file_path) <= buffer.tell():
+        with open(file_path, "rb") as f:
+            return f.read(), PASSTHROUGH_FORMATS[source_format]
+
+    mime_type = "image/webp" if image_format.upper() == "WEBP" else "image/jpeg"
+    return buffer.getvalue(), mime_type
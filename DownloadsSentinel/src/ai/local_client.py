@@ -7,6 +7,14 @@ import requests
 import logging
 import gc
 import base64
+import json
+import math
+
+from ai.batcher import parse_batch_response
+from ai.categories import match_streamed_category, normalize_category
+from ai.deadline import Deadline, DeadlineExceeded
+from ai.image_prep import prepare_image
+from ai.model_residency import ModelResidencyManager
 
 
 class LocalAIHost:
@@ -15,18 +23,58 @@ class LocalAIHost:
     Responsible for loading models only when needed and unloading after.
     """
     
+    # Ollama runs on localhost: connecting should be near-instant, while
+    # generation can legitimately take a while on CPU-only machines.
+    CONNECT_TIMEOUT = 2
+    
+    # Category names are a few tokens; anything longer is the model rambling
+    MAX_CATEGORY_TOKENS = 8
+    # A batch answer is a JSON array: quotes, comma and whitespace per name, brackets around
+    BATCH_ITEM_SYNTAX_TOKENS = 4
+    BATCH_ARRAY_SYNTAX_TOKENS = 4
+    
+    TEXT_CATEGORIES = ["Documents", "Images", "Videos", "Audio", "Archives",
+                       "Installers", "Code", "Financial", "Other"]
+    IMAGE_CATEGORIES = ["Photos", "Screenshots", "Documents", "Art", "Memes", "Other"]
+    
+    # Moondream encodes 378px crops; 756px covers its 2x2 tiling
+    VISION_MAX_SIDE = 756
+    
     def __init__(self, api_url: str = "http://localhost:11434/v1/chat/completions",
-                 text_model: str = "qwen2.5:0.5b", vision_model: str = "moondream"):
+                 text_model: str = "qwen2.5:0.5b", vision_model: str = "moondream",
+                 pool_size: int = 4, ram_budget_mb: int = 4096,
+                 model_memory_mb: dict = None):
         self.api_url = api_url
         self.logger = logging.getLogger("LocalAIHost")
         self.model_loaded = False
         self.current_model = None
         
+        # Endpoints (computed once, not per call). Text requests use the native
+        # /api/chat: unlike the OpenAI-compatible api_url it honours keep_alive
+        self.chat_url = api_url.replace("/v1/chat/completions", "/api/chat")
+        self.generate_url = api_url.replace("/v1/chat/completions", "/api/generate")
+        self.ps_url = api_url.replace("/v1/chat/completions", "/api/ps")
+        
         # Model configs
         self.text_model = text_model
         self.vision_model = vision_model
+        
+        # Shared keep-alive session; one pooled connection per worker thread
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Tracks resident models and groups requests by model
+        self.residency = ModelResidencyManager(
+            self._load_for_residency, self._unload, ram_budget_mb, model_memory_mb
+        )
     
-    def load_model(self, model_name: str = None) -> bool:
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+    
+    def load_model(self, model_name: str = None, keep_alive: str = "5m", read_timeout: float = 30) -> bool:
         """
         Load a model into Ollama memory.
         Uses Ollama's /api/generate with keep_alive to preload.
@@ -34,98 +82,279 @@ class LocalAIHost:
         model = model_name or self.text_model
         try:
             # Ollama preload endpoint
-            response = requests.post(
-                self.api_url.replace("/v1/chat/completions", "/api/generate"),
-                json={"model": model, "prompt": "", "keep_alive": "5m"},
-                timeout=30
+            response = self.session.post(
+                self.generate_url,
+                json={"model": model, "prompt": "", "keep_alive": keep_alive},
+                timeout=(self.CONNECT_TIMEOUT, read_timeout)
             )
             if response.status_code == 200:
                 self.model_loaded = True
                 self.current_model = model
-                self.logger.info(f"Model loaded: {model}")
+                self.logger.info(f"Model loaded: {model} (keep_alive {keep_alive})")
+                self._refresh_model_sizes()
                 return True
         except Exception as e:
             self.logger.error(f"Failed to load model: {e}")
         return False
     
-    def unload_model(self) -> bool:
-        """
-        Unload model from Ollama memory.
-        Uses keep_alive: 0 to immediately unload.
-        """
-        if not self.current_model:
-            return True
-            
+    def _load_for_residency(self, model: str, keep_alive_seconds: int, deadline: Deadline = None) -> bool:
+        """Loader callback for the residency manager; the preload counts against the file's deadline."""
+        read_timeout = deadline.timeout(30) if deadline else 30
+        return self.load_model(model, f"{keep_alive_seconds}s", read_timeout)
+    
+    def _refresh_model_sizes(self):
+        """Record actual resident sizes reported by Ollama's /api/ps."""
+        try:
+            response = self.session.get(self.ps_url, timeout=(self.CONNECT_TIMEOUT, 5))
+            if response.status_code == 200:
+                for entry in response.json().get("models", []):
+                    self.residency.record_size(entry["name"], entry["size"] // (1024 * 1024))
+        except Exception as e:
+            self.logger.debug(f"Could not read model sizes: {e}")
+    
+    def _unload(self, model: str) -> bool:
+        """Drop one model from Ollama memory with keep_alive: 0."""
         try:
-            response = requests.post(
-                self.api_url.replace("/v1/chat/completions", "/api/generate"),
-                json={"model": self.current_model, "prompt": "", "keep_alive": "0"},
-                timeout=10
+            response = self.session.post(
+                self.generate_url,
+                json={"model": model, "prompt": "", "keep_alive": "0"},
+                timeout=(self.CONNECT_TIMEOUT, 10)
             )
             if response.status_code == 200:
-                self.model_loaded = False
-                self.logger.info(f"Model unloaded: {self.current_model}")
-                self.current_model = None
-                gc.collect()
+                self.logger.info(f"Model unloaded: {model}")
+                if model == self.current_model:
+                    self.current_model = None
                 return True
         except Exception as e:
             self.logger.error(f"Failed to unload model: {e}")
         return False
     
-    def classify_text_qwen(self, filename: str) -> str:
+    def unload_model(self) -> bool:
+        """
+        Unload every resident model from Ollama memory.
+        Uses keep_alive: 0 to immediately unload.
+        """
+        ok = self.residency.unload_all()
+        if self.current_model:
+            ok = self._unload(self.current_model) and ok
+        if ok:
+            self.model_loaded = False
+            gc.collect()
+        return ok
+    
+    def _generation_options(self, max_tokens: int, single_line: bool = True) -> dict:
+        """
+        Bounded, deterministic sampling for short classification answers.
+        Single-line answers also stop at the first newline; multi-line ones
+        (a pretty-printed JSON array) must not.
+        """
+        options = {"num_predict": max_tokens, "temperature": 0}
+        if single_line:
+            options["stop"] = ["\n"]
+        return options
+    
+    def _text_request(self, prompt: str, max_tokens: int, stream: bool = False,
+                      single_line: bool = True, **extra) -> dict:
+        """
+        /api/chat payload for the text model. Every request carries the predicted
+        keep_alive; without it Ollama resets the model to its 5m default.
+        """
+        return {
+            "model": self.text_model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": stream,
+            "keep_alive": f"{self.residency.keep_alive_for(self.text_model)}s",
+            "options": self._generation_options(max_tokens, single_line),
+            **extra
+        }
+    
+    def _batch_tokens(self, count: int) -> int:
+        """Token budget for a JSON array of `count` category names."""
+        return (self.MAX_CATEGORY_TOKENS + self.BATCH_ITEM_SYNTAX_TOKENS) * count + self.BATCH_ARRAY_SYNTAX_TOKENS
+    
+    def classify_text_qwen(self, filename: str, deadline: Deadline = None) -> str:
         """
         Classify file using Qwen text model.
+        Streams the answer and stops reading as soon as a known category is complete.
+        Raises DeadlineExceeded if `deadline` passes first.
         """
         prompt = f"""Classify this filename into a category.
 Return ONLY the category name.
-Categories: Documents, Images, Videos, Audio, Archives, Installers, Code, Financial, Other
+Categories: {", ".join(self.TEXT_CATEGORIES)}
 
 Filename: {filename}
 Category:"""
         
         try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "model": self.text_model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream": False
-                },
-                timeout=30
-            )
+            with self.residency.use(self.text_model, deadline):
+                return self._stream_classification(prompt, filename, deadline)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if deadline and deadline.expired():
+                # The clipped read timeout fired, not a server failure
+                raise DeadlineExceeded("file deadline exceeded") from e
+            self.logger.error(f"Qwen classification error: {e}")
+        
+        return "Other"
+    
+    def _stream_classification(self, prompt: str, filename: str, deadline: Deadline = None) -> str:
+        """Send a single-file prompt and read the streamed category."""
+        read_timeout = deadline.timeout(30) if deadline else 30
+        response = self.session.post(
+            self.chat_url,
+            json=self._text_request(prompt, self.MAX_CATEGORY_TOKENS, stream=True),
+            timeout=(self.CONNECT_TIMEOUT, read_timeout),
+            stream=True
+        )
+        with response:
+            if response.status_code != 200:
+                return "Other"
+            category = self._read_streamed_category(response, deadline)
+        self.logger.info(f"Qwen classified '{filename}' as '{category}'")
+        return category
+    
+    def _read_streamed_category(self, response, deadline: Deadline = None) -> str:
+        """Consume an /api/chat stream (one JSON object per line) until the answer names a category."""
+        text = ""
+        for line in response.iter_lines(decode_unicode=True):
+            if deadline:
+                deadline.check()
+            if not line:
+                continue
+            chunk = json.loads(line)
+            text += chunk.get("message", {}).get("content") or ""
+            if chunk.get("done"):
+                break
+            category = match_streamed_category(text, self.TEXT_CATEGORIES)
+            if category:
+                # Leaving the stream closes the connection; the server stops generating
+                return category
+        return normalize_category(text, self.TEXT_CATEGORIES)
+    
+    def classify_with_confidence(self, filename: str, deadline: Deadline = None) -> tuple[str, float]:
+        """
+        Classify file with Qwen and estimate how sure the model is (0.0-1.0).
+        Uses token logprobs when the server returns them, otherwise the
+        model's self-reported score. Unparseable answers get confidence 0.
+        """
+        prompt = f"""Classify this filename into a category.
+Return ONLY the category name and your confidence from 0 to 100, as: Category | confidence
+Categories: {", ".join(self.TEXT_CATEGORIES)}
+
+Filename: {filename}
+Answer:"""
+        
+        try:
+            with self.residency.use(self.text_model, deadline):
+                response = self.session.post(
+                    self.chat_url,
+                    json=self._text_request(prompt, self.MAX_CATEGORY_TOKENS + 4, logprobs=True),
+                    timeout=(self.CONNECT_TIMEOUT, deadline.timeout(30) if deadline else 30)
+                )
             if response.status_code == 200:
                 result = response.json()
-                category = result["choices"][0]["message"]["content"].strip()
-                self.logger.info(f"Qwen classified '{filename}' as '{category}'")
-                return category
+                answer = result["message"]["content"]
+                category = normalize_category(answer.split("|")[0], self.TEXT_CATEGORIES, default=None)
+                if category is None:
+                    return "Other", 0.0
+                confidence = self._confidence(answer, result.get("logprobs"))
+                self.logger.info(f"Qwen classified '{filename}' as '{category}' ({confidence:.2f})")
+                return category, confidence
+        except DeadlineExceeded:
+            raise
         except Exception as e:
+            if deadline and deadline.expired():
+                raise DeadlineExceeded("file deadline exceeded") from e
             self.logger.error(f"Qwen classification error: {e}")
         
-        return "Other"
+        return "Other", 0.0
+    
+    def _confidence(self, answer: str, logprobs: list | None) -> float:
+        """Probability of the category tokens, or the self-reported score."""
+        tokens = logprobs or []
+        if tokens:
+            total = 0.0
+            for token in tokens:
+                if "|" in token.get("token", ""):
+                    break  # only the category part counts
+                total += token.get("logprob", 0.0)
+            return math.exp(total)
+        
+        _, _, reported = answer.partition("|")
+        try:
+            return max(0.0, min(1.0, float(reported.strip().rstrip("%")) / 100))
+        except ValueError:
+            return 0.0
+    
+    def classify_batch(self, filenames: list[str], deadline: Deadline = None) -> list[str | None]:
+        """
+        Classify several filenames with a single Qwen prompt.
+        Returns one category per filename; None where the answer was unusable.
+        Raises DeadlineExceeded if `deadline` passes first.
+        """
+        prompt = f"""Classify each filename into a category.
+Return ONLY a JSON array of category names, one per filename, in the same order.
+Categories: {", ".join(self.TEXT_CATEGORIES)}
+
+Filenames: {json.dumps(filenames)}
+Categories:"""
+        
+        # Constrain decoding to an array of exactly len(filenames) known categories
+        schema = {
+            "type": "array",
+            "items": {"type": "string", "enum": self.TEXT_CATEGORIES},
+            "minItems": len(filenames),
+            "maxItems": len(filenames)
+        }
+        
+        try:
+            with self.residency.use(self.text_model, deadline):
+                response = self.session.post(
+                    self.chat_url,
+                    json=self._text_request(prompt, self._batch_tokens(len(filenames)), single_line=False,
+                                            format=schema),
+                    timeout=(self.CONNECT_TIMEOUT, deadline.timeout(30) if deadline else 30)
+                )
+            if response.status_code == 200:
+                content = response.json()["message"]["content"]
+                return parse_batch_response(content, len(filenames), self.TEXT_CATEGORIES)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if deadline and deadline.expired():
+                raise DeadlineExceeded("file deadline exceeded") from e
+            self.logger.error(f"Qwen batch classification error: {e}")
+        
+        return [None] * len(filenames)
     
     def analyze_image_moondream(self, image_path: str) -> str:
         """
         Analyze image using Moondream vision model.
         Note: Requires base64 encoding of image for Ollama vision.
+        The image is downscaled first; originals are never sent whole.
         """
         
         try:
-            with open(image_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode("utf-8")
+            thumbnail, _ = prepare_image(image_path, self.VISION_MAX_SIDE)
+            image_data = base64.b64encode(thumbnail).decode("utf-8")
             
-            response = requests.post(
-                self.api_url.replace("/v1/chat/completions", "/api/generate"),
-                json={
-                    "model": self.vision_model,
-                    "prompt": "What category does this image belong to? Return only: Photos, Screenshots, Documents, Art, Memes, Other",
-                    "images": [image_data],
-                    "stream": False
-                },
-                timeout=60
-            )
+            with self.residency.use(self.vision_model):
+                response = self.session.post(
+                    self.generate_url,
+                    json={
+                        "model": self.vision_model,
+                        "prompt": f"What category does this image belong to? Return only: {', '.join(self.IMAGE_CATEGORIES)}",
+                        "images": [image_data],
+                        "stream": False,
+                        "keep_alive": f"{self.residency.keep_alive_for(self.vision_model)}s",
+                        "options": self._generation_options(self.MAX_CATEGORY_TOKENS)
+                    },
+                    timeout=(self.CONNECT_TIMEOUT, 60)
+                )
             if response.status_code == 200:
                 result = response.json()
-                category = result.get("response", "Other").strip()
+                category = normalize_category(result.get("response", ""), self.IMAGE_CATEGORIES)
                 self.logger.info(f"Moondream analyzed image as '{category}'")
                 return category
         except Exception as e:
@@ -133,9 +362,9 @@ Category:"""
         
         return "Images"
     
-    def classify(self, filename: str) -> str:
+    def classify(self, filename: str, deadline: Deadline = None) -> str:
         """
         Main classification entry point.
         Uses text model by default.
         """
-        return self.classify_text_qwen(filename)
+        return self.classify_text_qwen(filename, deadline)
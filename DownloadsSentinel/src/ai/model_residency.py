@@ -0,0 +1,234 @@
+"""
+ModelResidencyManager - Ollama RAM Scheduler
+
+Tracks which local models are resident and what they cost, and gates AI
+work so requests for the resident model run before a swap is paid for.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from ai.deadline import Deadline, DeadlineExceeded
+
+
+class ResidentModel:
+    """Bookkeeping for one model Ollama currently holds in memory."""
+
+    def __init__(self, name: str, memory_mb: int, keep_alive: int, now: float):
+        self.name = name
+        self.memory_mb = memory_mb
+        self.keep_alive = keep_alive
+        self.last_used = now
+
+    def expired(self, now: float) -> bool:
+        """Ollama drops the model on its own once keep_alive passes unused."""
+        return now - self.last_used > self.keep_alive
+
+
+class ModelResidencyManager:
+    """
+    Groups AI work by model to minimize load/unload swaps.
+
+    Callers wrap each model request in `with manager.use(model):`. Requests
+    for models that fit in the RAM budget alongside the busy ones run
+    immediately. Otherwise they wait until the busy model's current batch
+    drains, unless they have waited longer than MAX_WAIT (starvation guard).
+    """
+
+    DEFAULT_MODEL_MB = 1024
+    MIN_KEEP_ALIVE = 30    # seconds
+    MAX_KEEP_ALIVE = 600   # seconds
+    KEEP_ALIVE_FACTOR = 3  # keep a model for ~3 expected arrival gaps
+    MAX_WAIT = 10          # seconds a swap may be deferred for the resident model
+
+    def __init__(self, loader, unloader, ram_budget_mb: int = 4096,
+                 model_memory_mb: dict = None, monotonic=time.monotonic):
+        self.loader = loader        # loader(model, keep_alive_seconds, deadline) -> bool
+        self.unloader = unloader    # unloader(model) -> bool
+        self.ram_budget_mb = ram_budget_mb
+        self.model_memory_mb = dict(model_memory_mb or {})
+        self.logger = logging.getLogger("ModelResidency")
+        self._now = monotonic     # clock for expiry and arrival gaps (tests pass a fake one)
+
+        self.resident = {}        # model -> ResidentModel
+        self._active = {}         # model -> running requests
+        self._waiting = {}        # model -> list of wait start times
+        self._arrival_gap = {}    # model -> EWMA of seconds between requests
+        self._last_arrival = {}
+        self._cond = threading.Condition()
+        self._load_locks = {}
+        self.swap_count = 0
+
+    # ---- Accounting ----
+
+    def memory_cost(self, model: str) -> int:
+        """Known (or assumed) resident size of a model in MB."""
+        return self.model_memory_mb.get(model, self.DEFAULT_MODEL_MB)
+
+    def record_size(self, model: str, memory_mb: int):
+        """Update a model's cost from what the server reports."""
+        with self._cond:
+            self.model_memory_mb[model] = memory_mb
+            if model in self.resident:
+                self.resident[model].memory_mb = memory_mb
+
+    def resident_memory_mb(self) -> int:
+        with self._cond:
+            self._expire()
+            return sum(m.memory_mb for m in self.resident.values())
+
+    def keep_alive_for(self, model: str) -> int:
+        """
+        Keep-alive in seconds from the model's predicted arrival rate.
+        Frequent requests keep the model warm; rare ones release RAM quickly.
+        """
+        gap = self._arrival_gap.get(model)
+        if gap is None:
+            return self.MIN_KEEP_ALIVE
+        keep_alive = gap * self.KEEP_ALIVE_FACTOR
+        if keep_alive > self.MAX_KEEP_ALIVE:
+            # Next request is unlikely before we would drop it anyway
+            return self.MIN_KEEP_ALIVE
+        return int(max(self.MIN_KEEP_ALIVE, keep_alive))
+
+    def _record_arrival(self, model: str, now: float):
+        last = self._last_arrival.get(model)
+        self._last_arrival[model] = now
+        if last is None:
+            return
+        gap = now - last
+        previous = self._arrival_gap.get(model)
+        self._arrival_gap[model] = gap if previous is None else 0.3 * gap + 0.7 * previous
+
+    def _expire(self):
+        now = self._now()
+        for name in [n for n, m in self.resident.items()
+                     if m.expired(now) and not self._active.get(n)]:
+            del self.resident[name]
+
+    # ---- Scheduling ----
+
+    def _busy_models(self, exclude: str) -> list[str]:
+        return [m for m, count in self._active.items() if count and m != exclude]
+
+    def _fits(self, model: str) -> bool:
+        """Whether `model` can be resident alongside every model in use."""
+        needed = {model, *self._busy_models(model)}
+        return sum(self.memory_cost(m) for m in needed) <= self.ram_budget_mb
+
+    def _starving(self, now: float) -> str | None:
+        """A model whose oldest waiter has been deferred longer than MAX_WAIT."""
+        for model, starts in self._waiting.items():
+            if starts and now - starts[0] > self.MAX_WAIT:
+                return model
+        return None
+
+    def _can_run(self, model: str) -> bool:
+        starving = self._starving(self._now())
+        if starving and starving != model and not self._fits_both(model, starving):
+            return False  # Let the starved model's swap happen first
+        if self._fits(model):
+            return True
+        # A swap is needed: wait for the busy models to drain
+        return not self._busy_models(model)
+
+    def _fits_both(self, a: str, b: str) -> bool:
+        return self.memory_cost(a) + self.memory_cost(b) <= self.ram_budget_mb
+
+    @contextmanager
+    def use(self, model: str, deadline: Deadline = None):
+        """Hold `model` resident for the duration of one request."""
+        self.acquire(model, deadline)
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def acquire(self, model: str, deadline: Deadline = None):
+        """
+        Wait for `model`'s turn and make sure it is loaded.
+        Raises DeadlineExceeded if `deadline` passes while waiting or loading.
+        """
+        with self._cond:
+            now = self._now()
+            self._record_arrival(model, now)
+            waiters = self._waiting.setdefault(model, [])
+            waiters.append(now)
+            try:
+                while not self._can_run(model):
+                    # Wake periodically for the starvation check, never past the deadline
+                    self._cond.wait(timeout=deadline.timeout(1) if deadline else 1)
+            except DeadlineExceeded:
+                waiters.remove(now)
+                self._cond.notify_all()  # A starved waiter may have been holding others back
+                raise
+            waiters.remove(now)
+            self._active[model] = self._active.get(model, 0) + 1
+            load_lock = self._load_locks.setdefault(model, threading.Lock())
+
+        # Loading takes seconds; do it outside the condition
+        try:
+            lock_timeout = deadline.timeout(None) if deadline else None
+            if not load_lock.acquire(timeout=-1 if lock_timeout is None else lock_timeout):
+                raise DeadlineExceeded("file deadline exceeded")
+            try:
+                self._ensure_resident(model, deadline)
+            finally:
+                load_lock.release()
+        except BaseException:
+            self.release(model)
+            raise
+
+    def release(self, model: str):
+        with self._cond:
+            self._active[model] -= 1
+            if model in self.resident:
+                self.resident[model].last_used = self._now()
+            self._cond.notify_all()
+
+    def _ensure_resident(self, model: str, deadline: Deadline = None):
+        """Evict idle models until `model` fits, then load or refresh it."""
+        keep_alive = self.keep_alive_for(model)
+        with self._cond:
+            self._expire()
+            entry = self.resident.get(model)
+            # Refresh when the predicted keep-alive has drifted noticeably
+            if entry and abs(entry.keep_alive - keep_alive) <= entry.keep_alive // 4:
+                entry.last_used = self._now()
+                return
+            evict = []
+            if not entry:
+                used = sum(m.memory_mb for m in self.resident.values())
+                idle = sorted((m for m in self.resident.values() if not self._active.get(m.name)),
+                              key=lambda m: m.last_used)
+                for candidate in idle:
+                    if used + self.memory_cost(model) <= self.ram_budget_mb:
+                        break
+                    evict.append(candidate.name)
+                    used -= candidate.memory_mb
+                    del self.resident[candidate.name]
+
+        for name in evict:
+            self.logger.info(f"Evicting {name} to fit {model}")
+            self.unloader(name)
+
+        if self.loader(model, keep_alive, deadline):
+            with self._cond:
+                if model not in self.resident:
+                    self.swap_count += 1
+                    self.resident[model] = ResidentModel(model, self.memory_cost(model), keep_alive,
+                                                         self._now())
+                else:
+                    self.resident[model].keep_alive = keep_alive
+                    self.resident[model].last_used = self._now()
+
+    def unload_all(self) -> bool:
+        """Drop every tracked model (idle cleanup)."""
+        with self._cond:
+            names = list(self.resident)
+            self.resident.clear()
+        ok = True
+        for name in names:
+            ok = self.unloader(name) and ok
+        return ok
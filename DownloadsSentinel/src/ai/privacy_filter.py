@@ -25,7 +25,8 @@ class PrivacyFilter:
         lower_name = filename.lower()
         for keyword in self.sensitive_keywords:
             if keyword in lower_name:
-                self.logger.info(f"Privacy Airlock Triggered: '{keyword}' in '{filename}'")
+                # Per-file and on the hot path; the engine logs the routing decision
+                self.logger.debug(f"Privacy Airlock Triggered: '{keyword}' in '{filename}'")
                 return True
         return False
     
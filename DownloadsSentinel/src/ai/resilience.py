@@ -0,0 +1,174 @@
+"""
+Resilience helpers for Tier 3 cloud calls.
+
+Token-bucket rate limiting, retry with exponential backoff and jitter,
+and a circuit breaker so an outage degrades to cheaper tiers instead of
+being hammered by every worker thread.
+"""
+import logging
+import random
+import threading
+import time
+
+from ai.deadline import Deadline, DeadlineExceeded
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class AIUnavailableError(Exception):
+    """The AI backend cannot serve requests right now (breaker open, quota, outage)."""
+
+
+class TokenBucket:
+    """Classic token bucket: `rate_per_minute` tokens refill continuously up to `capacity`."""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """Take `tokens`, waiting up to `timeout` seconds. Returns False on timeout."""
+        tokens = min(tokens, self.capacity)  # an oversized request still gets through eventually
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def refund(self, tokens: float = 1):
+        """Return tokens taken for work that never happened."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class CircuitBreaker:
+    """
+    CLOSED: requests flow. After `failure_threshold` consecutive failures -> OPEN.
+    OPEN: requests are rejected until `reset_timeout` passes -> HALF_OPEN.
+    HALF_OPEN: one trial request; success closes, failure re-opens.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60, name: str = "breaker"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.logger = logging.getLogger(name)
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be attempted now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            # HALF_OPEN: let exactly one trial request through
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                self.logger.info("Circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def abandon(self):
+        """A request ended without telling us anything about the backend."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.logger.warning(f"Circuit opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Transient errors worth retrying: throttling, server errors, network hiccups."""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx  # transport used by google-genai
+        return isinstance(exc, httpx.TransportError)
+    except ImportError:
+        return False
+
+
+def call_with_retry(func, breaker: CircuitBreaker, max_attempts: int = 3,
+                    base_delay: float = 1.0, max_delay: float = 20.0, sleep=time.sleep,
+                    deadline: Deadline = None):
+    """
+    Call `func()` under `breaker`, retrying transient errors with full-jitter
+    exponential backoff. Raises AIUnavailableError when the backend is out.
+    Non-retryable errors (bad request, parse failures) propagate unchanged.
+    With a `deadline`, gives up with DeadlineExceeded instead of sleeping past it.
+    """
+    for attempt in range(max_attempts):
+        if not breaker.allow():
+            raise AIUnavailableError("circuit open")
+        try:
+            result = func()
+        except Exception as e:
+            if deadline and deadline.expired():
+                # Our own clipped timeout fired; that says nothing about the backend
+                breaker.abandon()
+                raise DeadlineExceeded("file deadline exceeded") from e
+            if not is_retryable(e):
+                breaker.record_success()  # the backend answered; it is up
+                raise
+            breaker.record_failure()
+            if attempt == max_attempts - 1:
+                raise AIUnavailableError(f"gave up after {max_attempts} attempts: {e}") from e
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if deadline and deadline.remaining() is not None and delay >= deadline.remaining():
+                raise DeadlineExceeded("no time left to retry") from e
+            sleep(delay)
+            continue
+        breaker.record_success()
+        return result
@@ -21,6 +21,9 @@ class RuleEngine:
             ".7z": "Archives",
             ".tar": "Archives",
             ".gz": "Archives",
+            ".tgz": "Archives",
+            ".bz2": "Archives",
+            ".xz": "Archives",
             # Images
             ".jpg": "Images",
             ".jpeg": "Images",
@@ -61,6 +64,23 @@ class RuleEngine:
             ".h": "Code",
         }
         
+        # Leading magic bytes -> category, for files with missing/unknown extensions
+        self.signatures = [
+            (b"%PDF", "Documents"),
+            (b"\x89PNG", "Images"),
+            (b"\xff\xd8\xff", "Images"),
+            (b"GIF8", "Images"),
+            (b"PK\x03\x04", "Archives"),
+            (b"\x1f\x8b", "Archives"),
+            (b"7z\xbc\xaf\x27\x1c", "Archives"),
+            (b"Rar!", "Archives"),
+            (b"MZ", "Installers"),
+            (b"ID3", "Audio"),
+            (b"fLaC", "Audio"),
+            (b"OggS", "Audio"),
+            (b"\x1a\x45\xdf\xa3", "Videos"),
+        ]
+        
         self.keyword_map = {
             "invoice": "Financial",
             "receipt": "Financial",
@@ -88,6 +108,24 @@ class RuleEngine:
                 return category
         return None
     
+    def sniff_content(self, file_path: str) -> str | None:
+        """
+        Match file by its leading magic bytes.
+        Returns category or None if unknown or unreadable.
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(16)
+        except OSError:
+            return None
+        for magic, category in self.signatures:
+            if head.startswith(magic):
+                return category
+        # ISO base media (mp4/mov/m4a...): 'ftyp' box at offset 4
+        if head[4:8] == b"ftyp":
+            return "Videos"
+        return None
+    
     def classify(self, filename: str) -> str | None:
         """
         Attempt Tier 1 classification.
@@ -3,37 +3,151 @@ WorkflowEngine - The Router
 
 Decides the path of the file based on config (Tier 1 → Tier 2 → Tier 3).
 """
+import collections
+import contextlib
 import os
+import queue
 import shutil
+import threading
 import time
 import logging
 
 from ai.rule_engine import RuleEngine
+from ai.archive_inspector import ArchiveInspector
 from ai.privacy_filter import PrivacyFilter
-from ai.gemini_client import GeminiClient
-from ai.local_client import LocalAIHost
+from ai.batcher import ClassificationBatcher
+from ai.resilience import AIUnavailableError
+from ai.deadline import Deadline, DeadlineExceeded
+from core.metrics import FILES_METRIC, registry
+from core.roots import parse_roots, root_for
 
 
 class WorkflowEngine:
     """The router. Decides the path of the file through the tiers."""
     
-    def __init__(self, config: dict, secrets: dict):
+    def __init__(self, config: dict, secrets: dict, max_concurrency: int = 4):
         self.config = config
         self.secrets = secrets
+        self.max_concurrency = max_concurrency  # worker threads sharing this engine
         self.logger = logging.getLogger("WorkflowEngine")
         
         # Initialize tier engines
-        sensitive_keywords = config.get("privacy", {}).get("sensitive_keywords", [])
         self.rule_engine = RuleEngine()
-        self.privacy_filter = PrivacyFilter(sensitive_keywords)
+        self.privacy_filter = PrivacyFilter(config.get("privacy", {}).get("sensitive_keywords", []))
         
         # Tier 3 clients (lazy loaded)
         self._gemini_client = None
         self._local_client = None
         
+        # Tier 3 micro-batching (filename-only prompts)
+        self._gemini_batcher = None
+        self._local_batcher = None
+        
+        # Tier 2: filename model learned from past Tier 3 decisions
+        self._learned_model = None
+        self._learned_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        
+        # Per-tier hit counters
+        self.tier_counts = collections.Counter()
+        self._counts_lock = threading.Lock()
+        
+        # Optional TaskProfiler, LiveStats and FileIndex (set by the worker)
+        self.profiler = None
+        self.live_stats = None
+        self.file_index = None
+        
+        # Stage latency histograms (shipped to the master by the worker)
+        self._decision_time = registry.stage("tier_decision")
+        self._ai_time = registry.stage("ai_call")
+        self._move_time = registry.stage("move")
+        
+        # Deadline re-filing happens in the background
+        self._reclassify_queue = queue.Queue()
+        self._reclassify_thread = None
+        self._reclassify_lock = threading.Lock()
+        
+        self._read_settings(config)
+    
+    def _read_settings(self, config: dict):
+        """Plain settings; re-read on every hot config reload."""
+        ai_config = config.get("ai", {})
+        
+        # Watched folders; a file's root may carry its own filename rules
+        self.roots = parse_roots(config)
+        
+        self.batch_window_ms = ai_config.get("batch_window_ms", 50)
+        self.batch_max_size = ai_config.get("batch_max_size", 8)
+        
         # AI mode from config
-        self.ai_mode = config.get("privacy", {}).get("mode", "CLOUD")  # CLOUD, LOCAL, RULES_ONLY
-        self.ai_enabled = config.get("ai", {}).get("enabled", False)
+        self.ai_mode = config.get("privacy", {}).get("mode", "CLOUD")  # CLOUD, LOCAL, CASCADE, RULES_ONLY
+        self.ai_enabled = ai_config.get("enabled", False)
+        # CASCADE: local answers below this confidence are escalated to the cloud
+        self.cascade_threshold = ai_config.get("cascade_threshold", 0.7)
+        
+        self.learned_enabled = ai_config.get("learned_enabled", True)
+        self.learned_threshold = ai_config.get("learned_threshold", 0.9)
+        self.learned_min_samples = ai_config.get("learned_min_samples", 50)
+        self.learned_save_every = ai_config.get("learned_save_every", 25)
+        self.learned_model_path = ai_config.get("learned_model_path") or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+            'config', 'filename_model.npz'
+        )
+        
+        # Per-file latency budget for Tier 3, with optional re-filing later
+        self.file_deadline = config.get("performance", {}).get("file_deadline_seconds", 10)
+        self.background_reclassify = config.get("performance", {}).get("background_reclassify", True)
+        
+        # Tier 2: archives filed by what they hold (None when archives.inspect is off)
+        self.archive_inspector = ArchiveInspector.from_config(config, self.rule_engine)
+    
+    def apply_config(self, config: dict, changed_keys) -> list[str]:
+        """
+        Hot reload: take a new config and rebuild only what the changed
+        dotted keys (e.g. "privacy.sensitive_keywords") affect. Clients
+        whose settings did not change keep their connections and loaded
+        models. Returns the names of the rebuilt components.
+        """
+        changed = set(changed_keys)
+        
+        def touched(*prefixes):
+            return any(key == p or key.startswith(p + ".") for key in changed for p in prefixes)
+        
+        rebuilt = []
+        if touched("ai.learned_enabled", "ai.learned_model_path", "ai.learned_min_samples"):
+            self.save_learned_model()  # to the old path, before the settings change
+            self._learned_model = None
+            rebuilt.append("learned_model")
+        
+        self.config = config
+        self._read_settings(config)
+        
+        if touched("privacy.sensitive_keywords"):
+            self.privacy_filter = PrivacyFilter(config.get("privacy", {}).get("sensitive_keywords", []))
+            rebuilt.append("privacy_filter")
+        
+        if touched("ai.model_name", "ai.gemini_rpm", "ai.gemini_tpm", "ai.gemini_base_url"):
+            # In-flight calls finish on the old client; new calls build a new one
+            self._gemini_client = None
+            self._gemini_batcher = None
+            rebuilt.append("gemini_client")
+        
+        if touched("ai.local_url", "ai.text_model", "ai.vision_model",
+                   "ai.ram_budget_mb", "ai.model_memory_mb"):
+            self._local_client = None
+            self._local_batcher = None
+            rebuilt.append("local_client")
+        
+        if touched("ai.batch_window_ms", "ai.batch_max_size"):
+            self._gemini_batcher = None
+            self._local_batcher = None
+            rebuilt.append("batchers")
+        
+        if rebuilt:
+            self.logger.info(f"Config reloaded, rebuilt: {', '.join(rebuilt)}")
+        else:
+            self.logger.info("Config reloaded")
+        return rebuilt
     
     @property
     def gemini_client(self):
@@ -42,7 +156,14 @@ class WorkflowEngine:
             api_key = self.secrets.get("GEMINI_API_KEY", "")
             model_name = self.config.get("ai", {}).get("model_name", "gemini-1.5-flash")
             if api_key:
-                self._gemini_client = GeminiClient(api_key, model_name)
+                from ai.gemini_client import GeminiClient  # google-genai is heavy; CLOUD only
+                ai_config = self.config.get("ai", {})
+                self._gemini_client = GeminiClient(
+                    api_key, model_name,
+                    rpm=ai_config.get("gemini_rpm", 15),
+                    tpm=ai_config.get("gemini_tpm", 1_000_000),
+                    base_url=ai_config.get("gemini_base_url")
+                )
         return self._gemini_client
     
     @property
@@ -52,58 +173,281 @@ class WorkflowEngine:
             local_url = self.config.get("ai", {}).get("local_url", "http://localhost:11434/v1/chat/completions")
             text_model = self.config.get("ai", {}).get("text_model", "qwen2.5:0.5b")
             vision_model = self.config.get("ai", {}).get("vision_model", "moondream")
-            self._local_client = LocalAIHost(local_url, text_model, vision_model)
+            from ai.local_client import LocalAIHost
+            self._local_client = LocalAIHost(
+                local_url, text_model, vision_model, pool_size=self.max_concurrency,
+                ram_budget_mb=self.config.get("ai", {}).get("ram_budget_mb", 4096),
+                model_memory_mb=self.config.get("ai", {}).get("model_memory_mb")
+            )
         return self._local_client
     
-    def route_to_engine(self, file_path: str) -> tuple[str, str]:
+    @property
+    def learned_model(self):
+        """Lazy-load the Tier 2 filename model (None without NumPy or when disabled)."""
+        if self._learned_model is None and self.learned_enabled:
+            from ai.filename_model import FilenameClassifier, numpy_available  # NumPy on first use
+            if not numpy_available():
+                return None
+            with self._learned_lock:
+                if self._learned_model is None:
+                    try:
+                        self._learned_model = FilenameClassifier.load(
+                            self.learned_model_path, self.learned_min_samples)
+                    except Exception as e:
+                        self.logger.error(f"Could not load filename model, starting fresh: {e}")
+                        self._learned_model = FilenameClassifier(min_samples=self.learned_min_samples)
+        return self._learned_model
+    
+    def _learn(self, filename: str, category: str):
+        """Feed a Tier 3 decision to the filename model, saving every few updates."""
+        model = self.learned_model
+        if model is None or category in (None, "Other"):
+            return  # "Other" is also what failed AI calls return; don't learn it
+        model.learn(filename, category)
+        if model.unsaved >= self.learned_save_every:
+            self.save_learned_model()
+    
+    def save_learned_model(self):
+        """Persist the filename model if it has unsaved updates."""
+        with self._save_lock:  # Task threads hit the save threshold together; one writes
+            if self._learned_model is not None and self._learned_model.unsaved:
+                try:
+                    self._learned_model.save(self.learned_model_path)
+                except OSError as e:
+                    self.logger.error(f"Could not save filename model: {e}")
+    
+    @property
+    def gemini_batcher(self):
+        """Lazy-load the batcher in front of the Gemini client."""
+        if self._gemini_batcher is None and self.gemini_client:
+            self._gemini_batcher = ClassificationBatcher(
+                self.gemini_client, self.batch_window_ms, self.batch_max_size
+            )
+        return self._gemini_batcher
+    
+    @property
+    def local_batcher(self):
+        """Lazy-load the batcher in front of the Local AI client."""
+        if self._local_batcher is None and self.local_client:
+            self._local_batcher = ClassificationBatcher(
+                self.local_client, self.batch_window_ms, self.batch_max_size
+            )
+        return self._local_batcher
+    
+    def ai_metrics(self) -> dict:
+        """Cloud breaker state and queued requests (empty until Gemini is used)."""
+        if self._gemini_client is None:
+            return {}
+        return {f"gemini_{k}": v for k, v in self._gemini_client.metrics().items()}
+    
+    def tier_metrics(self) -> dict:
+        """How many files each tier has answered since the engine was created."""
+        with self._counts_lock:
+            return dict(self.tier_counts)
+    
+    def route_to_engine(self, file_path: str, deadline: Deadline = None) -> tuple[str, str]:
         """
         Route file through tiers and return (category, tier_used).
         file_path: Full path to the file (needed for content analysis)
+        deadline: latency budget for slow tiers (default: performance.file_deadline_seconds)
         """
+        start = time.perf_counter()
+        category, tier = self._route(file_path, deadline)
+        self._decision_time.observe_since(start)
+        with self._counts_lock:
+            self.tier_counts[tier] += 1
+        registry.counter(FILES_METRIC, tier=tier).inc()
+        if self.live_stats is not None:
+            self.live_stats.count_tier(tier)
+        if tier.startswith("Tier3"):
+            self._learn(os.path.basename(file_path), category)
+        return category, tier
+    
+    def _route(self, file_path: str, deadline: Deadline = None) -> tuple[str | None, str]:
+        """Tier walk behind route_to_engine."""
         filename = os.path.basename(file_path)
         
         # Tier 0: Privacy Filter (Highest Priority)
         if self.privacy_filter.is_sensitive(filename):
             return self.privacy_filter.get_secure_destination(), "Tier0_Privacy"
         
-        # Tier 1: Rule Engine (Fast)
+        # Tier 1: Rules of the file's root folder, then the Rule Engine (Fast)
+        root = root_for(self.roots, file_path)
+        if root:
+            category = root.match_rule(filename)
+            if category:
+                return category, "Tier1_RootRules"
+        
         category = self.rule_engine.classify(filename)
+        if category == "Archives" and self.archive_inspector is not None:
+            # Tier 2: archive metadata only (central directory / tar headers)
+            content = self.archive_inspector.classify(file_path)
+            if content:
+                return content, "Tier2_Archive"
         if category:
             return category, "Tier1_Rules"
         
+        # Tier 2: Learned filename model (microseconds, no AI call)
+        if self.learned_model is not None:
+            category, confidence = self.learned_model.predict(filename)
+            if category and confidence >= self.learned_threshold:
+                return category, "Tier2_Learned"
+        
         # Check if AI is enabled
         if not self.ai_enabled:
             return "Other", "Tier1_Fallback"
         
-        # Tier 3: AI Classification (only if enabled)
+        if deadline is None:
+            deadline = Deadline(self.file_deadline)
+        start = time.perf_counter()
+        try:
+            return self._route_ai(file_path, filename, deadline)
+        except DeadlineExceeded:
+            self.logger.warning(f"Deadline exceeded for {filename}, using cheaper answer")
+            sniffed = self.rule_engine.sniff_content(file_path)
+            if sniffed:
+                return sniffed, "Deadline_Sniffed"
+            return "Other", "Deadline_Fallback"
+        finally:
+            self._ai_time.observe_since(start)
+    
+    def _route_ai(self, file_path: str, filename: str, deadline: Deadline) -> tuple[str | None, str]:
+        """Tier 3: AI Classification. Raises DeadlineExceeded when out of budget."""
         if self.ai_mode == "CLOUD" and self.gemini_client:
-            # Cloud mode: analyze file CONTENTS for better classification
-            category = self.gemini_client.classify_with_content(file_path)
-            return category, "Tier3_Cloud_Content"
+            try:
+                return self._classify_cloud(file_path, filename, deadline)
+            except AIUnavailableError as e:
+                self.logger.warning(f"Cloud tier unavailable ({e})")
+                return self._cloud_fallback(filename, deadline)
         elif self.ai_mode == "LOCAL" and self.local_client:
             # Local mode: filename only (for privacy)
-            category = self.local_client.classify(filename)
+            category = self.local_batcher.classify(filename, deadline)
             return category, "Tier3_Local"
+        elif self.ai_mode == "CASCADE" and self.local_client:
+            return self._classify_cascade(file_path, filename, deadline)
         
         # Fallback
         return "Other", "Fallback"
     
+    def _classify_cloud(self, file_path: str, filename: str, deadline: Deadline) -> tuple[str, str]:
+        """Gemini classification; raises AIUnavailableError during outages."""
+        if self.gemini_client.can_analyze_content(file_path):
+            # Cloud mode: analyze file CONTENTS for better classification
+            category = self.gemini_client.classify_with_content(file_path, deadline)
+            return category, "Tier3_Cloud_Content"
+        # Nothing to upload: batch the filename with concurrent files
+        category = self.gemini_batcher.classify(filename, deadline)
+        return category, "Tier3_Cloud"
+    
+    def _classify_cascade(self, file_path: str, filename: str, deadline: Deadline) -> tuple[str, str]:
+        """
+        Local model first; only low-confidence answers are escalated to Gemini.
+        Sensitive files never get here (Tier 0 routes them to the vault).
+        """
+        category, confidence = self.local_client.classify_with_confidence(filename, deadline)
+        if confidence >= self.cascade_threshold or not self.gemini_client:
+            return category, "Tier3_Local"
+        
+        self.logger.info(f"Escalating {filename} to cloud (local confidence {confidence:.2f})")
+        try:
+            cloud_category, tier = self._classify_cloud(file_path, filename, deadline)
+            return cloud_category, tier + "_Escalated"
+        except AIUnavailableError as e:
+            # The local answer is still better than deferring
+            self.logger.warning(f"Cloud tier unavailable ({e}), keeping local answer")
+            return category, "Tier3_Local"
+    
+    def _cloud_fallback(self, filename: str, deadline: Deadline) -> tuple[str | None, str]:
+        """
+        Degrade when Gemini is out: use the local model if configured,
+        otherwise leave the file in place for the next periodic scan.
+        """
+        if self.config.get("ai", {}).get("cloud_fallback", "DEFER") == "LOCAL" and self.local_client:
+            return self.local_batcher.classify(filename, deadline), "Tier3_Local_Fallback"
+        return None, "Tier3_Cloud_Deferred"
+    
     def process_file(self, file_path: str) -> bool:
         """
         Process a file: classify and move it.
         Returns True on success.
         """
+        with self.profiler.profile("process_file") if self.profiler else contextlib.nullcontext():
+            return self._process_file(file_path)
+    
+    def _process_file(self, file_path: str) -> bool:
         filename = os.path.basename(file_path)
         category, tier = self.route_to_engine(file_path)  # Pass full path
         
+        if category is None:
+            self.logger.info(f"[{tier}] {filename} left in place until the next scan")
+            return False
+        
         self.logger.info(f"[{tier}] {filename} → {category}")
         
-        return self._move_file(file_path, category)
+        moved = self._move_file(file_path, category, tier=tier)
+        if moved and tier.startswith("Deadline") and self.background_reclassify:
+            self._schedule_reclassify(file_path, category)
+        return moved
+    
+    def _schedule_reclassify(self, file_path: str, interim_category: str):
+        """Queue a file filed under a cheap answer for an unhurried Tier 3 pass."""
+        self._reclassify_queue.put((file_path, interim_category))
+        with self._reclassify_lock:
+            if self._reclassify_thread is None or not self._reclassify_thread.is_alive():
+                self._reclassify_thread = threading.Thread(target=self._reclassify_loop, daemon=True)
+                self._reclassify_thread.start()
+    
+    def _reclassify_loop(self):
+        """Background thread: drain the re-classification queue, then exit after 5s idle."""
+        while True:
+            try:
+                original_path, interim_category = self._reclassify_queue.get(timeout=5)
+            except queue.Empty:
+                with self._reclassify_lock:
+                    if self._reclassify_queue.empty():
+                        self._reclassify_thread = None
+                        return
+                continue
+            
+            try:
+                self._reclassify(original_path, interim_category)
+            finally:
+                self._reclassify_queue.task_done()
+    
+    def _reclassify(self, original_path: str, interim_category: str):
+        """Re-run Tier 3 without a deadline and re-file if it disagrees."""
+        base_dir = os.path.dirname(original_path)
+        filename = os.path.basename(original_path)
+        interim_path = os.path.join(base_dir, interim_category, filename)
+        try:
+            category, tier = self._route_ai(interim_path, filename, Deadline(None))
+        except Exception as e:
+            self.logger.error(f"Re-classification failed for {filename}: {e}")
+            return
+        self._learn(filename, category)
+        if category and category != interim_category:
+            self.logger.info(f"[{tier}] Re-filing {filename}: {interim_category} → {category}")
+            self._move_file(interim_path, category, base_dir, tier=tier)
+    
+    def has_pending_work(self) -> bool:
+        """Whether background re-classification still has files queued or in flight."""
+        return self._reclassify_queue.unfinished_tasks > 0
+    
+    def _move_file(self, file_path: str, category: str, base_dir: str = None, tier: str = None) -> bool:
+        """Move file to categorized subfolder with retry logic, and record where it went."""
+        start = time.perf_counter()
+        try:
+            destination = self._move_file_with_retries(file_path, category, base_dir)
+        finally:
+            self._move_time.observe_since(start)
+        if destination and self.file_index is not None:
+            self.file_index.record(file_path, destination, category, tier or "")
+        return destination is not None
     
-    def _move_file(self, file_path: str, category: str) -> bool:
-        """Move file to categorized subfolder with retry logic."""
+    def _move_file_with_retries(self, file_path: str, category: str, base_dir: str = None) -> str | None:
+        """Destination path once moved, None if it could not be."""
         max_retries = 5
-        base_dir = os.path.dirname(file_path)
+        base_dir = base_dir or os.path.dirname(file_path)
         target_dir = os.path.join(base_dir, category)
         
         if not os.path.exists(target_dir):
@@ -116,17 +460,17 @@ class WorkflowEngine:
             try:
                 if not os.path.exists(file_path):
                     self.logger.warning(f"File vanished: {file_path}")
-                    return False
+                    return None
 
                 shutil.move(file_path, destination)
                 self.logger.info(f"Moved {filename} to {category}")
-                return True
+                return destination
             except PermissionError:
                 self.logger.warning(f"File locked: {filename}. Retry ({attempt + 1}/{max_retries})...")
                 time.sleep(1.0)
             except Exception as e:
                 self.logger.error(f"Error moving file: {e}")
-                return False
+                return None
         
         self.logger.error(f"Failed to move {filename} after {max_retries} attempts.")
-        return False
+        return None
@@ -0,0 +1,208 @@
+"""
+ConfigWatcher - Hot reload of config.json
+
+Polls the config file's mtime, validates the new contents and hands a
+diff of the changed keys to a callback. Invalid edits are logged and
+ignored, so a half-saved file never reaches the worker.
+"""
+import json
+import logging
+import os
+import threading
+
+from core.gaming_detector import PROVIDERS as BUSY_PROVIDERS
+
+AI_MODES = {"CLOUD", "LOCAL", "CASCADE", "RULES_ONLY"}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _fraction(value) -> bool:
+    return _is_number(value) and 0 <= value <= 1
+
+
+def _positive(value) -> bool:
+    return _is_number(value) and value > 0
+
+
+def _string_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def _root(value) -> bool:
+    if isinstance(value, dict):
+        value = value.get("path")
+    return isinstance(value, str) and value.strip() != ""
+
+
+def _roots(value) -> bool:
+    # One folder, or a non-empty list of folders / {"path": ..., ...} objects
+    if isinstance(value, list):
+        return bool(value) and all(_root(v) for v in value)
+    return isinstance(value, str) and value.strip() != ""
+
+
+# Dotted key -> (check, description). Keys not listed here are not validated.
+SCHEMA = {
+    "general.downloads_path": (_roots, "a folder or a list of roots"),
+    "general.scan_interval_minutes": (_positive, "a positive number"),
+    "general.scan_stagger_seconds": (lambda v: _is_number(v) and v >= 0, "a number >= 0"),
+    "general.run_at_startup": (lambda v: isinstance(v, bool), "true or false"),
+    "performance.cpu_threshold": (lambda v: _is_number(v) and 0 < v <= 100, "a number in 1-100"),
+    "performance.gamer_mode": (lambda v: isinstance(v, bool), "true or false"),
+    "performance.file_deadline_seconds": (lambda v: v is None or _positive(v), "a positive number or null"),
+    "performance.busy_providers": (lambda v: isinstance(v, list) and set(v) <= set(BUSY_PROVIDERS),
+                                   f"a list of {list(BUSY_PROVIDERS)}"),
+    "performance.load_threshold": (_positive, "a positive number"),
+    "performance.busy_processes": (_string_list, "a list of strings"),
+    "privacy.mode": (lambda v: v in AI_MODES, f"one of {sorted(AI_MODES)}"),
+    "privacy.sensitive_keywords": (_string_list, "a list of strings"),
+    "ai.enabled": (lambda v: isinstance(v, bool), "true or false"),
+    "ai.cascade_threshold": (_fraction, "a number in 0-1"),
+    "ai.learned_threshold": (_fraction, "a number in 0-1"),
+    "ai.batch_window_ms": (lambda v: _is_number(v) and v >= 0, "a number >= 0"),
+    "ai.batch_max_size": (lambda v: isinstance(v, int) and v >= 1, "an integer >= 1"),
+    "ai.gemini_rpm": (_positive, "a positive number"),
+    "ai.gemini_tpm": (_positive, "a positive number"),
+    "ai.ram_budget_mb": (_positive, "a positive number"),
+    "archives.inspect": (lambda v: isinstance(v, bool), "true or false"),
+    "archives.max_bytes": (lambda v: isinstance(v, int) and v >= 4096, "an integer >= 4096"),
+    "archives.max_entries": (lambda v: isinstance(v, int) and v >= 1, "an integer >= 1"),
+    "archives.min_share": (_fraction, "a number in 0-1"),
+    "index.enabled": (lambda v: isinstance(v, bool), "true or false"),
+    "index.path": (lambda v: v is None or (isinstance(v, str) and v.strip() != ""), "a file path or null"),
+    "index.hash": (lambda v: v in ("sample", "full", "off"), "sample, full or off"),
+    "index.batch_size": (lambda v: isinstance(v, int) and v >= 1, "an integer >= 1"),
+    "watcher.fast_path": (lambda v: isinstance(v, bool), "true or false"),
+    "watcher.backend": (lambda v: v in ("auto", "native", "polling"), "auto, native or polling"),
+    "watcher.poll_min_seconds": (_positive, "a positive number"),
+    "watcher.poll_max_seconds": (_positive, "a positive number"),
+    "watcher.health_check_seconds": (_positive, "a positive number"),
+    "worker.lifecycle": (lambda v: v in ("persistent", "on_demand"), "persistent or on_demand"),
+    "worker.idle_exit_seconds": (_positive, "a positive number"),
+    "worker.prewarm_spare": (lambda v: isinstance(v, bool), "true or false"),
+    "worker.drain_timeout_seconds": (_positive, "a positive number"),
+    "tray.stats_refresh_seconds": (lambda v: _is_number(v) and v >= 0, "a number >= 0 (0 = off)"),
+    "metrics.port": (lambda v: v is None or (isinstance(v, int) and 0 < v < 65536), "a port number or null"),
+    "profiling.every_n_tasks": (lambda v: isinstance(v, int) and v >= 1, "an integer >= 1"),
+}
+
+
+def flatten(config: dict, prefix: str = "") -> dict:
+    """{"ai": {"enabled": True}} -> {"ai.enabled": True}. Lists stay whole."""
+    flat = {}
+    for key, value in config.items():
+        dotted = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, dotted + "."))
+        else:
+            flat[dotted] = value
+    return flat
+
+
+def validate_config(config) -> list[str]:
+    """Return a list of problems; empty when the config is usable."""
+    if not isinstance(config, dict):
+        return ["config must be a JSON object"]
+    errors = []
+    flat = flatten(config)
+    for key, (check, description) in SCHEMA.items():
+        if key in flat and not check(flat[key]):
+            errors.append(f"{key} must be {description} (got {flat[key]!r})")
+    return errors
+
+
+def diff_config(old: dict, new: dict) -> dict:
+    """Changed dotted keys -> (old value, new value)."""
+    old_flat, new_flat = flatten(old or {}), flatten(new or {})
+    return {
+        key: (old_flat.get(key), new_flat.get(key))
+        for key in sorted(old_flat.keys() | new_flat.keys())
+        if old_flat.get(key) != new_flat.get(key)
+    }
+
+
+def write_config(path: str, config: dict):
+    """
+    Replace config.json atomically: readers (the watcher, another
+    process) see either the old file or the complete new one.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(config, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ConfigWatcher:
+    """Polls `path` and calls `on_change(new_config, changes)` on valid edits."""
+
+    def __init__(self, path: str, current: dict, on_change, interval: float = 2.0):
+        self.path = path
+        self.current = current
+        self.on_change = on_change
+        self.interval = interval
+        self.logger = logging.getLogger("ConfigWatcher")
+        self._stamp = self._file_stamp()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()  # check() also runs when the settings window closes
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        """Reload if the file changed. Returns True when a change was applied."""
+        with self._lock:
+            return self._check()
+
+    def _check(self) -> bool:
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            with open(self.path, 'r') as f:
+                new_config = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable config edit: {e}")
+            return False
+
+        errors = validate_config(new_config)
+        if errors:
+            self.logger.warning("Ignoring invalid config edit: " + "; ".join(errors))
+            return False
+
+        changes = diff_config(self.current, new_config)
+        if not changes:
+            return False
+        self.logger.info("Config changed: " + ", ".join(changes))
+        self.current = new_config
+        self.on_change(new_config, changes)
+        return True
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"Config reload failed: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
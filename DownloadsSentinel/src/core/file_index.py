@@ -0,0 +1,272 @@
+"""
+FileIndex - Where every file went, in SQLite
+
+The worker records each filing decision (original path, destination,
+tier, category, size, content hash, times) so "where did yesterday's
+invoice go" is a query, not a walk of the category folders.
+
+  files         one row per decision (re-filings add a row)
+  files_fts     FTS5 index over file names, kept by a trigger
+  daily_rollup  files and bytes per (day, category, tier)
+
+Writes never happen on a task thread: record() only queues a tuple. A
+writer thread stats and hashes the moved file and commits whatever has
+queued up in a single transaction, together with the rollup upserts.
+The database runs in WAL mode, so queries (find.py) never block it.
+
+index.hash:
+  sample - blake2b of size + first and last 64 KB (default, constant cost)
+  full   - blake2b of the whole file
+  off    - no hash
+"""
+import collections
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from core.metrics import registry
+
+SCHEMA_VERSION = 1
+SAMPLE_BYTES = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    src TEXT NOT NULL,
+    dest TEXT NOT NULL,
+    category TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    size INTEGER,
+    hash TEXT,
+    modified_at REAL,
+    decided_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_decided_at ON files(decided_at);
+CREATE INDEX IF NOT EXISTS files_category ON files(category);
+CREATE INDEX IF NOT EXISTS files_hash ON files(hash);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+    name, content='files', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS files_fts_insert AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts(rowid, name) VALUES (new.id, new.name);
+END;
+
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    files INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    PRIMARY KEY (day, category, tier)
+) WITHOUT ROWID;
+"""
+
+INSERT_FILE = ("INSERT INTO files (name, src, dest, category, tier, size, hash, modified_at, decided_at) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+UPSERT_ROLLUP = ("INSERT INTO daily_rollup (day, category, tier, files, bytes) VALUES (?, ?, ?, ?, ?) "
+                 "ON CONFLICT (day, category, tier) DO UPDATE SET "
+                 "files = files + excluded.files, bytes = bytes + excluded.bytes")
+
+
+def default_index_path() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                        'config', 'file_index.db')
+
+
+def index_path(config: dict) -> str:
+    return config.get("index", {}).get("path") or default_index_path()
+
+
+def day_of(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+def file_hash(path: str, mode: str = "sample") -> str | None:
+    """Content hash of `path` per index.hash; None if off or unreadable."""
+    if mode == "off":
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            if mode == "full":
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            else:
+                size = os.fstat(f.fileno()).st_size
+                digest.update(size.to_bytes(8, "little"))
+                digest.update(f.read(SAMPLE_BYTES))
+                if size > 2 * SAMPLE_BYTES:
+                    f.seek(-SAMPLE_BYTES, os.SEEK_END)
+                    digest.update(f.read(SAMPLE_BYTES))
+                elif size > SAMPLE_BYTES:
+                    digest.update(f.read())
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=10)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL: durable at checkpoints, never corrupt
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class FileIndex:
+    """Write side: record() from any thread, one writer thread commits in batches."""
+
+    def __init__(self, path: str, hash_mode: str = "sample", batch_size: int = 500):
+        self.path = path
+        self.hash_mode = hash_mode
+        self.batch_size = batch_size
+        self.logger = logging.getLogger("FileIndex")
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._batch_time = registry.stage("index_batch")
+        self._rows = registry.counter("sentinel_index_rows_total")
+        self._thread = threading.Thread(target=self._writer_loop, name="FileIndexWriter", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "FileIndex | None":
+        """None when index.enabled is off."""
+        settings = config.get("index", {})
+        if not settings.get("enabled", True):
+            return None
+        return cls(index_path(config),
+                   hash_mode=settings.get("hash", "sample"),
+                   batch_size=settings.get("batch_size", 500))
+
+    def record(self, src: str, dest: str, category: str, tier: str, decided_at: float = None):
+        """Queue one decision; costs a tuple and a queue put on the caller's thread."""
+        if not self._closed:
+            self._queue.put((src, dest, category, tier, decided_at or time.time()))
+
+    def close(self, timeout: float = 10):
+        """Commit everything queued, then stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # -- writer thread ------------------------------------------------------
+
+    def _writer_loop(self):
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as e:
+            self.logger.error(f"File index disabled, cannot open {self.path}: {e}")
+            self._closed = True
+            return
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                # Whatever piled up while the last batch committed goes in this one
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:  # close(): commit what came before it, then stop
+                    batch = batch[:batch.index(None)]
+                    stopping = True
+                if batch:
+                    self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _row(self, src: str, dest: str, category: str, tier: str, decided_at: float) -> tuple:
+        try:
+            stat = os.stat(dest)
+            size, modified_at = stat.st_size, stat.st_mtime
+        except OSError:
+            size, modified_at = None, None  # Moved on again already
+        digest = file_hash(dest, self.hash_mode) if size is not None else None
+        return (os.path.basename(dest), src, dest, category, tier, size, digest, modified_at, decided_at)
+
+    def _write(self, conn: sqlite3.Connection, batch: list):
+        start = time.perf_counter()
+        rows = [self._row(*record) for record in batch]
+        rollup = collections.defaultdict(lambda: [0, 0])
+        for row in rows:
+            totals = rollup[(day_of(row[8]), row[3], row[4])]
+            totals[0] += 1
+            totals[1] += row[5] or 0
+        try:
+            with conn:  # One transaction for the whole batch
+                conn.executemany(INSERT_FILE, rows)
+                conn.executemany(UPSERT_ROLLUP, [(*key, files, size) for key, (files, size) in rollup.items()])
+        except sqlite3.Error as e:
+            self.logger.error(f"Could not index {len(rows)} files: {e}")
+            return
+        self._rows.inc(len(rows))
+        self._batch_time.observe_since(start)
+
+
+def fts_query(text: str) -> str:
+    """User words -> FTS5 query: every word, as a prefix ("inv 2024" finds invoice_2024.pdf)."""
+    words = [word for word in "".join(c if c.isalnum() else " " for c in text).split()]
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class IndexReader:
+    """Read side (find.py): read-only connection, never blocks the writer."""
+
+    def __init__(self, path: str):
+        self.conn = connect(path, readonly=True)
+
+    def close(self):
+        self.conn.close()
+
+    def search(self, text: str = None, category: str = None, since: float = None,
+               limit: int = 20) -> list[dict]:
+        """Newest decisions first, by name words, category and/or time."""
+        where, params = [], []
+        if since is not None:
+            # Rows are committed in queue order, not decision order: filter on the time itself
+            where.append("f.decided_at >= ?")
+            params.append(since)
+        if category:
+            where.append("f.category = ?")
+            params.append(category)
+        query = fts_query(text) if text else ""
+        if query:
+            sql = ("SELECT f.* FROM files_fts JOIN files f ON f.id = files_fts.rowid "
+                   "WHERE files_fts MATCH ?" + "".join(f" AND {clause}" for clause in where) +
+                   " ORDER BY files_fts.rowid DESC LIMIT ?")
+            params.insert(0, query)
+        else:
+            # Ordering by decided_at lets a `since` query walk files_decided_at from the newest end
+            order = "f.decided_at DESC" if since is not None else "f.id DESC"
+            sql = ("SELECT f.* FROM files f" + (" WHERE " + " AND ".join(where) if where else "") +
+                   f" ORDER BY {order} LIMIT ?")
+        return [dict(row) for row in self.conn.execute(sql, (*params, limit))]
+
+    def same_content(self, file_hash: str, limit: int = 20) -> list[dict]:
+        rows = self.conn.execute("SELECT * FROM files WHERE hash = ? ORDER BY id DESC LIMIT ?",
+                                 (file_hash, limit))
+        return [dict(row) for row in rows]
+
+    def daily(self, days: int = 7) -> list[dict]:
+        """Files and bytes per day and category over the last `days` days, newest first."""
+        first_day = day_of(time.time() - (days - 1) * 86400)
+        rows = self.conn.execute(
+            "SELECT day, category, sum(files) AS files, sum(bytes) AS bytes FROM daily_rollup "
+            "WHERE day >= ? GROUP BY day, category ORDER BY day DESC, files DESC", (first_day,))
+        return [dict(row) for row in rows]
@@ -1,4 +1,5 @@
 import psutil
+import os
 import time
 import logging
 import sys
@@ -12,18 +13,56 @@ else:
     user32 = None
     ctypes = None
 
+# Busy providers: desktop defaults, and what a headless Linux server can use
+PROVIDERS = ("cpu", "fullscreen", "loadavg", "processes")
+DESKTOP_PROVIDERS = ("cpu", "fullscreen")
+HEADLESS_PROVIDERS = ("cpu", "loadavg", "processes")
+
+
 class GamingDetector:
     """
     Detects if the user is busy (e.g., gaming or high CPU load).
     Used to pause file processing during intensive tasks.
+    
+    Busy providers (any one returning True means busy):
+      cpu        - global CPU usage above cpu_threshold (all platforms)
+      fullscreen - a fullscreen foreground window (Windows only)
+      loadavg    - 1-minute load average per core above load_threshold (POSIX)
+      processes  - one of busy_processes is running (e.g. a backup job)
     """
 
-    def __init__(self, cpu_threshold=85):
+    # Provider name -> check method
+    _CHECKS = {
+        "cpu": "is_high_load",
+        "fullscreen": "is_fullscreen",
+        "loadavg": "is_high_loadavg",
+        "processes": "is_busy_process_running",
+    }
+
+    def __init__(self, cpu_threshold=85, providers=DESKTOP_PROVIDERS,
+                 load_threshold=1.5, busy_processes=()):
         self.cpu_threshold = cpu_threshold
+        self.load_threshold = load_threshold
+        self.busy_processes = {name.lower() for name in busy_processes}
         self.last_check = 0
         self.cached_result = False
         self.cache_duration = 2  # Cache result for 2 seconds to avoid spamming API
         self.logger = logging.getLogger("GamingDetector")
+        unknown = set(providers) - set(PROVIDERS)
+        if unknown:
+            self.logger.warning(f"Ignoring unknown busy providers: {sorted(unknown)}")
+        self.checks = [getattr(self, self._CHECKS[name]) for name in providers if name in self._CHECKS]
+
+    @classmethod
+    def from_config(cls, config: dict, headless: bool = False) -> "GamingDetector":
+        perf = config.get("performance", {})
+        default = HEADLESS_PROVIDERS if headless else DESKTOP_PROVIDERS
+        return cls(
+            cpu_threshold=perf.get("cpu_threshold", 85),
+            providers=perf.get("busy_providers", default),
+            load_threshold=perf.get("load_threshold", 1.5),
+            busy_processes=perf.get("busy_processes", ()),
+        )
 
     def get_screen_size(self):
         """Returns the resolution of the primary monitor."""
@@ -66,6 +105,23 @@ class GamingDetector:
         usage = psutil.cpu_percent(interval=0.1)
         return usage > self.cpu_threshold
 
+    def is_high_loadavg(self):
+        """1-minute load average per core above load_threshold (no-op where unavailable)."""
+        if not hasattr(os, "getloadavg"):
+            return False
+        return os.getloadavg()[0] / (os.cpu_count() or 1) > self.load_threshold
+
+    def is_busy_process_running(self):
+        """True while a configured process (e.g. rsync, borg) is running."""
+        if not self.busy_processes:
+            return False
+        for proc in psutil.process_iter(["name"]):
+            name = (proc.info.get("name") or "").lower()
+            if name in self.busy_processes:
+                self.logger.debug(f"Busy process running: {name}")
+                return True
+        return False
+
     def is_user_busy(self):
         """
         Returns True if the user is Gaming or doing high-load work.
@@ -75,8 +131,8 @@ class GamingDetector:
         if now - self.last_check < self.cache_duration:
             return self.cached_result
 
-        # Check conditions
-        busy = self.is_fullscreen() or self.is_high_load()
+        # Check conditions (first busy provider wins)
+        busy = any(check() for check in self.checks)
         
         self.last_check = now
         self.cached_result = busy
@@ -0,0 +1,116 @@
+"""
+LiveStats - Status counters in shared memory
+
+A small block of doubles, created by the master and handed to every
+worker at spawn. Writers update their own slots in place and the tray
+reads the whole block when it refreshes, so status costs no IPC
+messages at all. Each slot has a single writer process:
+
+  master:  jobs_queued, buffered
+  worker:  jobs_taken, active_tasks, files_done, tier_*, model_resident_mb,
+           worker_heartbeat
+
+Counters only grow (a respawned worker keeps adding to them); queue
+depth is jobs_queued - jobs_taken.
+"""
+import collections
+import multiprocessing
+import threading
+import time
+
+TIER_GROUPS = ("privacy", "rules", "archive", "learned", "ai", "fallback")
+FIELDS = ("jobs_queued", "jobs_taken", "buffered", "active_tasks", "files_done",
+          *(f"tier_{group}" for group in TIER_GROUPS),
+          "model_resident_mb", "worker_heartbeat")
+_INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+# A worker loop wakes at least every 2 s; this long without a beat means it is hung
+STALE_HEARTBEAT_SECONDS = 30
+
+
+def tier_group(tier: str) -> str:
+    """WorkflowEngine tier label -> the coarse group shown in the tray."""
+    if tier.startswith("Tier0"):
+        return "privacy"
+    if tier.startswith("Tier1") and not tier.endswith("Fallback"):
+        return "rules"
+    if tier == "Tier2_Archive":
+        return "archive"
+    if tier.startswith("Tier2"):
+        return "learned"
+    if tier.startswith("Tier3") and not tier.endswith("Deferred"):
+        return "ai"
+    return "fallback"
+
+
+class LiveStats:
+    """Named view over the shared block. Pass `.block` to child processes."""
+
+    def __init__(self, block=None, context=multiprocessing):
+        # RawArray: no lock object per access; each slot has one writer
+        self.block = block if block is not None else context.RawArray('d', len(FIELDS))
+        self._lock = threading.Lock()  # += from this process's threads
+
+    def set(self, field: str, value: float):
+        self.block[_INDEX[field]] = value
+
+    def add(self, field: str, amount: float = 1):
+        index = _INDEX[field]
+        with self._lock:
+            self.block[index] += amount
+
+    def get(self, field: str) -> float:
+        return self.block[_INDEX[field]]
+
+    def count_tier(self, tier: str):
+        self.add(f"tier_{tier_group(tier)}")
+
+    def heartbeat(self):
+        self.block[_INDEX["worker_heartbeat"]] = time.time()
+
+    def snapshot(self) -> dict:
+        return dict(zip(FIELDS, self.block[:]))
+
+
+class ThroughputMeter:
+    """Files per minute from a cumulative counter, over a sliding window."""
+
+    def __init__(self, window_seconds: float = 60):
+        self.window = window_seconds
+        self._samples = collections.deque()  # (time, total)
+
+    def update(self, now: float, total: float) -> float:
+        self._samples.append((now, total))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.window:
+            self._samples.popleft()
+        first_time, first_total = self._samples[0]
+        elapsed = now - first_time
+        return (total - first_total) * 60 / elapsed if elapsed > 0 else 0.0
+
+
+def describe(stats: dict, files_per_minute: float, now: float) -> tuple[str, list[str]]:
+    """(one-word state, status lines) for the tray tooltip and menu."""
+    queued = max(0, int(stats["jobs_queued"] - stats["jobs_taken"]))
+    active = int(stats["active_tasks"])
+    buffered = int(stats["buffered"])
+    heartbeat = stats["worker_heartbeat"]
+
+    if (queued or active) and heartbeat and now - heartbeat > STALE_HEARTBEAT_SECONDS:
+        state = "Stuck"
+    elif queued or active:
+        state = "Working"
+    elif buffered:
+        state = "Paused"
+    else:
+        state = "Idle"
+
+    lines = [f"{state}: {active} active, {queued} queued, {buffered} buffered",
+             f"{files_per_minute:.0f} files/min"]
+    total = sum(stats[f"tier_{group}"] for group in TIER_GROUPS)
+    if total:
+        mix = ", ".join(f"{group} {stats[f'tier_{group}'] * 100 / total:.0f}%"
+                        for group in TIER_GROUPS if stats[f"tier_{group}"])
+        lines.append(f"Tiers: {mix}")
+    if stats["model_resident_mb"]:
+        lines.append(f"Local model resident: {stats['model_resident_mb']:.0f} MB")
+    return state, lines
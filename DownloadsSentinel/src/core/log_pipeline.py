@@ -0,0 +1,151 @@
+"""
+Log Pipeline - Non-blocking logging across master and worker
+
+Every thread logs into a queue; a single QueueListener thread in the
+master owns the rotating file and the console. The worker's records are
+forwarded over a multiprocessing queue to that same listener, so neither
+process blocks on disk I/O while handling files.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+TEXT_FORMAT = '%(asctime)s [%(name)s] %(message)s'
+# systemd sets JOURNAL_STREAM for services; journald stamps each line itself
+JOURNAL_FORMAT = '<%(syslog_priority)d>[%(name)s] %(message)s'
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line, for grep/jq-friendly structured logs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger for INFO and below. During a burst of
+    thousands of files the per-file lines are thinned out, and the next
+    line that gets through reports how many were suppressed. Warnings
+    and errors always pass.
+    """
+
+    def __init__(self, rate_per_second: float = 20, burst: int = 100):
+        super().__init__()
+        self.rate = rate_per_second
+        self.burst = burst
+        self._buckets = {}  # logger name -> [tokens, last refill, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.rate:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(record.name, [self.burst, now, 0])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} (+{suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+class JournalFormatter(logging.Formatter):
+    """Text lines with a syslog priority prefix (<3> error ... <7> debug) for journald."""
+
+    PRIORITIES = {logging.CRITICAL: 2, logging.ERROR: 3, logging.WARNING: 4,
+                  logging.INFO: 6, logging.DEBUG: 7}
+
+    def __init__(self):
+        super().__init__(JOURNAL_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.syslog_priority = self.PRIORITIES.get(record.levelno, 6)
+        return super().format(record)
+
+
+def under_journald() -> bool:
+    return bool(os.environ.get("JOURNAL_STREAM"))
+
+
+def _formatter(config: dict, console: bool = False) -> logging.Formatter:
+    if config.get("logging", {}).get("format", "text") == "json":
+        return JsonLinesFormatter()
+    if console and under_journald():
+        return JournalFormatter()
+    return logging.Formatter(TEXT_FORMAT)
+
+
+def _level(config: dict) -> int:
+    return getattr(logging, str(config.get("logging", {}).get("level", "INFO")).upper(), logging.INFO)
+
+
+def _install_queue_handler(log_queue, config: dict):
+    """Route every record of this process into `log_queue`."""
+    settings = config.get("logging", {})
+    handler = QueueHandler(log_queue)
+    handler.addFilter(RateLimitFilter(settings.get("rate_limit_per_second", 20),
+                                      settings.get("rate_limit_burst", 100)))
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(_level(config))
+
+
+def start_listener(log_queue, log_dir: str, log_name: str, config: dict,
+                   console_only: bool = False) -> QueueListener:
+    """
+    Start the single writer thread: a rotating file in `log_dir` plus
+    stdout, fed from `log_queue`. This process's own records go there too.
+    With `console_only` (headless services) only stdout is written.
+    """
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(_formatter(config, console=True))
+    handlers = [console_handler]
+    if not console_only:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = RotatingFileHandler(os.path.join(log_dir, log_name),
+                                           maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS,
+                                           encoding="utf-8")
+        file_handler.setFormatter(_formatter(config))
+        handlers.insert(0, file_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _install_queue_handler(log_queue, config)
+    return listener
+
+
+def setup_worker_logging(log_queue, config: dict):
+    """Worker side: forward records to the master's listener."""
+    _install_queue_handler(log_queue, config)
+
+
+def set_level(config: dict):
+    """Apply logging.level from a reloaded config to this process."""
+    logging.getLogger().setLevel(_level(config))
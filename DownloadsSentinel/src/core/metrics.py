@@ -0,0 +1,240 @@
+"""
+Metrics - Per-stage latency histograms and counters
+
+Each process records into its own in-memory registry; the worker ships
+snapshots to the master over the result queue, and the master merges
+them for the Prometheus endpoint and the JSON snapshot in logs/.
+
+Observations are a bisect plus two additions (no locks, no allocation),
+well under a microsecond. A rare lost increment under thread contention
+is accepted in exchange.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in milliseconds, from sub-ms rule hits to multi-second AI calls
+DEFAULT_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+                      1000, 2500, 5000, 10000, 30000, 60000)
+
+STAGE_METRIC = "sentinel_stage_duration_ms"
+FILES_METRIC = "sentinel_files_total"
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple = DEFAULT_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def observe_since(self, start: float):
+        """Observe the milliseconds elapsed since a time.perf_counter() start."""
+        self.observe((time.perf_counter() - start) * 1000)
+
+
+class MetricsRegistry:
+    """Get-or-create store of labelled counters and histograms."""
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = self._key(name, labels)
+        metric = self._counters.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._counters.setdefault(key, Counter())
+        return metric
+
+    def histogram(self, name: str, bounds: tuple = DEFAULT_BUCKETS_MS, **labels) -> Histogram:
+        key = self._key(name, labels)
+        metric = self._histograms.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._histograms.setdefault(key, Histogram(bounds))
+        return metric
+
+    def stage(self, stage: str) -> Histogram:
+        """Histogram for one pipeline stage."""
+        return self.histogram(STAGE_METRIC, stage=stage)
+
+    def reset(self):
+        """
+        Zero every metric in place. A forked worker inherits the master's
+        counts; without this its snapshots would report them a second time.
+        Objects handed out earlier stay valid.
+        """
+        with self._lock:
+            for counter in self._counters.values():
+                counter.value = 0
+            for histogram in self._histograms.values():
+                histogram.counts = [0] * len(histogram.counts)
+                histogram.sum = 0.0
+
+    def snapshot(self) -> dict:
+        """JSON-serializable copy of every metric."""
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+        return {
+            "counters": [[name, dict(labels), c.value] for (name, labels), c in counters],
+            "histograms": [[name, dict(labels), list(h.bounds), list(h.counts), h.sum]
+                           for (name, labels), h in histograms],
+        }
+
+
+# The current process's registry
+registry = MetricsRegistry()
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    """Sum snapshots from several processes into one."""
+    counters, histograms = {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap.get("counters", []):
+            key = MetricsRegistry._key(name, labels)
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, bounds, counts, total in snap.get("histograms", []):
+            key = MetricsRegistry._key(name, labels)
+            if key in histograms and histograms[key][0] == bounds:
+                merged = histograms[key]
+                merged[1] = [a + b for a, b in zip(merged[1], counts)]
+                merged[2] += total
+            else:
+                histograms[key] = [bounds, list(counts), total]
+    return {
+        "counters": [[name, dict(labels), v] for (name, labels), v in counters.items()],
+        "histograms": [[name, dict(labels), b, c, s] for (name, labels), (b, c, s) in histograms.items()],
+    }
+
+
+def _label_text(labels: dict, extra: dict = None) -> str:
+    items = {**labels, **(extra or {})}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items.items()) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else str(bound)
+
+
+def to_prometheus(snapshot: dict) -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    lines, typed = [], set()
+    for name, labels, value in sorted(snapshot.get("counters", []), key=lambda m: m[0]):
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_label_text(labels)} {value}")
+    for name, labels, bounds, counts, total in sorted(snapshot.get("histograms", []), key=lambda m: m[0]):
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_label_text(labels, {'le': _format_bound(bound)})} {cumulative}")
+        cumulative += counts[-1]
+        lines.append(f"{name}_bucket{_label_text(labels, {'le': '+Inf'})} {cumulative}")
+        lines.append(f"{name}_sum{_label_text(labels)} {round(total, 3)}")
+        lines.append(f"{name}_count{_label_text(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsAggregator:
+    """
+    Master-side view: this process's registry plus the latest snapshot
+    from each worker process (snapshots are cumulative, so a restarted
+    worker's last numbers are kept under its old pid).
+    """
+
+    def __init__(self, local: MetricsRegistry = registry):
+        self.local = local
+        self._remote = {}
+        self._lock = threading.Lock()
+
+    def update(self, source: str, snapshot: dict):
+        with self._lock:
+            self._remote[source] = snapshot
+
+    def combined(self) -> dict:
+        with self._lock:
+            remote = list(self._remote.values())
+        return merge_snapshots([self.local.snapshot(), *remote])
+
+    def write_snapshot(self, path: str):
+        """Write the merged metrics as JSON (atomically)."""
+        payload = dict(self.combined(), timestamp=time.time())
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+
+class MetricsServer:
+    """Serves /metrics in Prometheus text format on localhost."""
+
+    def __init__(self, aggregator: MetricsAggregator, port: int, host: str = "127.0.0.1"):
+        # Only pay for http.server when the endpoint is enabled
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        aggregator_ref = aggregator
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = to_prometheus(aggregator_ref.combined()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.logger = logging.getLogger("Metrics")
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        self.logger.info(f"Metrics endpoint on http://127.0.0.1:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
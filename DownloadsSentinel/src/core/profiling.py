@@ -0,0 +1,145 @@
+"""
+Profiling - Opt-in sampling profiler for the worker hot path
+
+Every Nth task is run under cProfile and its stats are written to
+logs/profiles/. With tracemalloc enabled, a heap snapshot is compared
+against the previous one at each idle cleanup. Old files are rotated
+away, so the mode can stay on in production.
+"""
+import cProfile
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class TaskProfiler:
+    """
+    Profiles one task in every `every_n`. Only one task is profiled at a
+    time (profilers are process-global on newer Pythons), and nested
+    profile() calls inside a profiled task are no-ops.
+    """
+
+    MEMORY_TOP_N = 25     # allocation sites listed per memory report
+    MEMORY_FRAMES = 1     # traceback depth; deeper costs more per allocation
+
+    def __init__(self, log_dir: str, enabled: bool = False, every_n: int = 50,
+                 max_files: int = 20, trace_memory: bool = False):
+        self.profile_dir = os.path.join(log_dir, 'profiles')
+        self.every_n = max(1, every_n)
+        self.max_files = max(1, max_files)
+        self.trace_memory = trace_memory
+        self.logger = logging.getLogger("Profiler")
+
+        self.enabled = False
+        self._task_count = 0
+        self._count_lock = threading.Lock()  # task threads and the re-classify thread all count
+        self._active = threading.Lock()  # held while a sampled task is profiled
+        self._local = threading.local()
+        self._last_snapshot = None
+        self._written = 0  # keeps file names unique within a second
+        self.set_enabled(enabled)
+
+    @classmethod
+    def from_config(cls, config: dict, log_dir: str) -> "TaskProfiler":
+        settings = config.get("profiling", {})
+        return cls(
+            log_dir,
+            enabled=settings.get("enabled", False),
+            every_n=settings.get("every_n_tasks", 50),
+            max_files=settings.get("max_files", 20),
+            trace_memory=settings.get("tracemalloc", False),
+        )
+
+    def set_enabled(self, enabled: bool):
+        """Switch profiling on or off (config or tray toggle)."""
+        if enabled != self.enabled:
+            self.logger.info(f"Profiling {'enabled' if enabled else 'disabled'}")
+        self.enabled = enabled
+        if enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.MEMORY_FRAMES)
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._last_snapshot = None
+
+    def _should_sample(self) -> bool:
+        with self._count_lock:
+            self._task_count += 1
+            return self._task_count % self.every_n == 0
+
+    @contextmanager
+    def profile(self, label: str):
+        """Run the block under cProfile if this task is sampled."""
+        depth = getattr(self._local, "depth", 0)
+        if (not self.enabled or depth  # nested inside another profile() call
+                or not self._should_sample() or not self._active.acquire(blocking=False)):
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+
+        profiler = cProfile.Profile()
+        self._local.depth = 1
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._local.depth = 0
+            self._active.release()
+            self._write(lambda path: profiler.dump_stats(path),
+                        f"cpu-{label}-{int(elapsed_ms)}ms", ".prof")
+
+    def memory_checkpoint(self):
+        """At a cleanup boundary: report allocation growth since the last checkpoint."""
+        if not (self.enabled and tracemalloc.is_tracing()):
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+        if self._last_snapshot is None:
+            stats = snapshot.statistics("lineno")
+            title = "Top allocations"
+        else:
+            stats = snapshot.compare_to(self._last_snapshot, "lineno")
+            title = "Growth since last cleanup"
+        self._last_snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+
+        def write_report(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"traced current={current / 1024:.0f} KiB peak={peak / 1024:.0f} KiB\n")
+                f.write(f"{title}:\n")
+                for stat in stats[:self.MEMORY_TOP_N]:
+                    f.write(f"{stat}\n")
+
+        self._write(write_report, "mem", ".txt")
+
+    def _write(self, writer, name: str, suffix: str):
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self._written += 1
+            path = os.path.join(self.profile_dir,
+                                f"{stamp}-{os.getpid()}-{self._written}-{name}{suffix}")
+            writer(path)
+            self._rotate()
+        except OSError as e:
+            self.logger.error(f"Could not write profile: {e}")
+
+    def _rotate(self):
+        """Keep only the newest `max_files` profile files."""
+        entries = sorted(
+            (e for e in os.scandir(self.profile_dir) if e.is_file()),
+            key=lambda e: e.stat().st_mtime
+        )
+        for entry in entries[:-self.max_files]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,123 @@
+"""
+Roots - The folders Sentinel organizes
+
+`general.downloads_path` is either one folder or a list of roots; a root
+is a path or an object with per-root settings:
+
+    {"path": "C:/Scans", "name": "scanner", "priority": 10,
+     "rules": {"*.pdf": "Scans", "img_*": "Photos"},
+     "scan_interval_minutes": 15}
+
+Every root feeds the same dispatcher and worker. Files are filed into
+category folders inside their own root.
+"""
+import os
+from fnmatch import fnmatchcase
+
+DEFAULT_DOWNLOADS_PATH = "%USERPROFILE%\\Downloads"
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(os.path.expandvars(path)))
+
+
+class WatchRoot:
+    """One organized folder with its priority, filename rules and scan interval."""
+
+    def __init__(self, path: str, name: str = None, priority: int = 0,
+                 rules: dict = None, scan_interval_minutes: float = None):
+        self.path = os.path.expandvars(path)
+        self.name = name or os.path.basename(os.path.normpath(self.path)) or self.path
+        self.priority = priority
+        # fnmatch pattern (matched against the lowercase filename) -> category
+        self.rules = [(pattern.lower(), category) for pattern, category in (rules or {}).items()]
+        self.scan_interval_minutes = scan_interval_minutes
+        self._key = _normalize(self.path)
+
+    @classmethod
+    def from_config(cls, entry) -> "WatchRoot":
+        if isinstance(entry, str):
+            return cls(entry)
+        return cls(
+            entry["path"],
+            name=entry.get("name"),
+            priority=entry.get("priority", 0),
+            rules=entry.get("rules"),
+            scan_interval_minutes=entry.get("scan_interval_minutes"),
+        )
+
+    def contains(self, file_path: str) -> bool:
+        """True for files directly inside this root (Sentinel does not recurse)."""
+        return _normalize(os.path.dirname(file_path)) == self._key
+
+    def match_rule(self, filename: str) -> str | None:
+        lower_name = filename.lower()
+        for pattern, category in self.rules:
+            if fnmatchcase(lower_name, pattern):
+                return category
+        return None
+
+    def __repr__(self):
+        return f"WatchRoot({self.path!r}, priority={self.priority})"
+
+
+def parse_roots(config: dict) -> list[WatchRoot]:
+    """Roots from general.downloads_path, highest priority first."""
+    entries = config.get("general", {}).get("downloads_path", DEFAULT_DOWNLOADS_PATH)
+    if not isinstance(entries, list):
+        entries = [entries]
+    roots = [WatchRoot.from_config(entry) for entry in entries]
+    return sorted(roots, key=lambda root: -root.priority)
+
+
+def root_for(roots: list[WatchRoot], file_path: str) -> WatchRoot | None:
+    for root in roots:
+        if root.contains(file_path):
+            return root
+    return None
+
+
+def primary_path(config: dict) -> str:
+    """The first root's folder (what the settings window edits)."""
+    entries = config.get("general", {}).get("downloads_path", DEFAULT_DOWNLOADS_PATH)
+    first = entries[0] if isinstance(entries, list) and entries else entries
+    return first["path"] if isinstance(first, dict) else first
+
+
+def set_primary_path(config: dict, path: str):
+    """Change the first root's folder, keeping any other roots and their settings."""
+    general = config.setdefault("general", {})
+    entries = general.get("downloads_path")
+    if isinstance(entries, list) and entries:
+        if isinstance(entries[0], dict):
+            entries[0]["path"] = path
+        else:
+            entries[0] = path
+    else:
+        general["downloads_path"] = path
+
+
+class ScanScheduler:
+    """
+    Periodic scans spread across roots. Startup scans are `stagger_seconds`
+    apart, and each root then rescans on its own interval counted from its
+    own last scan, so the roots stay out of step and never scan at once.
+    """
+
+    def __init__(self, roots: list[WatchRoot], default_interval_minutes: float,
+                 stagger_seconds: float = 15, now: float = 0.0):
+        self.roots = roots
+        self.default_interval_minutes = default_interval_minutes
+        self._next = {id(root): now + i * stagger_seconds for i, root in enumerate(roots)}
+
+    def interval_seconds(self, root: WatchRoot) -> float:
+        return (root.scan_interval_minutes or self.default_interval_minutes) * 60
+
+    def next_due(self, now: float) -> WatchRoot | None:
+        """The most overdue root, or None. One root per call, so scans never pile up."""
+        ready = [root for root in self.roots if self._next[id(root)] <= now]
+        if not ready:
+            return None
+        root = min(ready, key=lambda r: (self._next[id(r)], -r.priority))
+        self._next[id(root)] = now + self.interval_seconds(root)
+        return root
@@ -2,18 +2,23 @@
 SentinelWorker - Process B
 
 Runs in a separate OS Process for RAM isolation.
-Implements 60-second idle timeout with cleanup.
+Implements 60-second idle timeout with cleanup. With worker.lifecycle
+"on_demand" it also asks the master to let it exit after
+worker.idle_exit_seconds without work (see core.worker_supervisor).
 """
 import multiprocessing
 import queue
 import time
 import gc
 import logging
-import sys
 import os
+import signal
 import threading
 
-from ai.workflow_engine import WorkflowEngine
+from core.live_stats import LiveStats
+from core.metrics import registry
+from core.profiling import TaskProfiler
+from core.log_pipeline import set_level, setup_worker_logging, start_listener
 
 
 import concurrent.futures
@@ -27,44 +32,62 @@ class SentinelWorker:
     
     IDLE_TIMEOUT = 60  # seconds
     MAX_WORKERS = 4    # maximum concurrent tasks
+    METRICS_INTERVAL = 10  # seconds between metrics snapshots to the master
     
-    def __init__(self, job_queue: multiprocessing.Queue, config: dict, secrets: dict):
+    def __init__(self, job_queue: multiprocessing.Queue, config: dict, secrets: dict,
+                 result_queue: multiprocessing.Queue = None,
+                 control_queue: multiprocessing.Queue = None,
+                 log_queue: multiprocessing.Queue = None, stats_block=None):
         self.job_queue = job_queue
+        self.result_queue = result_queue  # worker → master messages (metrics snapshots)
+        self.control_queue = control_queue  # master → worker commands (tray toggles, config reloads)
+        self.log_queue = log_queue  # records go to the master's log listener
+        self.live_stats = LiveStats(stats_block)  # shared with the master's tray (no messages)
+        self.log_listener = None
         self.config = config
         self.secrets = secrets
         self.is_running = False
         self.logger = None
         self.workflow_engine = None
+        self.file_index = None  # opened with the engine, closed on cleanup
         self.last_task_time = time.time()
+        self.last_job_time = time.time()  # not reset by cleanup, unlike last_task_time
+        self._idle_reported = False
+        self._draining = False  # shutting down once the job queue runs dry
         self.executor = None
         self.active_tasks = 0
         self._lock = threading.Lock() # For active_tasks counter
+        self._queue_wait = registry.stage("queue_wait")
+        self._last_metrics_push = 0.0
+        self.log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'logs')
+        self.profiler = TaskProfiler.from_config(config, self.log_dir)
 
     def _setup_logging(self):
         """Setup logging in worker process."""
-        log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'logs')
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s [%(name)s] %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'worker.log')),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        if self.log_queue is not None:
+            setup_worker_logging(self.log_queue, self.config)
+        else:
+            # Standalone worker: own writer thread and rotating worker.log
+            self.log_listener = start_listener(queue.SimpleQueue(), self.log_dir, 'worker.log', self.config)
         self.logger = logging.getLogger("SentinelWorker")
     
     def _init_engine(self):
         """Initialize workflow engine (lazy load)."""
         if self.workflow_engine is None:
-            self.workflow_engine = WorkflowEngine(self.config, self.secrets)
+            # Imported here so the master process never loads the AI stack
+            from ai.workflow_engine import WorkflowEngine
+            from core.file_index import FileIndex
+            self.workflow_engine = WorkflowEngine(self.config, self.secrets, self.MAX_WORKERS)
+            self.workflow_engine.profiler = self.profiler
+            self.workflow_engine.live_stats = self.live_stats
+            self.file_index = self.workflow_engine.file_index = FileIndex.from_config(self.config)
     
     def _task_done_callback(self, future):
         """Callback when a thread finishes a task."""
         with self._lock:
             self.active_tasks -= 1
+            self.live_stats.set("active_tasks", self.active_tasks)
+        self.live_stats.add("files_done")
         # Update timestamp to prevent premature cleanup
         self.last_task_time = time.time()
         
@@ -74,6 +97,80 @@ class SentinelWorker:
             if self.logger:
                 self.logger.error(f"Thread task error: {e}")
 
+    def _push_metrics(self, force: bool = False):
+        """Send a cumulative metrics snapshot to the master every METRICS_INTERVAL."""
+        if self.result_queue is None:
+            return
+        now = time.time()
+        if force or now - self._last_metrics_push >= self.METRICS_INTERVAL:
+            self._last_metrics_push = now
+            self.result_queue.put(("metrics", os.getpid(), registry.snapshot()))
+    
+    def _poll_control(self):
+        """Apply pending commands from the master without blocking."""
+        if self.control_queue is None:
+            return
+        while True:
+            try:
+                command, value = self.control_queue.get_nowait()
+            except queue.Empty:
+                return
+            if command == "profiling":
+                self.profiler.set_enabled(bool(value))
+            elif command == "config":
+                self.apply_config(*value)
+            elif command == "exit":
+                # The master accepted our idle report; finish running tasks and leave
+                self.is_running = False
+            elif command == "drain":
+                # Master is shutting down: empty the job queue first, then leave
+                self._draining = True
+    
+    def apply_config(self, config: dict, changed_keys):
+        """
+        Hot reload pushed by the master. The loaded engine rebuilds only
+        the components the changed keys touch; an unloaded engine simply
+        starts from the new config on the next task.
+        """
+        self.config = config
+        if any(key.startswith("profiling.") for key in changed_keys):
+            settings = config.get("profiling", {})
+            self.profiler.every_n = max(1, settings.get("every_n_tasks", self.profiler.every_n))
+            self.profiler.max_files = max(1, settings.get("max_files", self.profiler.max_files))
+            self.profiler.trace_memory = settings.get("tracemalloc", self.profiler.trace_memory)
+            self.profiler.set_enabled(settings.get("enabled", False))
+        if any(key.startswith("logging.") for key in changed_keys):
+            set_level(config)
+        if self.workflow_engine is not None:
+            self.workflow_engine.apply_config(config, changed_keys)
+        if any(key.startswith("index.") for key in changed_keys) and self.workflow_engine is not None:
+            from core.file_index import FileIndex
+            if self.file_index is not None:
+                self.file_index.close()  # Commits what the old settings queued
+            self.file_index = self.workflow_engine.file_index = FileIndex.from_config(config)
+    
+    def _send(self, kind: str, payload=None):
+        if self.result_queue is not None:
+            self.result_queue.put((kind, os.getpid(), payload))
+    
+    def _has_background_work(self) -> bool:
+        """Engine work that runs outside the task pool (background re-classification)."""
+        return self.workflow_engine is not None and self.workflow_engine.has_pending_work()
+    
+    def _master_gone(self) -> bool:
+        parent = multiprocessing.parent_process()  # None when not started by a master
+        return parent is not None and not parent.is_alive()
+    
+    def _check_idle_exit(self):
+        """on_demand lifecycle: report once when idle long enough to exit."""
+        settings = self.config.get("worker", {})
+        if settings.get("lifecycle", "persistent") != "on_demand" or self._idle_reported:
+            return
+        idle_time = time.time() - self.last_job_time
+        if idle_time >= settings.get("idle_exit_seconds", 300):
+            self._idle_reported = True
+            self._send("idle", idle_time)
+    
     def run_worker_loop(self):
         """
         Main Worker Loop.
@@ -83,6 +180,10 @@ class SentinelWorker:
         self.logger.info("Worker Process Started (PID: {})".format(os.getpid()))
         self.is_running = True
         self.last_task_time = time.time()
+        self.last_job_time = time.time()
+        self._send("ready", time.time())  # the master measures spawn latency
+        self.live_stats.set("active_tasks", 0)
+        self.live_stats.heartbeat()
         
         # Initialize ThreadPool
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
@@ -90,27 +191,47 @@ class SentinelWorker:
         while self.is_running:
             try:
                 # Non-blocking get with timeout
-                file_path = self.job_queue.get(timeout=2)
+                item = self.job_queue.get(timeout=2)
+                # (file_path, enqueued_at) from the dispatcher; plain paths still accepted
+                file_path, enqueued_at = item if isinstance(item, tuple) else (item, None)
+                self.live_stats.add("jobs_taken")
                 
-                # Reset idle timer
+                # Reset idle timers
                 self.last_task_time = time.time()
+                self.last_job_time = self.last_task_time
+                self._idle_reported = False
                 
                 # Submit task to ThreadPool
                 with self._lock:
                     self.active_tasks += 1
+                    self.live_stats.set("active_tasks", self.active_tasks)
                 
-                future = self.executor.submit(self.handle_task, file_path)
+                future = self.executor.submit(self.handle_task, file_path, enqueued_at)
                 future.add_done_callback(self._task_done_callback)
+                self._push_metrics()
+                self._poll_control()
+                self.live_stats.heartbeat()
                 
             except queue.Empty:
+                self.live_stats.heartbeat()
+                self._push_metrics()
+                self._poll_control()
+                if not self._draining and self._master_gone():
+                    # We ignore SIGTERM, so nobody else will stop an orphaned worker
+                    self.logger.warning("Master process is gone, draining")
+                    self._draining = True
+                if self._draining:
+                    self.is_running = False  # Queue is empty; running tasks finish in shutdown
+                    continue
                 # Check if we've been idle too long AND no active tasks
                 with self._lock:
-                    is_idle = (self.active_tasks == 0)
+                    is_idle = (self.active_tasks == 0) and not self._has_background_work()
                 
                 if is_idle:
                     idle_time = time.time() - self.last_task_time
                     if idle_time > self.IDLE_TIMEOUT:
                         self.perform_cleanup()
+                    self._check_idle_exit()
                 continue
             except Exception as e:
                 if self.logger:
@@ -120,40 +241,71 @@ class SentinelWorker:
         if self.executor:
             # wait=True ensures pending tasks complete before killing the process
             self.executor.shutdown(wait=True)
+        while self._has_background_work():
+            time.sleep(0.1)  # Re-classification still needs the engine, index and models
+        self.perform_cleanup()  # Saves the filename model, ships final metrics
+        self.logger.info("Worker Process Exiting (PID: {})".format(os.getpid()))
+        self._send("exited")
 
-    def handle_task(self, file_path: str):
+    def handle_task(self, file_path: str, enqueued_at: float = None):
         """Process a single file task."""
+        if enqueued_at is not None:
+            # Dispatch → a worker thread picks it up (IPC queue + thread pool)
+            self._queue_wait.observe((time.time() - enqueued_at) * 1000)
+        
         # Ensure engine is initialized (thread-safe check needed if not already init)
         # Since _init_engine is simple lazy load, we can call it here.
         # Ideally WorkflowEngine should be thread-safe.
         self._init_engine()
         
         if self.logger:
-            self.logger.info(f"Processing: {file_path}")
+            self.logger.debug(f"Processing: {file_path}")
         
         try:
-            self.workflow_engine.process_file(file_path)
+            with self.profiler.profile("task"):
+                self.workflow_engine.process_file(file_path)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Task failed for {file_path}: {e}")
+        self._publish_model_residency()
+    
+    def _publish_model_residency(self):
+        engine = self.workflow_engine
+        client = engine._local_client if engine else None
+        self.live_stats.set("model_resident_mb", client.residency.resident_memory_mb() if client else 0)
     
     def perform_cleanup(self):
         """Release resources after idle timeout."""
+        self._push_metrics(force=True)
+        
         # Only cleanup if engine is loaded
         if self.workflow_engine:
             if self.logger:
                 self.logger.info("Idle timeout reached. Performing cleanup...")
             
+            # Keep what the filename model learned this session
+            self.workflow_engine.save_learned_model()
+            
+            # Commit queued index rows and release the database
+            if self.file_index is not None:
+                self.file_index.close()
+                self.file_index = None
+            
             # Unload local AI models if loaded
             if self.workflow_engine._local_client:
                 self.workflow_engine._local_client.unload_model()
+                self.workflow_engine._local_client.close()
             
             # Clear engine references
             self.workflow_engine = None
+            self._publish_model_residency()
             
             # Aggressive GC
             gc.collect()
             
+            # What survived the cleanup (only when profiling with tracemalloc)
+            self.profiler.memory_checkpoint()
+            
             if self.logger:
                 self.logger.info("Cleanup complete. Resources released.")
         
@@ -165,7 +317,63 @@ class SentinelWorker:
         self.is_running = False
 
 
-def worker_process_entry(job_queue: multiprocessing.Queue, config: dict, secrets: dict):
+def _ignore_shutdown_signals():
+    """
+    Stopping is the master's call: it drains the worker through the control
+    queue. systemd (KillMode=control-group) and Ctrl-C signal the whole
+    process group, which would otherwise kill the worker mid-file.
+    """
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_IGN)
+
+
+def worker_process_entry(job_queue: multiprocessing.Queue, config: dict, secrets: dict,
+                         result_queue: multiprocessing.Queue = None,
+                         control_queue: multiprocessing.Queue = None,
+                         log_queue: multiprocessing.Queue = None, stats_block=None):
     """Entry point for worker process."""
-    worker = SentinelWorker(job_queue, config, secrets)
+    _ignore_shutdown_signals()
+    registry.reset()  # Forked children start with a copy of the master's metrics
+    worker = SentinelWorker(job_queue, config, secrets, result_queue, control_queue, log_queue,
+                            stats_block)
     worker.run_worker_loop()
+
+
+def warm_modules(config: dict) -> list[str]:
+    """The modules a worker with this config will import on its first tasks."""
+    modules = ["ai.workflow_engine"]
+    ai_config = config.get("ai", {})
+    mode = config.get("privacy", {}).get("mode", "CLOUD")
+    if ai_config.get("enabled", False):
+        if mode in ("LOCAL", "CASCADE") or ai_config.get("cloud_fallback") == "LOCAL":
+            modules.append("ai.local_client")
+        if mode in ("CLOUD", "CASCADE"):
+            modules.append("ai.gemini_client")
+    if ai_config.get("learned_enabled", True):
+        modules.append("ai.filename_model")
+    return modules
+
+
+def spare_process_entry(activation_queue: multiprocessing.Queue, job_queue: multiprocessing.Queue,
+                        result_queue: multiprocessing.Queue = None,
+                        control_queue: multiprocessing.Queue = None,
+                        log_queue: multiprocessing.Queue = None, modules: list[str] = (),
+                        stats_block=None):
+    """
+    Prewarmed spare: pay for the AI stack imports now, then wait until the
+    master activates it with the current (config, secrets), or None to quit.
+    """
+    _ignore_shutdown_signals()
+    registry.reset()  # Forked children start with a copy of the master's metrics
+    import importlib
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass  # The worker reports it properly if it is really needed
+    activation = activation_queue.get()
+    if activation is None:
+        return
+    config, secrets = activation
+    worker_process_entry(job_queue, config, secrets, result_queue, control_queue, log_queue,
+                         stats_block)
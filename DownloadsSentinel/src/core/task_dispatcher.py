@@ -4,12 +4,16 @@ TaskDispatcher - The Gatekeeper
 Receives file events from Watchdog.
 If GamingDetector says "Busy", buffers tasks.
 If "Free", pushes to Queue.
+
+Jobs are (file_path, enqueued_at) tuples; enqueued_at is time.time()
+so the worker process can measure queue wait.
 """
 import multiprocessing
 import time
 import threading
 import logging
 from core.gaming_detector import GamingDetector
+from core.metrics import registry
 
 
 class TaskDispatcher:
@@ -20,36 +24,51 @@ class TaskDispatcher:
     If 'Free', it pushes to Queue.
     """
     
-    def __init__(self, detector: GamingDetector, job_queue: multiprocessing.Queue):
+    def __init__(self, detector: GamingDetector, job_queue: multiprocessing.Queue, live_stats=None):
         self.detector = detector
         self.job_queue = job_queue
-        self.pending_buffer = []  # Buffer for when User is Busy
+        self.live_stats = live_stats  # buffered count for the tray
+        self.pending_buffer = []  # (file_path, buffered_at, priority) while User is Busy
         self.is_running = False
         self._lock = threading.Lock()
         self.logger = logging.getLogger("TaskDispatcher")
+        self._dispatch_time = registry.stage("dispatch")
+        self._buffer_wait = registry.stage("buffer_wait")
 
-    def on_file_created(self, file_path: str):
-        """Called by Watcher when a file is detected."""
-        self.dispatch_or_queue(file_path)
+    def on_file_created(self, file_path: str, priority: int = 0):
+        """Called by Watcher when a file is detected (priority of its root)."""
+        self.dispatch_or_queue(file_path, priority)
     
-    def dispatch_or_queue(self, file_path: str):
+    def dispatch_or_queue(self, file_path: str, priority: int = 0):
         """Dispatch to worker or queue for later."""
+        start = time.perf_counter()
         with self._lock:
             if self.detector.is_user_busy():
                 self.logger.info(f"User Busy. Buffering: {file_path}")
-                self.pending_buffer.append(file_path)
+                self.pending_buffer.append((file_path, time.time(), priority))
+                self._publish_buffered()
             else:
                 self.logger.info(f"User Idle. Dispatching: {file_path}")
-                self.job_queue.put(file_path)
+                self.job_queue.put((file_path, time.time()))
+        self._dispatch_time.observe_since(start)
 
     def flush_pending_tasks(self):
         """Flush all buffered tasks to the queue."""
         with self._lock:
             if self.pending_buffer:
                 self.logger.info(f"Flushing buffer ({len(self.pending_buffer)} items)...")
-                for file_path in self.pending_buffer:
-                    self.job_queue.put(file_path)
+                now = time.time()
+                # Higher-priority roots first; arrival order within a root (stable sort)
+                self.pending_buffer.sort(key=lambda item: -item[2])
+                for file_path, buffered_at, _ in self.pending_buffer:
+                    self._buffer_wait.observe((now - buffered_at) * 1000)
+                    self.job_queue.put((file_path, now))
                 self.pending_buffer.clear()
+                self._publish_buffered()
+
+    def _publish_buffered(self):
+        if self.live_stats is not None:
+            self.live_stats.set("buffered", len(self.pending_buffer))
 
     def _buffer_monitor_loop(self):
         """Background thread to check buffer periodically."""
@@ -0,0 +1,370 @@
+"""
+Watch Backends - How FileWatcher learns about new files
+
+- native:  watchdog's Observer (inotify, ReadDirectoryChangesW, FSEvents)
+- polling: diffs os.scandir snapshots; the interval shrinks while files
+           arrive and backs off while the folder is quiet
+- auto:    native, switching to polling when native events stop arriving
+           (network drives, some mounted volumes, exhausted inotify watches)
+           and back once a retried native observer hears changes again
+
+Every backend feeds the same watchdog event handler, so the watcher's
+fast path and readiness checks work unchanged.
+"""
+import abc
+import logging
+import os
+import threading
+import time
+
+from watchdog.events import FileCreatedEvent, FileMovedEvent
+from watchdog.observers import Observer
+
+from core.metrics import registry
+
+BACKENDS = ("auto", "native", "polling")
+
+
+def snapshot(path: str, previous: dict = None) -> dict:
+    """
+    name -> (file_id, size, mtime_ns) for the regular files directly in `path`.
+    Names already in `previous` keep their old entry, so a quiet folder
+    costs one directory listing rather than a stat per file. Entries
+    without a file ID are re-stat'd every time: they are matched across a
+    rename by size + mtime, which must be those of the finished file, not
+    of the download when it first appeared.
+    """
+    previous = previous or {}
+    entries = {}
+    with os.scandir(path) as it:
+        for entry in it:
+            known = previous.get(entry.name)
+            if known is not None and known[0]:
+                entries[entry.name] = known
+                continue
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                # DirEntry.stat() has st_ino 0 on Windows; inode() asks for the real file ID
+                file_id = entry.inode()
+            except OSError:
+                continue  # Vanished between listing and stat
+            entries[entry.name] = (file_id, stat.st_size, stat.st_mtime_ns)
+    return entries
+
+
+def _identity(info: tuple):
+    # Filesystems without file IDs: size + mtime survive a rename too
+    file_id, size, mtime_ns = info
+    return file_id or (size, mtime_ns)
+
+
+def diff_snapshots(old: dict, new: dict) -> list[tuple[str, ...]]:
+    """
+    ("created", name) and ("moved", old_name, new_name) between two
+    snapshots. A vanished name whose file reappears under a new name is
+    a rename, which is how browsers finish a download.
+    """
+    added = [name for name in new if name not in old]
+    if not added:
+        return []
+    removed = {_identity(old[name]): name for name in old if name not in new}
+    changes = []
+    for name in added:
+        source = removed.pop(_identity(new[name]), None)
+        changes.append(("moved", source, name) if source else ("created", name))
+    return changes
+
+
+class WatchBackend(abc.ABC):
+    """Delivers file events for one folder to a watchdog event handler."""
+
+    name = "base"
+
+    def __init__(self, path: str, handler):
+        self.path = path
+        self.handler = handler
+        self.logger = logging.getLogger("FileWatcher")
+
+    @abc.abstractmethod
+    def start(self):
+        """Begin delivering events (returns immediately)."""
+
+    @abc.abstractmethod
+    def stop(self):
+        """Stop delivering events and wait for the backend's threads."""
+
+
+class NativeBackend(WatchBackend):
+    name = "native"
+
+    def __init__(self, path: str, handler):
+        super().__init__(path, handler)
+        self.observer = Observer()
+
+    def start(self):
+        self.observer.schedule(self.handler, self.path, recursive=False)
+        self.observer.start()
+
+    def is_alive(self) -> bool:
+        return self.observer.is_alive()
+
+    def stop(self):
+        self.observer.stop()
+        if self.observer.is_alive():
+            self.observer.join()
+
+
+class PollingBackend(WatchBackend):
+    """
+    Snapshot diffing with an adaptive interval: back to `min_interval`
+    whenever a poll finds new files, otherwise `backoff` times longer up
+    to `max_interval`.
+    """
+
+    name = "polling"
+
+    def __init__(self, path: str, handler, min_interval: float = 1.0,
+                 max_interval: float = 30.0, backoff: float = 1.5, since: float = None):
+        super().__init__(path, handler)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+        self.interval = min_interval
+        # Files modified after `since` count as new on the first poll (used
+        # when taking over from a native observer that stopped reporting)
+        self.since = since
+        self._previous = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._poll_time = registry.stage("watcher_poll")
+
+    def poll(self) -> int:
+        """One snapshot + diff; dispatches events and returns how many."""
+        start = time.perf_counter()
+        try:
+            current = snapshot(self.path, self._previous)
+        except OSError as e:
+            self.logger.warning(f"Polling {self.path} failed: {e}")
+            return 0
+        if self._previous is None:
+            previous = current
+            if self.since is not None:
+                since_ns = int(self.since * 1e9)
+                previous = {name: info for name, info in current.items() if info[2] <= since_ns}
+        else:
+            previous = self._previous
+        self._previous = current
+        changes = diff_snapshots(previous, current)
+        self._poll_time.observe_since(start)
+
+        for change in changes:
+            if change[0] == "moved":
+                event = FileMovedEvent(os.path.join(self.path, change[1]), os.path.join(self.path, change[2]))
+            else:
+                event = FileCreatedEvent(os.path.join(self.path, change[1]))
+            self.handler.dispatch(event)
+
+        if changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return len(changes)
+
+    def _loop(self):
+        self.poll()  # Baseline snapshot
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.logger.error(f"Polling error: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class _EventTap:
+    """
+    Wraps the handler to note when the native observer last delivered an
+    event. Without a handler it only counts (a probe listening alongside polling).
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.last_event = time.time()
+        self.events = 0
+
+    def dispatch(self, event):
+        self.last_event = time.time()
+        self.events += 1
+        if self.handler is not None:
+            self.handler.dispatch(event)
+
+
+class AutoBackend(WatchBackend):
+    """
+    Native events, checked every `health_interval` seconds: if the folder's
+    mtime moved (entries were added or renamed) but no event arrived since
+    the last check, or the observer thread died, the native backend is
+    deaf and polling takes over. Files that arrived meanwhile are picked
+    up by the first poll.
+
+    While polling, a native observer is tried again every `reprobe_min`
+    seconds, doubling up to `reprobe_max` after each failed try. The probe
+    listens next to polling without dispatching; once the folder changes
+    and the probe heard it, the probe is handed the real handler and
+    polling stops.
+    """
+
+    name = "auto"
+
+    def __init__(self, path: str, handler, health_interval: float = 30.0,
+                 reprobe_min: float = 60.0, reprobe_max: float = 3600.0, **polling_options):
+        super().__init__(path, handler)
+        self.health_interval = health_interval
+        self.reprobe_min = reprobe_min
+        self.reprobe_max = max(reprobe_min, reprobe_max)
+        self.reprobe_interval = reprobe_min
+        self.polling_options = polling_options
+        self._tap = _EventTap(handler)
+        self.active = NativeBackend(path, self._tap)
+        self._probe = None  # (NativeBackend, counting _EventTap) while trying native again
+        self._probe_dir_mtime = None
+        self._next_probe = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_check = time.time()
+        self._last_dir_mtime = self._dir_mtime()
+        self._switches = registry.counter("sentinel_watcher_backend_switches_total")
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def check_health(self) -> bool:
+        """True while the native backend looks healthy; switches to polling otherwise."""
+        if not isinstance(self.active, NativeBackend):
+            return False
+        now = time.time()
+        dir_mtime = self._dir_mtime()
+        folder_changed = dir_mtime is not None and dir_mtime != self._last_dir_mtime
+        if folder_changed and dir_mtime / 1e9 > now - 1 and self.active.is_alive():
+            return True  # Events for a change this recent may still be on their way
+        deaf = folder_changed and self._tap.last_event < self._last_check
+        healthy = self.active.is_alive() and not deaf
+        if healthy:
+            self._last_check = now
+            self._last_dir_mtime = dir_mtime
+            return True
+
+        reason = "observer stopped" if not self.active.is_alive() else "no events for folder changes"
+        self.logger.warning(f"Native watcher unhealthy on {self.path} ({reason}), switching to polling")
+        self._switches.inc()
+        self.active.stop()
+        self.active = PollingBackend(self.path, self.handler, since=self._last_check,
+                                     **self.polling_options)
+        self.active.start()
+        self._next_probe = now + self.reprobe_interval
+        return False
+
+    def check_probe(self) -> bool:
+        """While polling: start or judge a native probe. True once native has taken over again."""
+        if isinstance(self.active, NativeBackend):
+            return True
+        now = time.time()
+        if self._probe is None:
+            if now >= self._next_probe:
+                self._start_probe()
+            return False
+
+        native, tap = self._probe
+        if not native.is_alive():
+            return self._probe_failed("observer stopped")
+        dir_mtime = self._dir_mtime()
+        if dir_mtime is None or dir_mtime == self._probe_dir_mtime or dir_mtime / 1e9 > now - 1:
+            return False  # No folder change to judge by yet (or its events may be on their way)
+        if not tap.events:
+            return self._probe_failed("no events for folder changes")
+
+        # Native heard the change: give it the real handler first, so nothing falls in between
+        tap.handler = self.handler
+        polling = self.active
+        self.active, self._tap, self._probe = native, tap, None
+        polling.stop()
+        self._last_check, self._last_dir_mtime = now, dir_mtime
+        self.reprobe_interval = self.reprobe_min
+        self._switches.inc()
+        self.logger.info(f"Native watcher healthy again on {self.path}, leaving polling")
+        return True
+
+    def _start_probe(self):
+        tap = _EventTap(None)
+        native = NativeBackend(self.path, tap)
+        try:
+            native.start()
+        except Exception as e:  # e.g. inotify watches still exhausted
+            self._probe = (native, tap)
+            self._probe_failed(str(e))
+            return
+        self._probe = (native, tap)
+        self._probe_dir_mtime = self._dir_mtime()
+
+    def _probe_failed(self, reason: str) -> bool:
+        native, _ = self._probe
+        self._probe = None
+        native.stop()
+        self.reprobe_interval = min(self.reprobe_max, self.reprobe_interval * 2)
+        self._next_probe = time.time() + self.reprobe_interval
+        self.logger.info(f"Native watcher still unusable on {self.path} ({reason}), "
+                         f"retrying in {self.reprobe_interval:.0f}s")
+        return False
+
+    def _loop(self):
+        while not self._stop.wait(self.health_interval):
+            try:
+                if isinstance(self.active, NativeBackend):
+                    self.check_health()
+                else:
+                    self.check_probe()
+            except Exception as e:
+                self.logger.error(f"Watcher health check failed: {e}")
+
+    @property
+    def mode(self) -> str:
+        return self.active.name
+
+    def start(self):
+        self.active.start()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.active.stop()
+        if self._probe is not None:
+            self._probe[0].stop()
+
+
+def create_backend(kind: str, path: str, handler, settings: dict = None) -> WatchBackend:
+    """Build the backend named by watcher.backend ("auto", "native" or "polling")."""
+    settings = settings or {}
+    polling_options = {
+        "min_interval": settings.get("poll_min_seconds", 1.0),
+        "max_interval": settings.get("poll_max_seconds", 30.0),
+    }
+    if kind == "native":
+        return NativeBackend(path, handler)
+    if kind == "polling":
+        return PollingBackend(path, handler, **polling_options)
+    if kind == "auto":
+        return AutoBackend(path, handler, settings.get("health_check_seconds", 30.0), **polling_options)
+    raise ValueError(f"Unknown watcher backend: {kind!r} (expected one of {BACKENDS})")
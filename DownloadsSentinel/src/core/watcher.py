@@ -1,32 +1,123 @@
-from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from fnmatch import fnmatchcase
 import os
 import logging
 import time
 
+from core.metrics import registry
+from core.watch_backends import create_backend
+
+# Browser -> glob patterns of its in-progress download names (matched lowercase).
+# Each browser renames the temp file to the final name once the download is done.
+DEFAULT_TEMP_PATTERNS = {
+    "chromium": ["*.crdownload"],   # Chrome, Edge, Brave, Vivaldi
+    "firefox": ["*.part"],
+    "opera": ["*.opdownload"],
+    "safari": ["*.download"],
+    "generic": ["*.tmp", "*.partial"],
+}
+
+DISPATCH_METRIC = "sentinel_watcher_dispatch_total"
+
+
 class DownloadHandler(FileSystemEventHandler):
-    def __init__(self, callback):
+    def __init__(self, callback, temp_patterns: dict = None, fast_path: bool = True):
         self.callback = callback
+        self.temp_patterns = {
+            browser: [p.lower() for p in patterns]
+            for browser, patterns in (temp_patterns or DEFAULT_TEMP_PATTERNS).items()
+        }
+        self.fast_path = fast_path
+        self._events = registry.counter("sentinel_watcher_events_total")
+        self._event_latency = registry.stage("watcher_event")
+        self._readiness = registry.stage("readiness_wait")
+        self._slow = registry.counter(DISPATCH_METRIC, path="slow")
+        self._fast = {}  # browser -> Counter, created on first use
+        # This handler's own totals for fast_path_stats() (the registry is process-wide)
+        self.fast_count = 0
+        self.slow_count = 0
+        self._slow_probe_ms = 0.0
+
+    def temp_browser(self, filename: str) -> str | None:
+        """The browser whose in-progress pattern matches `filename`, if any."""
+        lower_name = filename.lower()
+        for browser, patterns in self.temp_patterns.items():
+            if any(fnmatchcase(lower_name, pattern) for pattern in patterns):
+                return browser
+        return None
+
+    def is_temp_file(self, filename: str) -> bool:
+        return self.temp_browser(filename) is not None
 
     def on_created(self, event):
         if not event.is_directory:
             self._process_event(event.src_path)
             
     def on_moved(self, event):
-        if not event.is_directory:
+        if event.is_directory:
+            return
+        # "name.zip.crdownload" → "name.zip": the browser has finished and closed the file
+        browser = self.temp_browser(os.path.basename(event.src_path)) if self.fast_path else None
+        if browser and not self.is_temp_file(os.path.basename(event.dest_path)):
+            self._dispatch_completed(event.dest_path, browser)
+        else:
             self._process_event(event.dest_path)
             
-    def _process_event(self, file_path):
+    def _dispatch_completed(self, file_path, browser):
+        """Fast path: a temp → final rename is the completion signal, skip the lock probe."""
+        self._events.inc()
+        self._observe_event_latency(file_path)
+        counter = self._fast.get(browser)
+        if counter is None:
+            counter = self._fast[browser] = registry.counter(DISPATCH_METRIC, path="fast", browser=browser)
+        counter.inc()
+        self.fast_count += 1
+        self.callback(file_path)
+
+    def _observe_event_latency(self, file_path):
+        # Last write (browser finished) → event delivered
+        try:
+            self._event_latency.observe((time.time() - os.path.getmtime(file_path)) * 1000)
+        except OSError:
+            pass
+            
+    def _process_event(self, file_path, from_scan=False):
         """Process file event with checks."""
         filename = os.path.basename(file_path)
         
         # 1. Ignore temporary/partial download files
-        if filename.endswith(('.crdownload', '.part', '.tmp', '.download')):
+        if self.is_temp_file(filename):
             return
 
+        self._events.inc()
+        if not from_scan:
+            self._observe_event_latency(file_path)
+
         # 2. Wait for file to be ready (released by browser)
-        if self._wait_for_file_ready(file_path):
+        start = time.perf_counter()
+        ready = self._wait_for_file_ready(file_path)
+        probe_ms = (time.perf_counter() - start) * 1000
+        self._readiness.observe(probe_ms)
+        if not from_scan:
+            self._slow.inc()
+            self.slow_count += 1
+            self._slow_probe_ms += probe_ms
+        if ready:
             self.callback(file_path)
+
+    def fast_path_stats(self) -> dict:
+        """
+        Share of downloads dispatched on the rename fast path, and the lock
+        probe time it saved (fast dispatches × mean slow-path probe time).
+        """
+        fast, slow = self.fast_count, self.slow_count
+        mean_probe_ms = self._slow_probe_ms / slow if slow else 0.0
+        return {
+            "fast": fast,
+            "slow": slow,
+            "fast_share": fast / (fast + slow) if fast + slow else 0.0,
+            "saved_ms_estimate": round(fast * mean_probe_ms, 1),
+        }
             
     def _wait_for_file_ready(self, file_path, timeout=10):
         """
@@ -47,26 +138,39 @@ class DownloadHandler(FileSystemEventHandler):
         return False
 
 class FileWatcher:
-    def __init__(self, path, callback):
+    def __init__(self, path, callback, temp_patterns: dict = None, fast_path: bool = True,
+                 backend: str = "native", backend_settings: dict = None):
         self.path = path
         self.callback = callback
-        self.observer = Observer()
-        self.handler = DownloadHandler(self.callback)
+        self.handler = DownloadHandler(self.callback, temp_patterns, fast_path)
+        # native, polling, or auto (native with a polling fallback); see core.watch_backends
+        self.backend = create_backend(backend, path, self.handler, backend_settings)
         self.logger = logging.getLogger("FileWatcher")
+        self._started = False
 
     def start(self):
         if not os.path.exists(self.path):
             self.logger.warning(f"Path {self.path} does not exist.")
             return
             
-        self.observer.schedule(self.handler, self.path, recursive=False)
-        self.observer.start()
-        self.logger.info(f"Watcher started on: {self.path}")
+        self.backend.start()
+        self._started = True
+        self.logger.info(f"Watcher started on: {self.path} ({self.backend.name})")
+
+    def is_temp_file(self, filename):
+        """True for in-progress browser downloads (configured temp patterns)."""
+        return self.handler.is_temp_file(filename)
 
     def process_existing_file(self, file_path):
         """Manually trigger processing for an existing file (used by Scanner)."""
-        self.handler._process_event(file_path)
+        self.handler._process_event(file_path, from_scan=True)
 
     def stop(self):
-        self.observer.stop()
-        self.observer.join()
+        if self._started:
+            self.backend.stop()
+            self._started = False
+        stats = self.handler.fast_path_stats()
+        if stats["fast"] or stats["slow"]:
+            self.logger.info(
+                f"Rename fast path: {stats['fast']} of {stats['fast'] + stats['slow']} downloads, "
+                f"~{stats['saved_ms_estimate']:.0f} ms of lock probing saved")
@@ -0,0 +1,265 @@
+"""
+WorkerSupervisor - Worker process lifecycle
+
+The master talks to the worker through this object: it owns the job
+queue, spawns the worker process and routes control commands to it.
+
+worker.lifecycle:
+  persistent - spawned at boot and kept running (respawned if it dies)
+  on_demand  - spawned by the first queued task; after idle_exit_seconds
+               without work the worker asks to retire, and the master lets
+               it exit fully (interpreter, SDKs, thread pool and all)
+
+With worker.prewarm_spare, an import-warmed spare process waits while no
+worker is running and becomes the worker on the next task, cutting the
+spawn latency to a queue round-trip.
+
+Retiring is a handshake so no job is stranded: the worker reports "idle",
+and the master only sends "exit" if it has queued nothing in the same
+period. Anything queued after that spawns a new worker.
+
+Workers ignore SIGTERM/SIGINT (see core.sentinel_worker), so stopping
+one is always drain() or stop(), which kills what will not exit.
+"""
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+
+from core.live_stats import LiveStats
+from core.metrics import registry
+from core.sentinel_worker import spare_process_entry, warm_modules, worker_process_entry
+
+
+class WorkerSupervisor:
+    EXITED_GRACE = 2.0  # seconds for a drained worker's "exited" to reach the master
+
+    def __init__(self, config: dict, secrets: dict, result_queue, log_queue=None,
+                 context=multiprocessing, live_stats: LiveStats = None):
+        self.config = config
+        self.secrets = secrets
+        self.result_queue = result_queue  # worker → master; the master forwards lifecycle messages
+        self.log_queue = log_queue
+        self.context = context
+        self.job_queue = context.Queue()
+        self.live_stats = live_stats or LiveStats(context=context)  # block handed to every worker
+        self.logger = logging.getLogger("WorkerSupervisor")
+
+        self.process = None
+        self.control_queue = None  # one per worker, so a retiring worker can't eat new commands
+        self._retiring = []  # (process, control_queue) told to exit, joined once they have
+        self._spare = None  # (process, activation_queue, control_queue)
+        self._spawned_at = {}  # pid -> time.time() of spawn (or spare activation)
+        self._last_put = 0.0
+        self._profiling = None  # tray override, replayed to new workers
+        self._lock = threading.Lock()
+        self._exited = set()  # pids whose "exited" message has arrived
+        self._exited_cond = threading.Condition(self._lock)
+        self._shutting_down = False
+        self._spawn_latency = registry.stage("worker_spawn")
+        self._spawns = registry.counter("sentinel_worker_spawns_total")
+        # multiprocessing's own exit handler terminates daemon children with
+        # SIGTERM and joins them forever; ours runs first and kills them
+        atexit.register(self.stop)
+
+    # -- settings -------------------------------------------------------
+
+    @property
+    def lifecycle(self) -> str:
+        return self.config.get("worker", {}).get("lifecycle", "persistent")
+
+    @property
+    def idle_exit_seconds(self) -> float:
+        return self.config.get("worker", {}).get("idle_exit_seconds", 300)
+
+    @property
+    def prewarm_spare(self) -> bool:
+        return self.lifecycle == "on_demand" and self.config.get("worker", {}).get("prewarm_spare", False)
+
+    def _worker_config(self) -> dict:
+        if self._profiling is None:
+            return self.config
+        return dict(self.config, profiling=dict(self.config.get("profiling", {}), enabled=self._profiling))
+
+    # -- lifecycle ------------------------------------------------------
+
+    def start(self):
+        with self._lock:
+            if self.lifecycle == "persistent":
+                self._spawn()
+            elif self.prewarm_spare:
+                self._ensure_spare()
+
+    def _alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def _spawn(self):
+        """Start a worker: activate the spare if there is one, else a fresh process."""
+        self._spawns.inc()
+        if self._spare is not None and self._spare[0].is_alive():
+            process, activation_queue, control_queue = self._spare
+            self._spare = None
+            activation_queue.put((self._worker_config(), self.secrets))
+            how = "spare"
+        else:
+            control_queue = self.context.Queue()
+            process = self.context.Process(
+                target=worker_process_entry,
+                args=(self.job_queue, self._worker_config(), self.secrets, self.result_queue,
+                      control_queue, self.log_queue, self.live_stats.block),
+                daemon=True
+            )
+            process.start()
+            how = "new"
+        self.process, self.control_queue = process, control_queue
+        self._spawned_at[process.pid] = time.time()
+        self.logger.info(f"Worker Process Started (PID: {process.pid}, {how})")
+
+    def _ensure_spare(self):
+        if self._spare is not None and self._spare[0].is_alive():
+            return
+        activation_queue, control_queue = self.context.Queue(), self.context.Queue()
+        process = self.context.Process(
+            target=spare_process_entry,
+            args=(activation_queue, self.job_queue, self.result_queue, control_queue, self.log_queue,
+                  warm_modules(self.config), self.live_stats.block),
+            daemon=True
+        )
+        process.start()
+        self._spare = (process, activation_queue, control_queue)
+        self.logger.info(f"Spare worker prewarming (PID: {process.pid})")
+
+    def put(self, item):
+        """Queue a job, spawning the worker first if none is running."""
+        with self._lock:
+            self._last_put = time.time()
+            if not self._alive():
+                self._reap()
+                self._spawn()
+            self.job_queue.put(item)
+            self.live_stats.add("jobs_queued")
+
+    def _retire(self):
+        """Tell the current worker to exit; the next job spawns a new one."""
+        self._retiring.append((self.process, self.control_queue))
+        self.control_queue.put(("exit", None))
+        self.logger.info(f"Worker idle for {self.idle_exit_seconds}s, retiring (PID: {self.process.pid})")
+        self.process, self.control_queue = None, None
+
+    def _reap(self, exited_pid: int = None):
+        for entry in self._retiring[:]:
+            process = entry[0]
+            if process.pid == exited_pid:
+                process.join(timeout=5)  # Sent "exited" as its last act
+            if not process.is_alive():
+                process.join(timeout=0)
+                self._retiring.remove(entry)
+
+    def handle_message(self, kind: str, pid: int, payload) -> bool:
+        """Lifecycle messages from a worker. Returns False for other kinds."""
+        if kind == "ready":
+            spawned_at = self._spawned_at.pop(pid, None)
+            if spawned_at is not None:
+                latency_ms = (payload - spawned_at) * 1000
+                self._spawn_latency.observe(latency_ms)
+                self.logger.info(f"Worker {pid} ready in {latency_ms:.0f} ms")
+        elif kind == "idle":
+            with self._lock:
+                quiet = time.time() - self._last_put >= self.idle_exit_seconds
+                if self.lifecycle == "on_demand" and quiet and self._alive() and self.process.pid == pid:
+                    self._retire()
+        elif kind == "exited":
+            with self._lock:
+                self._exited.add(pid)
+                self._exited_cond.notify_all()
+                self._reap(pid)
+                if self.prewarm_spare and not self._alive() and not self._shutting_down:
+                    self._ensure_spare()
+        else:
+            return False
+        return True
+
+    # -- commands -------------------------------------------------------
+
+    def send_control(self, command: str, value):
+        """Forward a command to the running worker; new workers start from current state."""
+        if command == "profiling":
+            self._profiling = bool(value)
+        with self._lock:
+            if self._alive():
+                self.control_queue.put((command, value))
+
+    def update_config(self, config: dict):
+        with self._lock:
+            self.config = config
+            if self.lifecycle == "persistent" and not self._alive():
+                self._spawn()
+            elif self.prewarm_spare and not self._alive():
+                self._ensure_spare()
+
+    def drain(self, timeout: float = 30) -> bool:
+        """
+        Graceful shutdown: the worker finishes everything already queued
+        and exits by itself. Whatever is still running after `timeout`
+        seconds is killed. Returns True only if every worker reported
+        "exited" and every process exited with code 0.
+        """
+        with self._lock:
+            self._shutting_down = True
+            if self._alive():
+                self.control_queue.put(("drain", None))
+            elif not self.job_queue.empty():
+                self._spawn()  # on_demand: jobs queued with no worker yet
+                self.control_queue.put(("drain", None))
+            if self._spare is not None:
+                self._spare[1].put(None)  # Tells the spare to exit without activating
+            # (process, whether it runs a worker loop that reports "exited")
+            processes = [(p, True) for p, _ in self._retiring]
+            if self.process:
+                processes.append((self.process, True))
+            if self._spare:
+                processes.append((self._spare[0], False))
+            self.process, self._spare, self._retiring = None, None, []
+
+        deadline = time.time() + timeout
+        clean = True
+        for process, reports_exit in processes:
+            process.join(timeout=max(0.0, deadline - time.time()))
+            if process.is_alive():
+                self.logger.warning(f"Worker {process.pid} did not drain in {timeout}s, killing")
+                process.kill()
+                process.join(timeout=5)
+                clean = False
+            elif process.exitcode != 0:
+                self.logger.warning(f"Worker {process.pid} exited with code {process.exitcode} while draining")
+                clean = False
+            elif reports_exit and not self._wait_exited(process.pid, deadline):
+                self.logger.warning(f"Worker {process.pid} exited without finishing its drain")
+                clean = False
+        if processes:
+            self.logger.info("Worker Process Drained" if clean else "Worker Process Stopped")
+        return clean
+
+    def _wait_exited(self, pid: int, deadline: float) -> bool:
+        """Whether `pid` sent "exited"; it was its last message, so it may still be in flight."""
+        with self._lock:
+            return self._exited_cond.wait_for(lambda: pid in self._exited,
+                                              timeout=max(self.EXITED_GRACE, deadline - time.time()))
+
+    def stop(self):
+        """Stop the worker, any retiring workers and the spare."""
+        with self._lock:
+            self._shutting_down = True
+            processes = [p for p, _ in self._retiring]
+            if self.process:
+                processes.append(self.process)
+            if self._spare:
+                processes.append(self._spare[0])
+            self.process, self._spare, self._retiring = None, None, []
+        for process in processes:
+            if process.is_alive():
+                process.kill()  # Workers ignore SIGTERM
+                process.join(timeout=5)
+        if processes:
+            self.logger.info("Worker Process Stopped")
@@ -0,0 +1,107 @@
+"""
+sentinel-find - Ask the file index where things went
+
+    python src/find.py invoice                    # newest files named like "invoice*"
+    python src/find.py invoice --since 1d         # ... filed in the last day
+    python src/find.py --category Documents -n 50
+    python src/find.py --stats --days 7           # files and bytes per day and category
+    python src/find.py --same-as ~/Documents/a.pdf
+
+Reads the SQLite index the worker writes (index.path in config.json),
+read-only, so it can run while Sentinel is filing.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from core.file_index import IndexReader, file_hash, index_path
+
+SINCE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_since(value: str) -> float:
+    """'30m', '12h', '2d', '1w' or a date ('2024-03-01') -> epoch seconds."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([mhdw])", value.strip().lower())
+    if match:
+        return time.time() - float(match.group(1)) * SINCE_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a duration (2d, 12h) or date: {value}")
+
+
+def format_size(size) -> str:
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="sentinel-find",
+                                     description="Look up filed files in Sentinel's index.")
+    parser.add_argument("words", nargs="*", help="words in the file name (prefixes match)")
+    parser.add_argument("--category", "-c", help="only this category")
+    parser.add_argument("--since", "-s", type=parse_since, metavar="AGE|DATE",
+                        help="filed within AGE (30m, 12h, 2d, 1w) or since DATE")
+    parser.add_argument("--limit", "-n", type=int, default=20, help="most results (default: 20)")
+    parser.add_argument("--same-as", metavar="FILE", help="files with the same content hash as FILE")
+    parser.add_argument("--stats", action="store_true", help="daily totals instead of files")
+    parser.add_argument("--days", type=int, default=7, help="days of --stats (default: 7)")
+    parser.add_argument("--json", action="store_true", help="one JSON object per line")
+    parser.add_argument("--db", metavar="PATH", help="index database (default: from config.json)")
+    parser.add_argument("--config", metavar="PATH", help="config.json to read index.path from")
+    return parser.parse_args(argv)
+
+
+def read_config(config_path: str = None) -> dict:
+    config_path = config_path or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'config.json')
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    config = read_config(args.config)
+    path = args.db or index_path(config)
+    if not os.path.exists(path):
+        print(f"No index at {path} (is index.enabled on?)", file=sys.stderr)
+        return 2
+
+    reader = IndexReader(path)
+    start = time.perf_counter()
+    try:
+        if args.stats:
+            rows = reader.daily(args.days)
+        elif args.same_as:
+            digest = file_hash(args.same_as, config.get("index", {}).get("hash", "sample"))
+            rows = reader.same_content(digest, args.limit) if digest else []
+        else:
+            rows = reader.search(" ".join(args.words), args.category, args.since, args.limit)
+    finally:
+        reader.close()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for row in rows:
+        if args.json:
+            print(json.dumps(row, ensure_ascii=False))
+        elif args.stats:
+            print(f"{row['day']}  {row['category']:<14} {row['files']:>7} files  {format_size(row['bytes']):>10}")
+        else:
+            when = datetime.fromtimestamp(row["decided_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{when}  {row['category']:<14} {format_size(row['size']):>10}  {row['dest']}")
+    print(f"{len(rows)} result(s) in {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
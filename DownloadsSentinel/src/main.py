@@ -3,20 +3,34 @@ Windows Downloads Sentinel - Main Entry Point (SentinelMaster)
 
 Process A: The Master (GUI & Watcher)
 Runs on the Main Thread. Critical constraint: Must remain under 15MB RAM and 0.1% CPU.
+
+    python main.py                      tray app (Windows desktop)
+    python main.py --headless           daemon: no tray or settings window,
+                                        logs to stdout/journald, SIGTERM drains
+    python main.py --config PATH        use another config.json
 """
+import argparse
 import os
 import json
 import multiprocessing
+import signal
 import sys
 import time
+import threading
 import logging
-from logging.handlers import RotatingFileHandler
 
 from core.gaming_detector import GamingDetector
 from core.watcher import FileWatcher
 from core.task_dispatcher import TaskDispatcher
-from core.sentinel_worker import worker_process_entry
-from ui.tray import TrayIcon
+# Cheap on purpose: the AI stack is imported inside the worker process only
+from core.worker_supervisor import WorkerSupervisor
+from core.metrics import MetricsAggregator, MetricsServer
+from core.live_stats import LiveStats, ThroughputMeter, describe
+from core.log_pipeline import set_level, start_listener
+from core.config_watcher import ConfigWatcher, write_config
+from core.roots import ScanScheduler, parse_roots
+# Only the launcher: Tk and customtkinter load in the settings process
+from ui.settings_launcher import SettingsLauncher
 
 
 class SentinelMaster:
@@ -26,39 +40,59 @@ class SentinelMaster:
     and launches the System Tray icon.
     """
     
-    def __init__(self):
+    # Settings only read at startup; a change is logged but needs a restart
+    RESTART_KEYS = ("metrics.port", "logging.format", "logging.rate_limit_per_second",
+                    "logging.rate_limit_burst")
+    
+    # Detector settings; a change rebuilds the detector
+    DETECTOR_KEYS = ("performance.busy_providers", "performance.load_threshold",
+                     "performance.busy_processes")
+    
+    def __init__(self, headless: bool = False, config_path: str = None):
+        self.headless = headless  # No tray, no settings window, no GUI imports
         self.config = None
         self.secrets = None
-        self.config_path = None
+        self.config_path = config_path
+        
+        # IPC Queues (multiprocessing-safe); jobs and control commands go through the supervisor
+        self.result_queue = multiprocessing.Queue()  # worker → master (metrics, lifecycle)
+        self.log_queue = multiprocessing.Queue()  # log records from every thread and the worker
+        self.log_listener = None
         
-        # IPC Queue (multiprocessing-safe)
-        self.job_queue = multiprocessing.Queue()
+        # Metrics merged across processes
+        self.metrics = MetricsAggregator()
+        self.metrics_server = None
+        self.log_dir = None
+        
+        # Status counters in shared memory, written by dispatcher/worker, read by the tray
+        self.live_stats = LiveStats()
+        self.throughput = ThroughputMeter()
+        self._last_status = None
         
         # Components
         self.detector = None
         self.dispatcher = None
-        self.watcher = None
+        self.roots = []
+        self.watchers = {}  # root path -> FileWatcher, one per root
+        self.scan_scheduler = None
+        self.config_watcher = None
         self.tray = None
+        self.settings_launcher = None  # settings window runs in its own process
+        self.running = False
         
-        # Worker Process
-        self.worker_process = None
+        # Worker Process (spawned at boot or on demand, see worker.lifecycle)
+        self.supervisor = None
     
     def setup_logging(self):
-        """Configure logging for the master process."""
+        """
+        Configure logging for the master process.
+        One listener thread writes sentinel.log for both processes.
+        Headless writes stdout only; the service manager keeps the log.
+        """
         log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        log_file = os.path.join(log_dir, 'sentinel.log')
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s [%(name)s] %(message)s',
-            handlers=[
-                RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        self.log_dir = log_dir
+        self.log_listener = start_listener(self.log_queue, log_dir, 'sentinel.log', self.config or {},
+                                           console_only=self.headless)
     
     def get_base_path(self):
         """Get the base path for resources. Handles PyInstaller bundled exe."""
@@ -71,9 +105,10 @@ class SentinelMaster:
     
     def load_config(self):
         """Load configuration files."""
-        base_dir = self.get_base_path()
-        self.config_path = os.path.join(base_dir, 'config', 'config.json')
-        secrets_path = os.path.join(base_dir, 'config', 'secrets.json')
+        if not self.config_path:
+            self.config_path = os.path.join(self.get_base_path(), 'config', 'config.json')
+        # secrets.json lives next to whichever config.json is in use
+        secrets_path = os.path.join(os.path.dirname(self.config_path), 'secrets.json')
         
         with open(self.config_path, 'r') as f:
             self.config = json.load(f)
@@ -86,57 +121,164 @@ class SentinelMaster:
     def check_first_run(self):
         """Check if this is the first run and show settings if so."""
         if not self.config.get("general", {}).get("setup_complete", False):
+            if self.headless:
+                logging.warning(f"Setup not complete; running with {self.config_path} as is")
+                return
             logging.info("First run detected. Opening Settings...")
-            self._launch_settings_blocking()
+            self.settings_launcher.open(wait=True)
             # Reload config after settings are saved
             with open(self.config_path, 'r') as f:
                 self.config = json.load(f)
             # Mark setup as complete
             self.config.setdefault("general", {})["setup_complete"] = True
-            with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=4)
+            write_config(self.config_path, self.config)
     
-    def _launch_settings_blocking(self):
-        """Launches the settings window and waits for it to close."""
-        from ui.settings import open_settings
-        open_settings(self.config_path)
+    def _open_settings(self):
+        """Tray action: open the settings window (a separate process)."""
+        self.settings_launcher.open()
+    
+    def _on_settings_closed(self):
+        """Settings process exited: pick up what it saved now rather than on the next poll."""
+        if self.config_watcher:
+            self.config_watcher.check()
     
     def start_worker(self):
-        """Start the worker process."""
-        self.worker_process = multiprocessing.Process(
-            target=worker_process_entry,
-            args=(self.job_queue, self.config, self.secrets),
-            daemon=True
-        )
-        self.worker_process.start()
-        logging.info(f"Worker Process Started (PID: {self.worker_process.pid})")
+        """Start the worker process now (persistent) or on the first task (on_demand)."""
+        self.supervisor.start()
     
     def stop_worker(self):
         """Stop the worker process."""
-        if self.worker_process and self.worker_process.is_alive():
-            self.worker_process.terminate()
-            self.worker_process.join(timeout=5)
-            logging.info("Worker Process Stopped")
+        if self.supervisor:
+            self.supervisor.stop()
+    
+    def _result_loop(self):
+        """Background thread: receive messages from the worker process."""
+        while True:
+            try:
+                kind, source, payload = self.result_queue.get()
+            except (EOFError, OSError):
+                return
+            if kind == "metrics":
+                self.metrics.update(str(source), payload)
+            else:
+                self.supervisor.handle_message(kind, source, payload)
+    
+    def start_metrics(self):
+        """Collect worker metrics; serve them on localhost if metrics.port is set."""
+        threading.Thread(target=self._result_loop, daemon=True).start()
+        port = self.config.get("metrics", {}).get("port")
+        if port:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, port).start()
+            except OSError as e:
+                logging.error(f"Could not start metrics endpoint on port {port}: {e}")
+    
+    def _set_profiling(self, enabled: bool):
+        """Tray toggle: switch the worker's sampling profiler on or off."""
+        logging.info(f"Profiling {'enabled' if enabled else 'disabled'} from tray")
+        self.supervisor.send_control("profiling", enabled)
+    
+    def _on_config_changed(self, new_config: dict, changes: dict):
+        """
+        ConfigWatcher callback: apply the master-side settings and push the
+        new config to the worker, which rebuilds only what changed.
+        """
+        self.config = new_config
+        changed = set(changes)
+        
+        if "performance.cpu_threshold" in changed and self.detector:
+            self.detector.cpu_threshold = new_config["performance"]["cpu_threshold"]
+        if changed.intersection(self.DETECTOR_KEYS) and self.dispatcher:
+            self.detector = GamingDetector.from_config(new_config, headless=self.headless)
+            self.dispatcher.detector = self.detector
+        if any(key.startswith("logging.") for key in changed):
+            set_level(new_config)
+        if self.watchers and any(key == "general.downloads_path" or key.startswith("watcher.")
+                                 for key in changed):
+            self._restart_watchers()
+        elif "general.scan_interval_minutes" in changed and self.scan_scheduler:
+            self.scan_scheduler.default_interval_minutes = self._scan_interval_minutes()
+        for key in changed.intersection(self.RESTART_KEYS):
+            logging.warning(f"{key} changes take effect after a restart")
+        
+        self.supervisor.update_config(new_config)
+        self.supervisor.send_control("config", (new_config, sorted(changed)))
+    
+    def _scan_interval_minutes(self) -> float:
+        return self.config["general"].get("scan_interval_minutes", 60)
+    
+    def _create_watchers(self):
+        """One watcher per root, all feeding the shared dispatcher and worker."""
+        settings = self.config.get("watcher", {})
+        self.roots = parse_roots(self.config)
+        self.watchers = {}
+        for root in self.roots:
+            callback = lambda path, priority=root.priority: self.dispatcher.on_file_created(path, priority)
+            self.watchers[root.path] = FileWatcher(
+                root.path, callback,
+                temp_patterns=settings.get("temp_patterns"),
+                fast_path=settings.get("fast_path", True),
+                backend=settings.get("backend", "auto"), backend_settings=settings
+            )
+        self.scan_scheduler = ScanScheduler(
+            self.roots, self._scan_interval_minutes(),
+            stagger_seconds=self.config["general"].get("scan_stagger_seconds", 15),
+            now=time.time()
+        )
+    
+    def _start_watchers(self):
+        for watcher in self.watchers.values():
+            watcher.start()
+    
+    def _stop_watchers(self):
+        for watcher in self.watchers.values():
+            watcher.stop()
     
-    def _scan_existing_files(self):
+    def _restart_watchers(self):
+        """Watch the new set of roots (or with new watcher settings)."""
+        self._stop_watchers()
+        self._create_watchers()
+        self._start_watchers()
+    
+    def start_config_watcher(self):
+        """Reload config.json when it changes on disk (settings window or hand edits)."""
+        self.config_watcher = ConfigWatcher(self.config_path, self.config, self._on_config_changed)
+        self.config_watcher.start()
+    
+    def _refresh_tray_status(self):
+        """Read the shared counters and update the tray tooltip and status lines."""
+        stats = self.live_stats.snapshot()
+        now = time.time()
+        files_per_minute = self.throughput.update(now, stats["files_done"])
+        state, lines = describe(stats, files_per_minute, now)
+        if (state, lines) != self._last_status:
+            self._last_status = (state, lines)
+            self.tray.set_status(f"Downloads Sentinel - {state}", lines)
+    
+    def _write_metrics_snapshot(self):
+        try:
+            self.metrics.write_snapshot(os.path.join(self.log_dir, 'metrics.json'))
+        except OSError as e:
+            logging.error(f"Could not write metrics snapshot: {e}")
+    
+    def _scan_existing_files(self, root):
         """
-        Periodically scan the downloads folder for unorganized files.
+        Periodically scan one root folder for unorganized files.
         
-        This method iterates through the downloads directory, filtering out:
+        This method iterates through the root directory, filtering out:
         - Directories
-        - Temporary download files (.crdownload, .part, etc.)
+        - Temporary download files (watcher.temp_patterns: .crdownload, .part, etc.)
         - Files currently being written (checked via modification time)
         
-        Valid files are passed to the Watcher's processing logic to be queued.
+        Valid files are passed to the root's Watcher processing logic to be queued.
         """
-        dl_path = os.path.expandvars(
-            self.config["general"].get("downloads_path", "%USERPROFILE%\\Downloads")
-        )
+        dl_path = root.path
+        watcher = self.watchers.get(root.path)
         
         if not os.path.exists(dl_path):
             return
 
-        logging.info("Starting periodic file scan...")
+        logging.info(f"Starting periodic file scan of {root.name}...")
         
         try:
             # Sequential Iteration
@@ -147,7 +289,7 @@ class SentinelMaster:
                 if os.path.isdir(file_path):
                     continue
                     
-                if filename.endswith(('.crdownload', '.part', '.tmp', '.download')):
+                if watcher and watcher.is_temp_file(filename):
                     continue
                 
                 # Check modification time to avoid active downloads race condition
@@ -159,90 +301,144 @@ class SentinelMaster:
                     continue
 
                 # Reuse Watcher logic (includes file locking check)
-                if self.watcher:
-                    self.watcher.process_existing_file(file_path)
+                if watcher:
+                    watcher.process_existing_file(file_path)
                     
         except Exception as e:
             logging.error(f"Error during periodic scan: {e}")
 
+    def _install_signal_handlers(self):
+        """SIGTERM (service stop) and SIGINT end the main loop, which then drains."""
+        def request_stop(signum, frame):
+            logging.info(f"Received {signal.Signals(signum).name}, shutting down")
+            self.running = False
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, request_stop)
+    
     def main(self):
         """Main entry point."""
+        self.load_config()
         self.setup_logging()
-        logging.info("Starting Windows Downloads Sentinel...")
+        logging.info(f"Starting Windows Downloads Sentinel{' (headless)' if self.headless else ''}...")
         
-        self.load_config()
+        if not self.headless:
+            self.settings_launcher = SettingsLauncher(self.config_path, on_closed=self._on_settings_closed)
         self.check_first_run()
         
         # 1. Initialize Components
-        self.detector = GamingDetector(
-            cpu_threshold=self.config["performance"].get("cpu_threshold", 85)
-        )
-        self.dispatcher = TaskDispatcher(self.detector, self.job_queue)
+        self.detector = GamingDetector.from_config(self.config, headless=self.headless)
+        self.supervisor = WorkerSupervisor(self.config, self.secrets, self.result_queue, self.log_queue,
+                                           live_stats=self.live_stats)
+        # The supervisor stands in for the job queue: a put spawns the worker if needed
+        self.dispatcher = TaskDispatcher(self.detector, self.supervisor, live_stats=self.live_stats)
         
-        # Downloads path from config
-        dl_path = os.path.expandvars(
-            self.config["general"].get("downloads_path", "%USERPROFILE%\\Downloads")
-        )
-        
-        self.watcher = FileWatcher(dl_path, self.dispatcher.on_file_created)
+        # Roots (downloads_path: one folder or a list) from config
+        self._create_watchers()
         
-        self.tray = TrayIcon(
-            on_quit_callback=self._quit_app,
-            on_settings_callback=self._launch_settings_blocking
-        )
+        if not self.headless:
+            # pystray talks to the display server at import time
+            from ui.tray import TrayIcon
+            self.tray = TrayIcon(
+                on_quit_callback=self._quit_app,
+                on_settings_callback=self._open_settings,
+                on_profiling_callback=self._set_profiling,
+                profiling_enabled=self.config.get("profiling", {}).get("enabled", False)
+            )
         
         # 2. Start Worker Process
         self.start_worker()
+        self.start_metrics()
         
         # 3. Start Dispatcher (buffer monitor)
         self.dispatcher.start()
         
-        # 4. Start Watcher
-        self.watcher.start()
+        # 4. Start Watchers (and pick up config edits from now on)
+        self._start_watchers()
+        self.start_config_watcher()
         
         # 5. Start Tray (non-blocking)
-        print("Sentinel Active. Check System Tray.")
-        self.tray.run()
-        
-        # Initial Scan
-        self._scan_existing_files()
-        last_scan_time = time.time()
-        
         self.running = True
+        if self.headless:
+            self._install_signal_handlers()
+            logging.info("Sentinel Active (headless).")
+        else:
+            print("Sentinel Active. Check System Tray.")
+            self.tray.run()
+        
+        last_metrics_time = time.time()
+        last_status_time = 0.0
         
         # Keep main thread alive & Periodic Scan Loop
         try:
             while self.running:
                 time.sleep(1)
                 
-                # Check Scan Interval
-                interval_minutes = self.config["general"].get("scan_interval_minutes", 60)
-                interval_seconds = interval_minutes * 60
+                # Staggered scans: the startup scan and each root's interval
+                root = self.scan_scheduler.next_due(time.time())
+                if root:
+                    self._scan_existing_files(root)
+                
+                # Periodic JSON metrics snapshot in logs/
+                snapshot_interval = self.config.get("metrics", {}).get("snapshot_interval_seconds", 60)
+                if snapshot_interval and time.time() - last_metrics_time > snapshot_interval:
+                    self._write_metrics_snapshot()
+                    last_metrics_time = time.time()
                 
-                if time.time() - last_scan_time > interval_seconds:
-                    self._scan_existing_files()
-                    last_scan_time = time.time()
-                    # Reload config in case settings changed scan interval
-                    self.load_config()
+                # Tray status from shared memory (no messages to the worker)
+                status_interval = self.config.get("tray", {}).get("stats_refresh_seconds", 5)
+                if self.tray and status_interval and time.time() - last_status_time >= status_interval:
+                    self._refresh_tray_status()
+                    last_status_time = time.time()
                     
         except KeyboardInterrupt:
             self._quit_app()
+        
+        if self.headless:
+            # The signal handler only stops the loop; drain here, on the main thread
+            self._quit_app(drain=True)
     
-    def _quit_app(self):
-        """Shutdown all components."""
-        print("Shutting down...")
+    def _quit_app(self, drain: bool = False):
+        """
+        Shutdown all components. With `drain`, no new files are accepted but
+        the worker finishes everything already queued (up to
+        worker.drain_timeout_seconds). Files still buffered while the user
+        was busy are left in place for the next startup scan.
+        """
+        if self.headless:
+            logging.info("Shutting down...")
+        else:
+            print("Shutting down...")
         self.running = False
-        self.watcher.stop()
+        if self.config_watcher:
+            self.config_watcher.stop()
+        self._stop_watchers()
         self.dispatcher.stop()
-        self.stop_worker()
+        if drain and self.supervisor:
+            self.supervisor.drain(self.config.get("worker", {}).get("drain_timeout_seconds", 30))
+        else:
+            self.stop_worker()
+        self._write_metrics_snapshot()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.log_listener:
+            self.log_listener.stop()  # Flushes queued records
         if self.tray:
             self.tray.stop()
         # Ensure we exit if called from a thread
         sys.exit(0)
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Organizes new files in your Downloads folder.")
+    parser.add_argument("--headless", action="store_true",
+                        help="run as a daemon: no tray or GUI, log to stdout, drain on SIGTERM")
+    parser.add_argument("--config", metavar="PATH", help="config.json to use (secrets.json next to it)")
+    return parser.parse_args(argv)
+
+
 def main():
     """Entry point for script execution."""
+    args = parse_args()
     # Required for Windows multiprocessing
     if sys.platform == 'win32':
         multiprocessing.freeze_support()
@@ -259,10 +455,13 @@ def main():
         
         if last_error == 183: # ERROR_ALREADY_EXISTS
             # App is already running
-            user32.MessageBoxW(0, "Windows Downloads Sentinel is already running.", "Windows Downloads Sentinel", 0x30)
+            if args.headless:
+                print("Windows Downloads Sentinel is already running.", file=sys.stderr)
+            else:
+                user32.MessageBoxW(0, "Windows Downloads Sentinel is already running.", "Windows Downloads Sentinel", 0x30)
             return
 
-    master = SentinelMaster()
+    master = SentinelMaster(headless=args.headless, config_path=args.config)
     master.main()
 
 
@@ -0,0 +1,300 @@
+"""
+sentinel-organize - One-shot reorganize of a whole directory tree
+
+Walks PATH recursively, classifies every file with the same tier stack
+the worker uses (privacy, rules, learned model, AI) and files it into
+category folders under --dest (default: PATH itself).
+
+    python src/organize.py ~/OldDownloads --dest ~/Archive --jobs 8
+    python src/organize.py ~/OldDownloads --dry-run > plan.jsonl
+    python src/organize.py --resume plan.jsonl
+
+The plan is one JSON object per line:
+    {"src": ..., "dest": ..., "category": ..., "tier": ...}
+Destinations are resolved up front (name clashes become "name (1).ext"),
+so executing a plan needs no classification and is safe to repeat:
+entries already moved are skipped. `--plan FILE` saves the plan of a real
+run before anything moves, so an interrupted run can be resumed.
+
+Category folders already at the top of --dest, hidden folders and
+in-progress browser downloads are not walked.
+"""
+import argparse
+import collections
+import concurrent.futures
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from fnmatch import fnmatchcase
+
+from ai.deadline import Deadline
+from ai.rule_engine import RuleEngine
+from core.roots import parse_roots
+from core.watcher import DEFAULT_TEMP_PATTERNS
+
+# Futures kept in flight per job, so huge trees never sit in memory at once
+INFLIGHT_PER_JOB = 4
+
+
+def iter_files(root: str, skip_dirs=()):
+    """
+    Regular files under `root` (os.scandir, depth first, no symlinks).
+    `skip_dirs` are full directory paths that are not entered.
+    """
+    skip = {os.path.normcase(os.path.abspath(path)) for path in skip_dirs}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logging.warning(f"Cannot read {directory}: {e}")
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(".") and \
+                            os.path.normcase(os.path.abspath(entry.path)) not in skip:
+                        subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path
+            except OSError:
+                continue  # Vanished or unreadable entry
+        stack.extend(reversed(subdirs))
+
+
+def is_temp_file(filename: str, temp_patterns: dict = None) -> bool:
+    lower_name = filename.lower()
+    return any(fnmatchcase(lower_name, pattern.lower())
+               for patterns in (temp_patterns or DEFAULT_TEMP_PATTERNS).values()
+               for pattern in patterns)
+
+
+def category_folders(config: dict) -> set[str]:
+    """Folder names Sentinel files into (never walked when found at the top of --dest)."""
+    rules = RuleEngine()
+    names = set(rules.extension_map.values()) | {category for _, category in rules.signatures}
+    names |= {"Other", "Secure_Vault"}
+    for root in parse_roots(config):
+        names |= {category for _, category in root.rules}
+    return names
+
+
+def bounded_map(pool, fn, items, limit: int):
+    """Like pool.map, but takes `items` lazily with at most `limit` calls queued."""
+    pending = collections.deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Planner:
+    """
+    Assigns every classified file a unique destination path. Each category
+    folder is listed once; after that, clashes are resolved in memory.
+    """
+
+    def __init__(self, dest_root: str):
+        self.dest_root = dest_root
+        self._taken = {}  # target dir -> normcased names on disk or already planned
+        self._next_suffix = {}  # (target dir, normcased name) -> next " (n)" to try
+
+    def _names_in(self, target_dir: str) -> set:
+        names = self._taken.get(target_dir)
+        if names is None:
+            try:
+                names = {os.path.normcase(name) for name in os.listdir(target_dir)}
+            except OSError:
+                names = set()
+            self._taken[target_dir] = names
+        return names
+
+    def destination(self, src: str, category: str) -> str:
+        target_dir = os.path.join(self.dest_root, category)
+        filename = os.path.basename(src)
+        if os.path.normcase(os.path.dirname(src)) == os.path.normcase(target_dir):
+            return src  # Already filed
+        taken = self._names_in(target_dir)
+        candidate = filename
+        key = (target_dir, os.path.normcase(filename))
+        n = self._next_suffix.get(key, 1)
+        name, ext = os.path.splitext(filename)
+        while os.path.normcase(candidate) in taken:
+            candidate = f"{name} ({n}){ext}"
+            n += 1
+        self._next_suffix[key] = n
+        taken.add(os.path.normcase(candidate))
+        return os.path.join(target_dir, candidate)
+
+
+def execute_move(entry: dict) -> str:
+    """Carry out one plan entry: "moved", "done" (already moved), "left", "conflict" or "failed"."""
+    src, dest = entry["src"], entry.get("dest")
+    if not dest:
+        return "left"
+    if not os.path.exists(src):
+        return "done" if os.path.exists(dest) else "failed"
+    if os.path.abspath(src) == os.path.abspath(dest):
+        return "done"
+    if os.path.lexists(dest):
+        return "conflict"  # Something else took the name since the plan was made
+    try:
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.move(src, dest)
+        return "moved"
+    except OSError as e:
+        logging.error(f"Could not move {src}: {e}")
+        return "failed"
+
+
+def read_plan(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_config(config_path: str = None) -> tuple[dict, dict]:
+    if not config_path:
+        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'config', 'config.json')
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    secrets = {}
+    secrets_path = os.path.join(os.path.dirname(config_path), 'secrets.json')
+    if os.path.exists(secrets_path):
+        with open(secrets_path, 'r') as f:
+            secrets = json.load(f)
+    return config, secrets
+
+
+class Organizer:
+    """Walk → classify (parallel) → plan → move (bounded pool), with a running summary."""
+
+    def __init__(self, config: dict, secrets: dict, jobs: int = 4, engine=None):
+        self.config = config
+        self.jobs = max(1, jobs)
+        self._engine = engine
+        self._secrets = secrets
+        self.stats = collections.Counter()
+        self.timings = {}
+
+    @property
+    def engine(self):
+        """The worker's WorkflowEngine, imported only when something needs classifying."""
+        if self._engine is None:
+            from ai.workflow_engine import WorkflowEngine
+            self._engine = WorkflowEngine(self.config, self._secrets, max_concurrency=self.jobs)
+        return self._engine
+
+    def _classify(self, path: str) -> tuple[str, str | None, str]:
+        # A one-shot run has no one waiting on it: no per-file deadline
+        category, tier = self.engine.route_to_engine(path, Deadline(None))
+        return path, category, tier
+
+    def plan(self, root: str, dest_root: str = None, exclude=()):
+        """Yield plan entries for every file under `root`, classified `jobs` at a time."""
+        dest_root = dest_root or root
+        skip = [os.path.join(dest_root, name) for name in category_folders(self.config)]
+        skip += [os.path.join(root, name) for name in exclude]
+        temp_patterns = self.config.get("watcher", {}).get("temp_patterns")
+        files = (path for path in iter_files(root, skip)
+                 if not is_temp_file(os.path.basename(path), temp_patterns))
+        planner = Planner(dest_root)
+        self.engine  # Built here, not racily by the first classify threads
+
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(self.jobs, thread_name_prefix="classify") as pool:
+            for path, category, tier in bounded_map(pool, self._classify, files,
+                                                    self.jobs * INFLIGHT_PER_JOB):
+                self.stats["classified"] += 1
+                dest = planner.destination(path, category) if category else None
+                yield {"src": path, "dest": dest, "category": category, "tier": tier}
+        self.timings["classify"] = time.perf_counter() - start
+        self.engine.save_learned_model()
+
+    def execute(self, entries) -> collections.Counter:
+        """Move every entry through a pool of `jobs` threads."""
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(self.jobs, thread_name_prefix="move") as pool:
+            for status in bounded_map(pool, execute_move, entries, self.jobs * INFLIGHT_PER_JOB):
+                self.stats[status] += 1
+        self.timings["move"] = time.perf_counter() - start
+        return self.stats
+
+    def summary(self) -> dict:
+        summary = {key: self.stats[key] for key in
+                   ("classified", "moved", "done", "left", "conflict", "failed") if key in self.stats}
+        for stage, seconds in self.timings.items():
+            count = self.stats["classified"] if stage == "classify" else sum(
+                self.stats[key] for key in ("moved", "done", "left", "conflict", "failed"))
+            summary[f"{stage}_seconds"] = round(seconds, 2)
+            summary[f"{stage}_files_per_second"] = round(count / seconds, 1) if seconds else None
+        if self._engine is not None:
+            summary["tiers"] = self._engine.tier_metrics()
+        return summary
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="sentinel-organize",
+        description="Classify and file every file under PATH with Sentinel's tiers.")
+    parser.add_argument("path", nargs="?", help="directory tree to organize")
+    parser.add_argument("--dest", help="where category folders go (default: PATH)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 4,
+                        help="parallel classifications and moves (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the plan as JSONL instead of moving anything")
+    parser.add_argument("--plan", metavar="FILE", help="write the plan (JSONL) to FILE")
+    parser.add_argument("--resume", metavar="FILE", help="execute a saved plan, skipping finished moves")
+    parser.add_argument("--exclude", action="append", default=[], metavar="NAME",
+                        help="subfolder of PATH to leave alone (repeatable)")
+    parser.add_argument("--config", metavar="PATH", help="config.json to use (secrets.json next to it)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every file")
+    args = parser.parse_args(argv)
+    if not args.path and not args.resume:
+        parser.error("PATH or --resume is required")
+    if args.path and not os.path.isdir(args.path):
+        parser.error(f"not a directory: {args.path}")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s [%(name)s] %(message)s', stream=sys.stderr)
+    config, secrets = load_config(args.config)
+    organizer = Organizer(config, secrets, jobs=args.jobs)
+
+    if args.resume:
+        organizer.execute(read_plan(args.resume))
+    else:
+        entries = organizer.plan(os.path.abspath(args.path),
+                                 os.path.abspath(args.dest) if args.dest else None, args.exclude)
+        if args.dry_run or args.plan:
+            out = open(args.plan, "w", encoding="utf-8") if args.plan else sys.stdout
+            try:
+                for entry in entries:
+                    out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            finally:
+                if args.plan:
+                    out.close()
+            if not args.dry_run:
+                organizer.execute(read_plan(args.plan))
+        else:
+            organizer.execute(entries)
+
+    print(json.dumps(organizer.summary()), file=sys.stderr)
+    return 1 if organizer.stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,14 @@ from tkinter import filedialog
 import json
 import os
 import sys
-import winreg
+
+from core.config_watcher import write_config
+from core.roots import primary_path, set_primary_path
+
+if sys.platform == 'win32':
+    import winreg
+else:
+    winreg = None  # No "run at startup" registry outside Windows
 
 APP_NAME = "WindowsDownloadsSentinel"
 
@@ -72,7 +79,7 @@ class SettingsWindow(ctk.CTk):
         self.ai_mode_var = ctk.StringVar(value="LOCAL (Ollama)")  # Default to LOCAL
         self.dropdown_ai = ctk.CTkOptionMenu(
             self.ai_mode_frame, 
-            values=["LOCAL (Ollama)", "CLOUD (Gemini)"],  # LOCAL first
+            values=["LOCAL (Ollama)", "CASCADE (Local + Gemini)", "CLOUD (Gemini)"],  # LOCAL first
             variable=self.ai_mode_var,
             command=self.on_ai_mode_changed,
             width=180,
@@ -161,7 +168,8 @@ class SettingsWindow(ctk.CTk):
     
     def on_ai_mode_changed(self, new_value):
         """Callback when AI mode dropdown changes."""
-        if "CLOUD" in new_value and self.show_cloud_warning:
+        # CASCADE escalates uncertain files to Gemini, so it gets the warning too
+        if ("CLOUD" in new_value or "CASCADE" in new_value) and self.show_cloud_warning:
             self._show_cloud_privacy_warning()
     
     def _show_cloud_privacy_warning(self):
@@ -222,6 +230,8 @@ class SettingsWindow(ctk.CTk):
 
     def is_startup_enabled(self):
         """Check if app is registered in Windows startup."""
+        if winreg is None:
+            return False
         try:
             key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
                                  r"Software\Microsoft\Windows\CurrentVersion\Run", 
@@ -234,6 +244,8 @@ class SettingsWindow(ctk.CTk):
 
     def set_startup(self, enable):
         """Add or remove app from Windows startup."""
+        if winreg is None:
+            return
         key = winreg.OpenKey(winreg.HKEY_CURRENT_USER,
                              r"Software\Microsoft\Windows\CurrentVersion\Run",
                              0, winreg.KEY_SET_VALUE)
@@ -274,7 +286,7 @@ class SettingsWindow(ctk.CTk):
                     self.update_cpu_label(cpu_val)
                     # General settings
                     general = data.get("general", {})
-                    dl_path = general.get("downloads_path", "%USERPROFILE%\\Downloads")
+                    dl_path = primary_path(data)
                     # Expand environment variables for display
                     self.folder_path_var.set(os.path.expandvars(dl_path))
                     # Scan Interval (default 60)
@@ -288,11 +300,13 @@ class SettingsWindow(ctk.CTk):
                     self.ai_enabled_var.set(ai_settings.get("enabled", False))
                     # Load "don't show cloud warning" preference
                     self.show_cloud_warning = not ai_settings.get("cloud_warning_dismissed", False)
-                    # AI mode (CLOUD or LOCAL) - default to LOCAL
+                    # AI mode (CLOUD, CASCADE or LOCAL) - default to LOCAL
                     privacy = data.get("privacy", {})
                     mode = privacy.get("mode", "LOCAL")
                     if mode == "CLOUD":
                         self.ai_mode_var.set("CLOUD (Gemini)")
+                    elif mode == "CASCADE":
+                        self.ai_mode_var.set("CASCADE (Local + Gemini)")
                     else:
                         self.ai_mode_var.set("LOCAL (Ollama)")
                     # Sync dropdown state with checkbox
@@ -322,7 +336,7 @@ class SettingsWindow(ctk.CTk):
             
         current_config["performance"]["gamer_mode"] = self.gamer_mode_var.get()
         current_config["performance"]["cpu_threshold"] = int(self.slider_cpu.get())
-        current_config["general"]["downloads_path"] = self.folder_path_var.get()
+        set_primary_path(current_config, self.folder_path_var.get())
         current_config["general"]["run_at_startup"] = self.startup_var.get()
         current_config["general"]["scan_interval_minutes"] = int(self.scan_interval_var.get())
         current_config["ai"]["enabled"] = self.ai_enabled_var.get()
@@ -330,13 +344,15 @@ class SettingsWindow(ctk.CTk):
         
         # Save AI mode (convert display text to config value)
         mode_display = self.ai_mode_var.get()
-        if "LOCAL" in mode_display:
+        if "CASCADE" in mode_display:
+            current_config["privacy"]["mode"] = "CASCADE"
+        elif "LOCAL" in mode_display:
             current_config["privacy"]["mode"] = "LOCAL"
         else:
             current_config["privacy"]["mode"] = "CLOUD"
         
-        with open(self.config_path, 'w') as f:
-            json.dump(current_config, f, indent=4)
+        # The master's config watcher reloads it when this window's process exits
+        write_config(self.config_path, current_config)
             
         self.destroy()
     
@@ -350,11 +366,9 @@ def open_settings(config_path):
     app.mainloop()
 
 if __name__ == "__main__":
-    # Assuming run from src/ui/ or similar, fix path to config
-    # We will pass config path as arg or deduce it
-    # For now, let's assume standard layout relative to this file
-    # This file is in src/ui/settings.py. Config is in ../../config/config.json
+    # Config path as the first argument, else the standard layout:
+    # this file is in src/ui/settings.py, config is in ../../config/config.json
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    config_path = os.path.join(base_dir, 'config', 'config.json')
+    config_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, 'config', 'config.json')
     open_settings(config_path)
 
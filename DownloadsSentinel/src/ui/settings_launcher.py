@@ -0,0 +1,62 @@
+"""
+SettingsLauncher - Opens the settings window in its own process
+
+Tk, customtkinter and their assets cost the master ~10 MB that it would
+keep for good after the first open. The window runs in a short-lived
+spawned process instead; it saves config.json atomically and exits, and
+the master reloads the file as soon as the process is gone.
+
+This module must stay cheap to import: the master imports it, the GUI
+toolkit is only imported in the child.
+"""
+import logging
+import multiprocessing
+import threading
+
+
+def _settings_process_entry(config_path: str):
+    from ui.settings import open_settings
+    open_settings(config_path)
+
+
+class SettingsLauncher:
+    """One settings window at a time; `on_closed()` runs in the master after it exits."""
+
+    def __init__(self, config_path: str, on_closed=None, context=None):
+        self.config_path = config_path
+        self.on_closed = on_closed
+        # spawn: a fresh interpreter, not a fork of the master's threads and memory
+        self.context = context or multiprocessing.get_context("spawn")
+        self.process = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("SettingsLauncher")
+
+    def is_open(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def open(self, wait: bool = False) -> bool:
+        """
+        Start the window unless it is already open (returns False then).
+        With `wait`, return only after it has closed (first run).
+        """
+        with self._lock:
+            if self.is_open():
+                self.logger.info("Settings window already open")
+                return False
+            process = self.process = self.context.Process(
+                target=_settings_process_entry, args=(self.config_path,),
+                name="SentinelSettings", daemon=True
+            )
+            process.start()
+        if wait:
+            self._wait(process)
+        else:
+            threading.Thread(target=self._wait, args=(process,), daemon=True).start()
+        return True
+
+    def _wait(self, process):
+        process.join()
+        if process.exitcode:
+            self.logger.warning(f"Settings window exited with code {process.exitcode}")
+        if self.on_closed:
+            self.on_closed()
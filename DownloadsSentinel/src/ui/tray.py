@@ -5,9 +5,15 @@ import os
 
 
 class TrayIcon:
-    def __init__(self, on_quit_callback, on_settings_callback):
+    STATUS_LINES = 4  # Fixed menu slots; unused ones are hidden
+
+    def __init__(self, on_quit_callback, on_settings_callback,
+                 on_profiling_callback=None, profiling_enabled=False):
         self.on_quit_callback = on_quit_callback
         self.on_settings_callback = on_settings_callback
+        self.on_profiling_callback = on_profiling_callback
+        self.profiling_enabled = profiling_enabled
+        self.status_lines = []
         self.icon = None
 
     def create_image(self):
@@ -42,12 +48,37 @@ class TrayIcon:
             settings_thread = threading.Thread(target=self.on_settings_callback, daemon=True)
             settings_thread.start()
 
-    def run(self):
-        menu = pystray.Menu(
-            pystray.MenuItem("Settings", self.on_settings),
-            pystray.MenuItem("Quit", self.on_quit)
+    def on_toggle_profiling(self, icon, item):
+        self.profiling_enabled = not self.profiling_enabled
+        if self.on_profiling_callback:
+            self.on_profiling_callback(self.profiling_enabled)
+
+    def set_status(self, title, lines):
+        """Tooltip and the read-only status lines at the top of the menu."""
+        self.status_lines = list(lines)[:self.STATUS_LINES]
+        if self.icon:
+            self.icon.title = title
+            self.icon.update_menu()
+
+    def _status_item(self, index):
+        return pystray.MenuItem(
+            lambda item: self.status_lines[index] if index < len(self.status_lines) else "",
+            None, enabled=False,
+            visible=lambda item: index < len(self.status_lines)
         )
 
+    def run(self):
+        items = [self._status_item(i) for i in range(self.STATUS_LINES)]
+        items.append(pystray.Menu.SEPARATOR)
+        items.append(pystray.MenuItem("Settings", self.on_settings))
+        if self.on_profiling_callback:
+            items.append(pystray.MenuItem(
+                "Profiling", self.on_toggle_profiling,
+                checked=lambda item: self.profiling_enabled
+            ))
+        items.append(pystray.MenuItem("Quit", self.on_quit))
+        menu = pystray.Menu(*items)
+
         self.icon = pystray.Icon("WindowsDownloadSentinel", self.create_image(), "Downloads Sentinel", menu)
         self.icon.run_detached()  # Non-blocking, runs in separate thread
 
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import io
+import tarfile
+import tempfile
+import zipfile
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.archive_inspector import ArchiveInspector
+from ai.rule_engine import RuleEngine
+from ai.workflow_engine import WorkflowEngine
+
+
+def make_zip(path, names, comment=b""):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name in names:
+            zf.writestr(name, b"x" * 100)
+        zf.comment = comment
+    return path
+
+
+def make_tar(path, names, mode="w", size=100):
+    with tarfile.open(path, mode) as tf:
+        for name in names:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            tf.addfile(info, io.BytesIO(b"x" * size))
+    return path
+
+
+class TestArchiveInspector(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.inspector = ArchiveInspector(RuleEngine())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_zip_profiles(self):
+        photos = make_zip(self.path("photos.zip"), [f"trip/IMG_{i}.jpg" for i in range(9)] + ["trip/"],
+                          comment=b"holiday")
+        self.assertEqual(self.inspector.classify(photos), "Images")
+        project = make_zip(self.path("project.zip"), ["proj/pyproject.toml", "proj/README.md", "proj/logo.png"])
+        self.assertEqual(self.inspector.classify(project), "Code")
+        installer = make_zip(self.path("tool.zip"), ["setup.exe", "readme.txt", "license.txt"])
+        self.assertEqual(self.inspector.classify(installer), "Installers")
+        mixed = make_zip(self.path("mixed.zip"), ["a.jpg", "b.pdf", "c.mp3", "__MACOSX/._a.jpg"])
+        self.assertIsNone(self.inspector.classify(mixed))
+
+    def test_tar_profiles_plain_and_compressed(self):
+        long_dir = "papers/" + "d" * 120 + "/"  # Needs a GNU/pax long name record
+        for name, mode in (("docs.tar", "w"), ("docs.tar.gz", "w:gz"), ("docs.tar.xz", "w:xz")):
+            archive = make_tar(self.path(name), [f"{long_dir}paper{i}.pdf" for i in range(5)], mode)
+            profile = self.inspector.inspect(archive)
+            self.assertEqual(profile.files, 5, name)
+            self.assertEqual(self.inspector.category_for(profile), "Documents", name)
+
+    def test_budget_truncates_and_still_profiles(self):
+        archive = make_tar(self.path("big.tar"), [f"song{i}.mp3" for i in range(50)], size=4096)
+        inspector = ArchiveInspector(RuleEngine(), max_bytes=64 * 1024, max_entries=20)
+        profile = inspector.inspect(archive)
+        self.assertTrue(profile.truncated)
+        self.assertLessEqual(profile.files, 20)
+        self.assertLessEqual(profile.bytes_read, 64 * 1024)
+        self.assertEqual(inspector.category_for(profile), "Audio")
+
+        zipped = make_zip(self.path("many.zip"), [f"n{i}.txt" for i in range(100)])
+        profile = ArchiveInspector(RuleEngine(), max_entries=10).inspect(zipped)
+        self.assertTrue(profile.truncated)
+        self.assertEqual(profile.files, 10)
+
+    def test_unsupported_or_broken_archives(self):
+        with open(self.path("broken.zip"), "wb") as f:
+            f.write(b"PK\x03\x04 not really a zip")
+        self.assertIsNone(self.inspector.inspect(self.path("broken.zip")))
+        with open(self.path("stuff.7z"), "wb") as f:
+            f.write(b"7z\xbc\xaf\x27\x1c")
+        self.assertIsNone(self.inspector.classify(self.path("stuff.7z")))
+
+    def test_engine_routes_archives_by_content(self):
+        config = {"privacy": {"mode": "RULES_ONLY"}, "ai": {"enabled": False, "learned_enabled": False}}
+        photos = make_zip(self.path("photos.zip"), [f"IMG_{i}.jpg" for i in range(5)])
+        mixed = make_zip(self.path("mixed.zip"), ["a.jpg", "b.pdf"])
+        engine = WorkflowEngine(config, {})
+        self.assertEqual(engine.route_to_engine(photos), ("Images", "Tier2_Archive"))
+        self.assertEqual(engine.route_to_engine(mixed), ("Archives", "Tier1_Rules"))
+        docs = make_tar(self.path("docs.tgz"), ["a.pdf", "b.docx"], "w:gz")
+        self.assertEqual(engine.route_to_engine(docs), ("Documents", "Tier2_Archive"))
+
+        engine.apply_config(dict(config, archives={"inspect": False}), ["archives.inspect"])
+        self.assertEqual(engine.route_to_engine(photos), ("Archives", "Tier1_Rules"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.batcher import ClassificationBatcher, parse_batch_response
+from ai.deadline import Deadline
+
+
+class TestParseBatchResponse(unittest.TestCase):
+    def test_valid_array(self):
+        text = 'Sure: ["Documents", "Images"]'
+        self.assertEqual(parse_batch_response(text, 2), ["Documents", "Images"])
+
+    def test_length_mismatch_falls_back(self):
+        self.assertEqual(parse_batch_response('["Documents"]', 2), [None, None])
+
+    def test_garbage_falls_back(self):
+        self.assertEqual(parse_batch_response("Documents", 1), [None])
+
+    def test_non_string_item(self):
+        self.assertEqual(parse_batch_response('["Code", 3]', 2), ["Code", None])
+
+
+class TestClassificationBatcher(unittest.TestCase):
+    def _run_concurrently(self, batcher, names, deadlines=None):
+        """Call classify() from one thread per name; dispatch starts once all are queued."""
+        results = {}
+        start_dispatch = batcher._ensure_running
+        batcher._ensure_running = lambda: None
+
+        def call(name):
+            results[name] = batcher.classify(name, (deadlines or {}).get(name))
+
+        threads = [threading.Thread(target=call, args=(n,)) for n in names]
+        for t in threads:
+            t.start()
+        give_up = time.monotonic() + 5
+        while batcher._pending.qsize() < len(names) and time.monotonic() < give_up:
+            time.sleep(0.001)
+        start_dispatch()
+        for t in threads:
+            t.join(timeout=5)
+        return results
+
+    def test_demultiplexes_batch(self):
+        client = MagicMock()
+        client.classify_batch.side_effect = lambda names, deadline=None: [n.upper() for n in names]
+        client.classify.side_effect = lambda name, deadline=None: name.upper()
+        batcher = ClassificationBatcher(client, window_ms=200, max_batch_size=4)
+
+        names = ["a", "b", "c", "d"]
+        results = self._run_concurrently(batcher, names)
+
+        self.assertEqual(results, {n: n.upper() for n in names})
+        client.classify_batch.assert_called()
+
+    def test_per_item_fallback(self):
+        client = MagicMock()
+        client.classify_batch.return_value = ["Images", None]
+        client.classify.return_value = "Other"
+        batcher = ClassificationBatcher(client, window_ms=200, max_batch_size=2)
+
+        results = self._run_concurrently(batcher, ["x", "y"])
+
+        self.assertEqual(sorted(results.values()), ["Images", "Other"])
+        client.classify.assert_called_once()
+
+    def test_lone_file_skips_the_window(self):
+        client = MagicMock()
+        client.classify.return_value = "Code"
+        batcher = ClassificationBatcher(client, window_ms=5000, max_batch_size=4)
+
+        start = time.monotonic()
+        self.assertEqual(batcher.classify("main"), "Code")
+        self.assertLess(time.monotonic() - start, 1)
+        client.classify_batch.assert_not_called()
+
+    def test_batch_request_bounded_by_earliest_deadline(self):
+        client = MagicMock()
+        client.classify_batch.side_effect = lambda names, deadline=None: ["Code"] * len(names)
+        batcher = ClassificationBatcher(client, window_ms=200, max_batch_size=3)
+        deadlines = {"a": Deadline(None), "b": Deadline(60), "c": Deadline(30)}
+        self._run_concurrently(batcher, list(deadlines), deadlines)
+
+        client.classify_batch.assert_called_once()
+        self.assertIs(client.classify_batch.call_args.kwargs["deadline"], deadlines["c"])
+
+    def test_batching_disabled(self):
+        client = MagicMock()
+        client.classify.return_value = "Code"
+        batcher = ClassificationBatcher(client, max_batch_size=1)
+
+        self.assertEqual(batcher.classify("main"), "Code")
+        client.classify_batch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
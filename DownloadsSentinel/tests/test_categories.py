@@ -0,0 +1,41 @@
+import unittest
+import sys
+import os
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.categories import match_streamed_category, normalize_category
+
+IMAGE_CATEGORIES = ["Photos", "Screenshots", "Art", "Documents (scanned)", "Memes", "Icons", "Other"]
+TEXT_CATEGORIES = ["Documents", "Images", "Code", "Other"]
+
+
+class TestNormalizeCategory(unittest.TestCase):
+    def test_exact_and_decorated(self):
+        self.assertEqual(normalize_category("documents", TEXT_CATEGORIES), "Documents")
+        self.assertEqual(normalize_category('Category: "Code".', TEXT_CATEGORIES), "Code")
+
+    def test_earliest_mention(self):
+        answer = "This looks like Code, not Documents."
+        self.assertEqual(normalize_category(answer, TEXT_CATEGORIES), "Code")
+
+    def test_unknown_uses_default(self):
+        self.assertEqual(normalize_category("Spreadsheet", TEXT_CATEGORIES), "Other")
+        self.assertIsNone(normalize_category("Spreadsheet", TEXT_CATEGORIES, default=None))
+
+
+class TestMatchStreamedCategory(unittest.TestCase):
+    def test_waits_for_delimiter(self):
+        self.assertIsNone(match_streamed_category("Art", IMAGE_CATEGORIES))
+        self.assertEqual(match_streamed_category("Art\n", IMAGE_CATEGORIES), "Art")
+        self.assertIsNone(match_streamed_category("Artwork", IMAGE_CATEGORIES))
+
+    def test_waits_for_longer_category(self):
+        self.assertIsNone(match_streamed_category("Documents (sc", IMAGE_CATEGORIES))
+        self.assertEqual(match_streamed_category("Documents (scanned)", IMAGE_CATEGORIES),
+                         "Documents (scanned)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import queue
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.config_watcher import ConfigWatcher, diff_config, validate_config, write_config
+from core.sentinel_worker import SentinelWorker
+
+
+BASE_CONFIG = {
+    "general": {"downloads_path": "/tmp/dl", "scan_interval_minutes": 60},
+    "privacy": {"mode": "LOCAL", "sensitive_keywords": ["tax"]},
+    "ai": {"enabled": True, "cascade_threshold": 0.7, "model_memory_mb": {"moondream": 1800}},
+}
+
+
+def with_changes(**sections):
+    config = json.loads(json.dumps(BASE_CONFIG))
+    for section, values in sections.items():
+        config.setdefault(section, {}).update(values)
+    return config
+
+
+class TestConfigValidation(unittest.TestCase):
+    def test_valid_config_passes(self):
+        self.assertEqual(validate_config(BASE_CONFIG), [])
+
+    def test_bad_values_are_reported(self):
+        errors = validate_config(with_changes(
+            privacy={"mode": "TURBO", "sensitive_keywords": "tax"},
+            ai={"cascade_threshold": 7, "enabled": "yes"}))
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(any(e.startswith("privacy.mode") for e in errors))
+        self.assertEqual(validate_config([]), ["config must be a JSON object"])
+
+    def test_diff_uses_dotted_keys(self):
+        new = with_changes(privacy={"sensitive_keywords": ["tax", "bank"]},
+                           ai={"model_memory_mb": {"moondream": 1500}})
+        self.assertEqual(diff_config(BASE_CONFIG, new), {
+            "ai.model_memory_mb.moondream": (1800, 1500),
+            "privacy.sensitive_keywords": (["tax"], ["tax", "bank"]),
+        })
+        self.assertEqual(diff_config(BASE_CONFIG, with_changes()), {})
+
+
+class TestConfigWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "config.json")
+        self._write(BASE_CONFIG)
+        self.on_change = MagicMock()
+        self.watcher = ConfigWatcher(self.path, BASE_CONFIG, self.on_change)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, config, mtime_offset=0):
+        with open(self.path, "w") as f:
+            json.dump(config, f)
+        stat = os.stat(self.path)
+        # Distinct mtimes even on coarse filesystem clocks
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset * 10**9))
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.assertFalse(self.watcher.check())
+        self.on_change.assert_not_called()
+
+    def test_valid_edit_reports_diff(self):
+        new = with_changes(privacy={"mode": "CASCADE"})
+        self._write(new, mtime_offset=1)
+        self.assertTrue(self.watcher.check())
+        self.on_change.assert_called_once_with(new, {"privacy.mode": ("LOCAL", "CASCADE")})
+        self.assertEqual(self.watcher.current, new)
+
+    def test_invalid_or_partial_edit_is_ignored(self):
+        with open(self.path, "w") as f:
+            f.write('{"privacy": {"mode": ')  # Half-saved file
+        self.assertFalse(self.watcher.check())
+
+        self._write(with_changes(ai={"cascade_threshold": 3}), mtime_offset=2)
+        self.assertFalse(self.watcher.check())
+        self.on_change.assert_not_called()
+        self.assertEqual(self.watcher.current, BASE_CONFIG)
+
+    def test_atomic_write_is_picked_up(self):
+        new = with_changes(general={"scan_interval_minutes": 15})
+        write_config(self.path, new)
+        self.assertEqual(os.listdir(self.tmp.name), ["config.json"])  # No temp file left behind
+        self.assertTrue(self.watcher.check())
+        self.assertEqual(self.watcher.current, new)
+
+
+class TestWorkerConfigReload(unittest.TestCase):
+    def test_config_command_reaches_loaded_engine(self):
+        control_queue = MagicMock()
+        new = with_changes(privacy={"sensitive_keywords": ["bank"]})
+        control_queue.get_nowait.side_effect = [
+            ("config", (new, ["privacy.sensitive_keywords"])), queue.Empty()]
+        worker = SentinelWorker(MagicMock(), BASE_CONFIG, {}, control_queue=control_queue)
+        worker.workflow_engine = MagicMock()
+
+        worker._poll_control()
+
+        self.assertIs(worker.config, new)
+        worker.workflow_engine.apply_config.assert_called_once_with(new, ["privacy.sensitive_keywords"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,5 +57,32 @@ class TestGamingDetector(unittest.TestCase):
         mock_user32.GetForegroundWindow.assert_called()
         mock_user32.GetWindowRect.assert_called()
 
+    @patch('core.gaming_detector.os.getloadavg', create=True)
+    @patch('core.gaming_detector.psutil.cpu_percent')
+    def test_headless_providers(self, mock_cpu, mock_loadavg):
+        mock_cpu.return_value = 10.0
+        detector = GamingDetector.from_config(
+            {"performance": {"cpu_threshold": 80, "load_threshold": 1.0}}, headless=True)
+        self.assertEqual([c.__name__ for c in detector.checks],
+                         ["is_high_load", "is_high_loadavg", "is_busy_process_running"])
+
+        cores = os.cpu_count() or 1
+        mock_loadavg.return_value = (0.5 * cores, 0, 0)
+        self.assertFalse(detector.is_user_busy())
+        detector.last_check = 0  # Skip the cache
+        mock_loadavg.return_value = (2.0 * cores, 0, 0)
+        self.assertTrue(detector.is_user_busy())
+
+    @patch('core.gaming_detector.psutil.process_iter')
+    def test_busy_process_provider(self, mock_iter):
+        detector = GamingDetector(providers=["processes"], busy_processes=["Borg"])
+        proc = MagicMock()
+        proc.info = {"name": "bash"}
+        mock_iter.return_value = [proc]
+        self.assertFalse(detector.is_user_busy())
+        proc.info = {"name": "borg"}
+        detector.last_check = 0
+        self.assertTrue(detector.is_user_busy())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+import time
+from contextlib import redirect_stdout, redirect_stderr
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import find
+from core.file_index import FileIndex, IndexReader, day_of, file_hash, fts_query
+from ai.workflow_engine import WorkflowEngine
+
+
+def write(path, data=b"data"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+class TestFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "index", "files.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def record_files(self, *entries):
+        index = FileIndex(self.db)
+        for name, category, data in entries:
+            dest = write(os.path.join(self.tmp.name, category, name), data)
+            index.record(os.path.join(self.tmp.name, name), dest, category, "Tier1_Rules")
+        index.close()
+
+    def test_search_by_words_category_and_time(self):
+        self.record_files(("Invoice_2024-03.pdf", "Documents", b"a" * 10),
+                          ("holiday.jpg", "Images", b"b" * 20),
+                          ("invoice-april.pdf", "Documents", b"c" * 30))
+        reader = IndexReader(self.db)
+        try:
+            names = [row["name"] for row in reader.search("invo")]
+            self.assertEqual(names, ["invoice-april.pdf", "Invoice_2024-03.pdf"])  # Newest first
+            self.assertEqual([row["name"] for row in reader.search("invoice 2024")], ["Invoice_2024-03.pdf"])
+            self.assertEqual([row["name"] for row in reader.search(category="Images")], ["holiday.jpg"])
+            self.assertEqual(len(reader.search(since=time.time() - 60)), 3)
+            self.assertEqual(reader.search(since=time.time() + 60), [])
+
+            row = reader.search("holiday")[0]
+            self.assertEqual((row["size"], row["tier"]), (20, "Tier1_Rules"))
+            self.assertEqual(row["hash"], file_hash(row["dest"]))
+            self.assertEqual(len(reader.same_content(row["hash"])), 1)
+        finally:
+            reader.close()
+
+    def test_since_filters_on_decision_time_not_row_order(self):
+        now = time.time()
+        index = FileIndex(self.db)
+        # Committed in queue order; the middle decision is the oldest
+        for name, decided_at in [("a.pdf", now - 10), ("b.pdf", now - 100), ("c.pdf", now - 5)]:
+            dest = write(os.path.join(self.tmp.name, "Documents", name))
+            index.record(os.path.join(self.tmp.name, name), dest, "Documents", "Tier1_Rules", decided_at)
+        index.close()
+        reader = IndexReader(self.db)
+        try:
+            self.assertEqual([row["name"] for row in reader.search(since=now - 50)], ["c.pdf", "a.pdf"])
+            self.assertEqual([row["name"] for row in reader.search("pdf", since=now - 50)], ["c.pdf", "a.pdf"])
+        finally:
+            reader.close()
+
+    def test_daily_rollup_accumulates_across_batches(self):
+        self.record_files(("a.pdf", "Documents", b"x" * 100), ("b.jpg", "Images", b"x" * 5))
+        self.record_files(("c.pdf", "Documents", b"x" * 50))
+        reader = IndexReader(self.db)
+        try:
+            rows = reader.daily(1)
+        finally:
+            reader.close()
+        self.assertEqual(rows, [
+            {"day": day_of(time.time()), "category": "Documents", "files": 2, "bytes": 150},
+            {"day": day_of(time.time()), "category": "Images", "files": 1, "bytes": 5},
+        ])
+
+    def test_fts_query_quotes_words(self):
+        self.assertEqual(fts_query('re"port 2024-03'), '"re"* "port"* "2024"* "03"*')
+        self.assertEqual(fts_query("  "), "")
+
+    def test_engine_records_moves(self):
+        config = {"privacy": {"mode": "RULES_ONLY"}, "ai": {"enabled": False, "learned_enabled": False}}
+        engine = WorkflowEngine(config, {})
+        engine.file_index = FileIndex(self.db, hash_mode="off")
+        src = write(os.path.join(self.tmp.name, "downloads", "song.mp3"))
+        self.assertTrue(engine.process_file(src))
+        engine.file_index.close()
+
+        reader = IndexReader(self.db)
+        try:
+            row = reader.search("song")[0]
+        finally:
+            reader.close()
+        self.assertEqual(row["src"], src)
+        self.assertEqual(row["dest"], os.path.join(self.tmp.name, "downloads", "Audio", "song.mp3"))
+        self.assertEqual((row["category"], row["tier"], row["hash"]), ("Audio", "Tier1_Rules", None))
+
+    def test_find_cli(self):
+        self.record_files(("report.pdf", "Documents", b"r"))
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            code = find.main(["report", "--since", "1h", "--json", "--db", self.db])
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out.getvalue())["category"], "Documents")
+        self.assertIn("1 result(s)", err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.filename_model import FilenameClassifier, numpy_available
+
+TRAINING = [
+    ("Screenshot 2026-01-02 at 10.11.12", "Screenshots"),
+    ("Screenshot 2025-12-24 at 08.00.59", "Screenshots"),
+    ("Screenshot 2026-06-30 at 23.45.01", "Screenshots"),
+    ("quarterly_report_q1.docx", "Documents"),
+    ("quarterly_report_q3_final.docx", "Documents"),
+    ("meeting_notes_march.odt", "Documents"),
+    ("server_utils.py", "Code"),
+    ("main_app.py", "Code"),
+    ("test_parser.py", "Code"),
+]
+
+
+@unittest.skipUnless(numpy_available(), "numpy not installed")
+class TestFilenameClassifier(unittest.TestCase):
+    def _trained(self, min_samples=5):
+        model = FilenameClassifier(n_features=2 ** 12, min_samples=min_samples)
+        for name, category in TRAINING:
+            model.learn(name, category)
+        return model
+
+    def test_silent_until_min_samples(self):
+        model = self._trained(min_samples=100)
+        self.assertEqual(model.predict("Screenshot 2026-10-19 at 09.41.02"), (None, 0.0))
+
+    def test_repetitive_names_are_confident(self):
+        model = self._trained()
+        category, confidence = model.predict("Screenshot 2026-10-19 at 09.41.02")
+        self.assertEqual(category, "Screenshots")
+        self.assertGreater(confidence, 0.9)
+
+    def test_unfamiliar_names_are_not(self):
+        _, confidence = self._trained().predict("zzqx")
+        self.assertLess(confidence, 0.9)
+
+    def test_batch_matches_single(self):
+        model = self._trained()
+        names = ["quarterly_report_q2.docx", "helpers.py", "Screenshot 2024-02-02 at 01.02.03"]
+        self.assertEqual(model.predict_batch(names), [model.predict(n) for n in names])
+
+    def test_save_and_load(self):
+        model = self._trained()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.npz")
+            model.save(path)
+            loaded = FilenameClassifier.load(path, min_samples=5)
+        self.assertEqual(model.unsaved, 0)
+        self.assertEqual(loaded.classes, model.classes)
+        self.assertEqual(loaded.predict("main_loop.py"), model.predict("main_loop.py"))
+
+    def test_failed_save_keeps_updates_unsaved(self):
+        model = self._trained()
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(OSError):
+                model.save(os.path.join(tmp, "missing_dir", "model.npz"))
+            self.assertEqual(model.unsaved, len(TRAINING))
+            model.save(os.path.join(tmp, "model.npz"))
+        self.assertEqual(model.unsaved, 0)
+
+    def test_concurrent_saves_leave_one_complete_file(self):
+        models = [self._trained() for _ in range(8)]
+        errors = []
+
+        def save(model, path):
+            try:
+                model.save(path)
+            except Exception as e:
+                errors.append(e)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.npz")
+            threads = [threading.Thread(target=save, args=(model, path)) for model in models]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(os.listdir(tmp), ["model.npz"])
+            loaded = FilenameClassifier.load(path, min_samples=5)
+        self.assertEqual(loaded.classes, models[0].classes)
+
+
+if __name__ == '__main__':
+    unittest.main()
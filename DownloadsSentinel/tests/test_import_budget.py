@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+import re
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# The master must not pull these in; they belong to the worker's tiers or the GUI
+FORBIDDEN_IN_MASTER = {
+    "ai.workflow_engine", "ai.gemini_client", "ai.local_client", "ai.filename_model",
+    "google.genai", "requests", "httpx", "numpy", "PIL", "pystray", "customtkinter",
+}
+# Fixed budgets, several times the current cost; the full AI stack costs ~10x more
+MAX_IMPORT_US = 400_000
+MAX_RSS_MB = 40
+
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=SRC_DIR, capture_output=True,
+                          text=True, timeout=120)
+
+
+class TestMasterImportBudget(unittest.TestCase):
+    def test_master_imports_stay_light(self):
+        result = run_python("-X", "importtime", "-c", "import main")
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                cumulative[match.group(3)] = int(match.group(1))
+
+        self.assertEqual(FORBIDDEN_IN_MASTER & set(cumulative), set())
+        self.assertLess(cumulative["main"], MAX_IMPORT_US)
+
+    def test_master_rss_after_import(self):
+        # Current RSS via psutil (a master dependency): ru_maxrss would include
+        # the forking test runner's peak on Linux
+        result = run_python("-c", "import main, psutil; "
+                                  "print(psutil.Process().memory_info().rss)")
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        rss_mb = int(result.stdout.strip()) / (1024 * 1024)
+        self.assertLess(rss_mb, MAX_RSS_MB)
+
+if __name__ == '__main__':
+    unittest.main()
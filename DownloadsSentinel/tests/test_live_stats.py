@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import queue
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.live_stats import LiveStats, ThroughputMeter, describe, tier_group
+from core.sentinel_worker import SentinelWorker
+from core.task_dispatcher import TaskDispatcher
+
+
+class TestLiveStats(unittest.TestCase):
+    def test_tier_groups(self):
+        self.assertEqual([tier_group(t) for t in (
+            "Tier0_Privacy", "Tier1_RootRules", "Tier1_Rules", "Tier1_Fallback", "Tier2_Learned",
+            "Tier2_Archive", "Tier3_Cloud_Content_Escalated", "Tier3_Cloud_Deferred", "Deadline_Sniffed")],
+            ["privacy", "rules", "rules", "fallback", "learned", "archive", "ai", "fallback", "fallback"])
+
+    def test_shared_block_is_the_view(self):
+        master = LiveStats()
+        worker = LiveStats(master.block)  # What a spawned worker builds from its argument
+        worker.add("jobs_taken", 3)
+        worker.count_tier("Tier1_Rules")
+        self.assertEqual(master.get("jobs_taken"), 3)
+        self.assertEqual(master.snapshot()["tier_rules"], 1)
+
+    def test_describe_states(self):
+        stats = LiveStats()
+        now = 1000.0
+        self.assertEqual(describe(stats.snapshot(), 0, now)[0], "Idle")
+        stats.set("buffered", 4)
+        self.assertEqual(describe(stats.snapshot(), 0, now)[0], "Paused")
+        stats.set("jobs_queued", 2)
+        stats.set("worker_heartbeat", now - 1)
+        state, lines = describe(stats.snapshot(), 12, now)
+        self.assertEqual(state, "Working")
+        self.assertEqual(lines[:2], ["Working: 0 active, 2 queued, 4 buffered", "12 files/min"])
+        stats.set("worker_heartbeat", now - 120)
+        self.assertEqual(describe(stats.snapshot(), 0, now)[0], "Stuck")
+
+    def test_throughput_window(self):
+        meter = ThroughputMeter(window_seconds=60)
+        meter.update(0, 0)
+        self.assertAlmostEqual(meter.update(30, 10), 20.0)
+        meter.update(60, 10)
+        # The burst has left the window
+        self.assertAlmostEqual(meter.update(125, 10), 0.0)
+
+    def test_worker_and_dispatcher_publish(self):
+        stats = LiveStats()
+        job_queue, control_queue = queue.Queue(), queue.Queue()
+        worker = SentinelWorker(job_queue, {}, {}, result_queue=queue.Queue(),
+                                control_queue=control_queue, stats_block=stats.block)
+        worker.handle_task = MagicMock()
+        worker.perform_cleanup = MagicMock()
+        worker._setup_logging = MagicMock()
+        worker.logger = MagicMock()
+        job_queue.put(("a.pdf", 0))
+        control_queue.put(("drain", None))
+        worker.run_worker_loop()
+        snapshot = stats.snapshot()
+        self.assertEqual((snapshot["jobs_taken"], snapshot["files_done"], snapshot["active_tasks"]),
+                         (1, 1, 0))
+        self.assertGreater(snapshot["worker_heartbeat"], 0)
+
+        detector = MagicMock()
+        detector.is_user_busy.return_value = True
+        dispatcher = TaskDispatcher(detector, MagicMock(), live_stats=stats)
+        dispatcher.on_file_created("b.pdf")
+        dispatcher.on_file_created("c.pdf")
+        self.assertEqual(stats.get("buffered"), 2)
+        dispatcher.flush_pending_tasks()
+        self.assertEqual(stats.get("buffered"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
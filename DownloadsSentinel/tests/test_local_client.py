@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+
+# Adjust path to import src and the benchmark stand-in servers
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import requests
+
+from ai.local_client import LocalAIHost
+from stub_servers import OllamaStubServer
+
+
+@unittest.skipUnless(isinstance(requests.Session, type), "requests is mocked out")
+class TestLocalAIHostKeepAlive(unittest.TestCase):
+    def setUp(self):
+        self.server = OllamaStubServer(base_latency=0, item_latency=0).start()
+        self.client = LocalAIHost(self.server.chat_url, "stub-text", "stub-vision")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def chat_keep_alives(self) -> list[str]:
+        return [keep_alive for path, model, keep_alive in self.server.keep_alive_seen
+                if path == "/api/chat" and model == "stub-text"]
+
+    def test_text_requests_carry_predicted_keep_alive(self):
+        self.assertEqual(self.client.classify("report.xyz"), "Documents")
+        self.assertEqual(self.chat_keep_alives(), ["30s"])
+
+        # A busier arrival rate raises the prediction; the next request must carry it
+        self.client.residency._arrival_gap["stub-text"] = 100
+        self.client.residency._last_arrival["stub-text"] = None
+        expected = f"{self.client.residency.keep_alive_for('stub-text')}s"
+        self.assertEqual(self.client.classify_with_confidence("report.xyz")[0], "Documents")
+        self.assertEqual(self.chat_keep_alives()[-1], expected)
+        self.assertNotEqual(expected, "30s")
+
+        self.assertEqual(self.client.classify_batch(["a.xyz", "b.xyz"]), ["Documents", "Documents"])
+        self.assertEqual(len(self.chat_keep_alives()), 3)
+        self.assertTrue(all(value.endswith("s") and value != "5m" for value in self.chat_keep_alives()))
+
+
+    def test_batch_answer_may_span_lines(self):
+        # The stub pretty-prints the JSON array; a newline stop would cut it to "["
+        names = [f"file_{i}.xyz" for i in range(5)]
+        self.assertEqual(self.client.classify_batch(names), ["Documents"] * 5)
+        options = self.client._text_request("prompt", self.client._batch_tokens(5), single_line=False)["options"]
+        self.assertNotIn("stop", options)
+        self.assertGreater(options["num_predict"], self.client.MAX_CATEGORY_TOKENS * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import json
+import logging
+import queue
+import tempfile
+from unittest.mock import patch
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.log_pipeline import JournalFormatter, JsonLinesFormatter, RateLimitFilter, start_listener
+
+
+def make_record(msg, level=logging.INFO, name="WorkflowEngine"):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+class TestLogPipeline(unittest.TestCase):
+    def test_rate_limit_thins_info_and_reports_suppressed(self):
+        rate_filter = RateLimitFilter(rate_per_second=0.001, burst=2)
+        passed = [rate_filter.filter(make_record(f"file {i}")) for i in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+
+        # Warnings always pass
+        self.assertTrue(rate_filter.filter(make_record("disk full", logging.WARNING)))
+
+        rate_filter._buckets["WorkflowEngine"][0] = 1  # refill one token
+        record = make_record("file 5")
+        self.assertTrue(rate_filter.filter(record))
+        self.assertIn("+3 similar messages suppressed", record.getMessage())
+
+    def test_json_lines_formatter(self):
+        line = JsonLinesFormatter().format(make_record("moved a.pdf"))
+        entry = json.loads(line)
+        self.assertEqual((entry["level"], entry["logger"], entry["msg"]),
+                         ("INFO", "WorkflowEngine", "moved a.pdf"))
+
+    def test_listener_writes_records_from_queue(self):
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        with tempfile.TemporaryDirectory() as tmp:
+            listener = start_listener(queue.SimpleQueue(), tmp, "test.log",
+                                      {"logging": {"format": "json"}})
+            try:
+                logging.getLogger("Pipeline").info("hello from a thread")
+            finally:
+                listener.stop()
+                root.handlers[:] = saved_handlers
+                root.setLevel(saved_level)
+            with open(os.path.join(tmp, "test.log"), encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f]
+            for handler in listener.handlers:
+                handler.close()
+        self.assertEqual(entries[-1]["msg"], "hello from a thread")
+
+    def test_journal_formatter_prefixes_syslog_priority(self):
+        formatter = JournalFormatter()
+        self.assertEqual(formatter.format(make_record("moved a.pdf")), "<6>[WorkflowEngine] moved a.pdf")
+        self.assertTrue(formatter.format(make_record("failed", logging.ERROR)).startswith("<3>"))
+
+    def test_console_only_listener_writes_no_file(self):
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"JOURNAL_STREAM": "8:123"}):
+            log_dir = os.path.join(tmp, "logs")
+            listener = start_listener(queue.SimpleQueue(), log_dir, "test.log", {}, console_only=True)
+            listener.stop()
+            root.handlers[:] = saved_handlers
+            root.setLevel(saved_level)
+            self.assertFalse(os.path.exists(log_dir))
+        self.assertEqual(len(listener.handlers), 1)
+        self.assertIsInstance(listener.handlers[0].formatter, JournalFormatter)
+
+
+if __name__ == '__main__':
+    unittest.main()
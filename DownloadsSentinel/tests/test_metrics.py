@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import json
+import queue
+import tempfile
+import urllib.request
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.metrics import (MetricsAggregator, MetricsRegistry, MetricsServer,
+                          merge_snapshots, to_prometheus, registry)
+from core.task_dispatcher import TaskDispatcher
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_upper_inclusive(self):
+        histogram = MetricsRegistry().histogram("h", bounds=(1, 10))
+        for value in (0.5, 1, 5, 10, 11):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 2, 1])
+        self.assertAlmostEqual(histogram.sum, 27.5)
+
+    def test_merge_and_prometheus(self):
+        a, b = MetricsRegistry(), MetricsRegistry()
+        for reg, value in ((a, 3), (b, 30)):
+            reg.histogram("stage_ms", bounds=(10,), stage="move").observe(value)
+            reg.counter("files_total", tier="Tier1_Rules").inc()
+
+        text = to_prometheus(merge_snapshots([a.snapshot(), b.snapshot()]))
+
+        self.assertIn('files_total{tier="Tier1_Rules"} 2', text)
+        self.assertIn('stage_ms_bucket{stage="move",le="10"} 1', text)
+        self.assertIn('stage_ms_bucket{stage="move",le="+Inf"} 2', text)
+        self.assertIn('stage_ms_count{stage="move"} 2', text)
+
+    def test_aggregator_keeps_latest_per_source(self):
+        local, worker = MetricsRegistry(), MetricsRegistry()
+        aggregator = MetricsAggregator(local)
+        counter = worker.counter("files_total")
+        counter.inc()
+        aggregator.update("1234", worker.snapshot())
+        counter.inc()
+        aggregator.update("1234", worker.snapshot())  # cumulative, replaces the first
+        self.assertEqual(aggregator.combined()["counters"], [["files_total", {}, 2]])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            aggregator.write_snapshot(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["counters"], [["files_total", {}, 2]])
+
+    def test_endpoint_serves_prometheus_text(self):
+        local = MetricsRegistry()
+        local.counter("files_total").inc(5)
+        server = MetricsServer(MetricsAggregator(local), port=0).start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as r:
+                self.assertIn("files_total 5", r.read().decode())
+        finally:
+            server.stop()
+
+    def test_dispatcher_stamps_jobs_and_buffer_wait(self):
+        detector = MagicMock()
+        jobs = queue.Queue()
+        dispatcher = TaskDispatcher(detector, jobs)
+        buffered = registry.stage("buffer_wait")
+        before = sum(buffered.counts)
+
+        detector.is_user_busy.return_value = False
+        dispatcher.dispatch_or_queue("a.pdf")
+        detector.is_user_busy.return_value = True
+        dispatcher.dispatch_or_queue("b.pdf")
+        dispatcher.flush_pending_tasks()
+
+        first, second = jobs.get_nowait(), jobs.get_nowait()
+        self.assertEqual((first[0], second[0]), ("a.pdf", "b.pdf"))
+        self.assertIsInstance(first[1], float)
+        self.assertEqual(sum(buffered.counts), before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.deadline import Deadline, DeadlineExceeded
+from ai.model_residency import ModelResidencyManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestModelResidencyManager(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.clock = FakeClock()
+        self.manager = ModelResidencyManager(
+            loader=lambda model, keep_alive, deadline: self.events.append(("load", model)) or True,
+            unloader=lambda model: self.events.append(("unload", model)) or True,
+            ram_budget_mb=1500,
+            model_memory_mb={"text": 1000, "vision": 1000, "tiny": 400},
+            monotonic=self.clock
+        )
+
+    def wait_until_waiting(self, model):
+        """Block until `model` has a request queued in the manager (no fixed sleep)."""
+        deadline = time.monotonic() + 5
+        while not self.manager._waiting.get(model):
+            self.assertLess(time.monotonic(), deadline, f"{model} never started waiting")
+            time.sleep(0.001)
+
+    def test_resident_model_runs_before_swap(self):
+        order = []
+        self.manager.acquire("text")
+
+        def request(model):
+            with self.manager.use(model):
+                order.append(model)
+
+        vision = threading.Thread(target=request, args=("vision",))
+        vision.start()
+        self.wait_until_waiting("vision")
+        text = threading.Thread(target=request, args=("text",))
+        text.start()
+        text.join(timeout=2)
+
+        # The second text request joins the resident model; vision waits for the swap
+        self.assertEqual(order, ["text"])
+        self.manager.release("text")
+        vision.join(timeout=2)
+
+        self.assertEqual(order, ["text", "vision"])
+        self.assertEqual(self.events, [("load", "text"), ("unload", "text"), ("load", "vision")])
+        self.assertEqual(self.manager.swap_count, 2)
+
+    def test_wait_for_swap_is_bounded_by_deadline(self):
+        self.manager.acquire("text")
+        with self.assertRaises(DeadlineExceeded):
+            self.manager.acquire("vision", Deadline(0.05))
+        self.assertEqual(self.manager._waiting["vision"], [])
+        self.assertEqual(self.manager._active.get("vision", 0), 0)
+        self.manager.release("text")
+
+    def test_loader_receives_deadline(self):
+        seen = []
+        self.manager.loader = lambda model, keep_alive, deadline: seen.append(deadline) or True
+        deadline = Deadline(5)
+        with self.manager.use("text", deadline):
+            pass
+        self.assertEqual(seen, [deadline])
+
+    def test_failed_load_releases_model(self):
+        def loader(model, keep_alive, deadline):
+            raise DeadlineExceeded("file deadline exceeded")
+        self.manager.loader = loader
+        with self.assertRaises(DeadlineExceeded):
+            self.manager.acquire("text", Deadline(5))
+        self.assertEqual(self.manager._active["text"], 0)
+
+    def test_models_that_fit_share_memory(self):
+        with self.manager.use("text"):
+            with self.manager.use("tiny"):
+                self.assertEqual(self.manager.resident_memory_mb(), 1400)
+        self.assertNotIn(("unload", "text"), self.events)
+
+    def test_idle_model_expires_after_keep_alive(self):
+        with self.manager.use("text"):
+            pass
+        self.assertEqual(self.manager.resident_memory_mb(), 1000)
+        self.clock.now += self.manager.MIN_KEEP_ALIVE - 1
+        self.assertEqual(self.manager.resident_memory_mb(), 1000)
+        self.clock.now += 2
+        self.assertEqual(self.manager.resident_memory_mb(), 0)
+
+    def test_arrival_gaps_use_the_clock(self):
+        for _ in range(3):
+            with self.manager.use("text"):
+                pass
+            self.clock.now += 60
+        self.assertEqual(self.manager.keep_alive_for("text"), 180)
+
+    def test_keep_alive_tracks_arrival_rate(self):
+        self.assertEqual(self.manager.keep_alive_for("text"), self.manager.MIN_KEEP_ALIVE)
+        self.manager._arrival_gap["text"] = 60
+        self.assertEqual(self.manager.keep_alive_for("text"), 180)
+        self.manager._arrival_gap["text"] = 3600
+        self.assertEqual(self.manager.keep_alive_for("text"), self.manager.MIN_KEEP_ALIVE)
+
+    def test_unload_all(self):
+        with self.manager.use("text"):
+            pass
+        self.manager.unload_all()
+        self.assertEqual(self.manager.resident, {})
+        self.assertIn(("unload", "text"), self.events)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import organize
+from organize import Organizer, Planner, execute_move, iter_files
+
+CONFIG = {"privacy": {"mode": "RULES_ONLY"}, "ai": {"enabled": False, "learned_enabled": False}}
+
+
+def touch(*parts):
+    path = os.path.join(*parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(parts[-1])
+    return path
+
+
+class TestOrganize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        touch(self.root, "2019", "report.pdf")
+        touch(self.root, "2020", "q1", "report.pdf")
+        touch(self.root, "2020", "song.mp3")
+        touch(self.root, "2020", "movie.mp4.crdownload")
+        touch(self.root, ".cache", "blob.txt")
+        touch(self.root, "Documents", "already.pdf")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_walk_skips_hidden_and_excluded_folders(self):
+        files = {os.path.relpath(p, self.root)
+                 for p in iter_files(self.root, [os.path.join(self.root, "Documents")])}
+        self.assertEqual(files, {os.path.join("2019", "report.pdf"),
+                                 os.path.join("2020", "q1", "report.pdf"),
+                                 os.path.join("2020", "song.mp3"),
+                                 os.path.join("2020", "movie.mp4.crdownload")})
+
+    def test_planner_renames_clashes(self):
+        planner = Planner(self.root)
+        first = planner.destination(os.path.join(self.root, "2019", "report.pdf"), "Documents")
+        second = planner.destination(os.path.join(self.root, "2020", "q1", "report.pdf"), "Documents")
+        # Documents/already.pdf exists, and the two reports must not overwrite each other
+        self.assertEqual(os.path.basename(first), "report.pdf")
+        self.assertEqual(os.path.basename(second), "report (1).pdf")
+
+    def test_dry_run_plan_then_resume(self):
+        organizer = Organizer(CONFIG, {}, jobs=3)
+        plan = list(organizer.plan(self.root))
+        self.assertEqual(len(plan), 3)  # Temp download, hidden and category folders left out
+        self.assertTrue(all(os.path.exists(entry["src"]) for entry in plan))  # Nothing moved yet
+        self.assertEqual(organizer.summary()["tiers"], {"Tier1_Rules": 3})
+
+        plan_path = os.path.join(self.root, "plan.jsonl")
+        with open(plan_path, "w") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in plan)
+        # Half done before an interruption
+        self.assertEqual(execute_move(plan[0]), "moved")
+
+        resumed = Organizer(CONFIG, {}, jobs=2)
+        stats = resumed.execute(organize.read_plan(plan_path))
+        self.assertEqual((stats["moved"], stats["done"]), (2, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "Audio", "song.mp3")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "Documents", "report (1).pdf")))
+        self.assertIsNone(resumed._engine)  # Executing a plan never loads the tiers
+
+    def test_main_moves_into_dest(self):
+        dest = os.path.join(self.root, "Archive")
+        config_path = os.path.join(self.root, "config.json")
+        with open(config_path, "w") as f:
+            json.dump(CONFIG, f)
+        code = organize.main([self.root, "--dest", dest, "--jobs", "2", "--config", config_path,
+                              "--exclude", "Documents"])
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(os.listdir(os.path.join(dest, "Documents"))),
+                         ["report (1).pdf", "report.pdf"])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "Documents", "already.pdf")))
+
+
+if __name__ == '__main__':
+    unittest.main()
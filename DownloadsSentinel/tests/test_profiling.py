@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import tracemalloc
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.profiling import TaskProfiler
+
+
+def busy():
+    return sum(i * i for i in range(1000))
+
+
+class TestTaskProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile_dir = os.path.join(self.tmp.name, "profiles")
+
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.tmp.cleanup()
+
+    def _files(self):
+        return sorted(os.listdir(self.profile_dir)) if os.path.exists(self.profile_dir) else []
+
+    def test_disabled_writes_nothing(self):
+        profiler = TaskProfiler(self.tmp.name, enabled=False, every_n=1)
+        with profiler.profile("task"):
+            busy()
+        self.assertEqual(self._files(), [])
+
+    def test_samples_every_n_tasks_ignoring_nested_calls(self):
+        profiler = TaskProfiler(self.tmp.name, enabled=True, every_n=3)
+        for _ in range(6):
+            with profiler.profile("task"):
+                with profiler.profile("process_file"):
+                    busy()
+        files = self._files()
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all("cpu-task" in f and f.endswith(".prof") for f in files))
+
+    def test_sampling_counter_is_thread_safe(self):
+        profiler = TaskProfiler(self.tmp.name, enabled=True, every_n=7)
+        sampled = []
+
+        def count():
+            sampled.append(sum(profiler._should_sample() for _ in range(7000)))
+
+        threads = [threading.Thread(target=count) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sum(sampled), 8 * 7000 // 7)
+
+    def test_rotation_keeps_newest(self):
+        profiler = TaskProfiler(self.tmp.name, enabled=True, every_n=1, max_files=2)
+        for _ in range(4):
+            with profiler.profile("task"):
+                busy()
+        self.assertEqual(len(self._files()), 2)
+
+    def test_memory_checkpoint_and_toggle(self):
+        profiler = TaskProfiler(self.tmp.name, enabled=False, trace_memory=True)
+        profiler.memory_checkpoint()
+        self.assertEqual(self._files(), [])
+
+        profiler.set_enabled(True)
+        self.assertTrue(tracemalloc.is_tracing())
+        profiler.memory_checkpoint()
+        self.assertEqual(len([f for f in self._files() if f.endswith("-mem.txt")]), 1)
+
+        profiler.set_enabled(False)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
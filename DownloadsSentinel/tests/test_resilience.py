@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import time
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai.resilience import AIUnavailableError, CircuitBreaker, TokenBucket, call_with_retry
+
+
+class QuotaError(Exception):
+    code = 429
+
+
+class BadRequestError(Exception):
+    code = 400
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_timeout(self):
+        bucket = TokenBucket(rate_per_minute=6, capacity=2)
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0.05))
+
+    def test_timed_out_token_acquire_refunds_request(self):
+        from ai.gemini_client import GeminiClient
+        client = GeminiClient("test-key", rpm=60, tpm=100)
+        client.MAX_QUEUE_WAIT = 0.05
+        client.token_bucket.tokens = 0  # Token-per-minute budget spent
+        with self.assertRaises(AIUnavailableError):
+            client._generate("x" * 400, config=None)
+        self.assertEqual(client.request_bucket.tokens, client.request_bucket.capacity)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_and_half_opens(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())   # single trial request
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestCallWithRetry(unittest.TestCase):
+    def test_retries_transient_errors(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise QuotaError()
+            return "ok"
+
+        breaker = CircuitBreaker(failure_threshold=5)
+        self.assertEqual(call_with_retry(flaky, breaker, max_attempts=3, sleep=lambda s: None), "ok")
+        self.assertEqual(len(calls), 3)
+
+    def test_exhausted_retries_raise_unavailable(self):
+        def always_429():
+            raise QuotaError()
+
+        breaker = CircuitBreaker(failure_threshold=2)
+        with self.assertRaises(AIUnavailableError):
+            call_with_retry(always_429, breaker, max_attempts=3, sleep=lambda s: None)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_non_retryable_propagates(self):
+        def bad():
+            raise BadRequestError()
+
+        with self.assertRaises(BadRequestError):
+            call_with_retry(bad, CircuitBreaker(), sleep=lambda s: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.roots import ScanScheduler, parse_roots, primary_path, root_for, set_primary_path
+from core.task_dispatcher import TaskDispatcher
+
+MULTI_ROOT_CONFIG = {
+    "general": {
+        "downloads_path": [
+            "/data/Downloads",
+            {"path": "/data/Scans", "name": "scanner", "priority": 10,
+             "rules": {"scan_*.pdf": "Scans"}, "scan_interval_minutes": 5},
+            {"path": "/data/Telegram", "priority": 5},
+        ]
+    }
+}
+
+
+class TestRoots(unittest.TestCase):
+    def test_single_path_is_one_root(self):
+        roots = parse_roots({"general": {"downloads_path": "/data/Downloads"}})
+        self.assertEqual([r.path for r in roots], ["/data/Downloads"])
+        self.assertEqual(roots[0].name, "Downloads")
+
+    def test_roots_sorted_by_priority_with_rules(self):
+        roots = parse_roots(MULTI_ROOT_CONFIG)
+        self.assertEqual([r.path for r in roots], ["/data/Scans", "/data/Telegram", "/data/Downloads"])
+        scans = root_for(roots, "/data/Scans/SCAN_0001.PDF")
+        self.assertEqual(scans.name, "scanner")
+        self.assertEqual(scans.match_rule("SCAN_0001.PDF"), "Scans")
+        self.assertIsNone(scans.match_rule("notes.pdf"))
+        # Files inside a category folder are not directly in the root
+        self.assertIsNone(root_for(roots, "/data/Scans/Scans/scan_1.pdf"))
+
+    def test_primary_path_round_trip(self):
+        config = {"general": {"downloads_path": [{"path": "/a", "priority": 1}, "/b"]}}
+        self.assertEqual(primary_path(config), "/a")
+        set_primary_path(config, "/c")
+        self.assertEqual(config["general"]["downloads_path"], [{"path": "/c", "priority": 1}, "/b"])
+
+        single = {"general": {"downloads_path": "/a"}}
+        set_primary_path(single, "/c")
+        self.assertEqual(primary_path(single), "/c")
+
+
+class TestScanScheduler(unittest.TestCase):
+    def test_scans_are_staggered_and_one_at_a_time(self):
+        roots = parse_roots(MULTI_ROOT_CONFIG)
+        scheduler = ScanScheduler(roots, default_interval_minutes=60, stagger_seconds=15, now=0)
+
+        self.assertEqual(scheduler.next_due(0).path, "/data/Scans")
+        self.assertIsNone(scheduler.next_due(10))
+        self.assertEqual(scheduler.next_due(15).path, "/data/Telegram")
+        # Two roots overdue at once still come out one per call
+        self.assertEqual(scheduler.next_due(400).path, "/data/Downloads")
+        self.assertEqual(scheduler.next_due(400).path, "/data/Scans")  # 5-minute root
+        self.assertIsNone(scheduler.next_due(400))
+        # The most overdue root goes first
+        self.assertEqual(scheduler.next_due(15 + 3600).path, "/data/Scans")
+        self.assertEqual(scheduler.next_due(15 + 3600).path, "/data/Telegram")
+
+
+class TestDispatcherPriority(unittest.TestCase):
+    def test_buffer_flushes_high_priority_roots_first(self):
+        detector = MagicMock()
+        detector.is_user_busy.return_value = True
+        job_queue = MagicMock()
+        dispatcher = TaskDispatcher(detector, job_queue)
+
+        dispatcher.on_file_created("/data/Downloads/a.zip")
+        dispatcher.on_file_created("/data/Scans/scan.pdf", priority=10)
+        dispatcher.on_file_created("/data/Downloads/b.zip")
+        dispatcher.flush_pending_tasks()
+
+        queued = [c.args[0][0] for c in job_queue.put.call_args_list]
+        self.assertEqual(queued, ["/data/Scans/scan.pdf", "/data/Downloads/a.zip", "/data/Downloads/b.zip"])
+
+
+if __name__ == '__main__':
+    unittest.main()
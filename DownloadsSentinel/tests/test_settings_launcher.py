@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ui.settings_launcher import SettingsLauncher
+
+
+class FakeProcess:
+    def __init__(self, target, args, name=None, daemon=False):
+        self.target, self.args = target, args
+        self.alive = False
+        self.exitcode = None
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        self.alive = False
+        self.exitcode = 0
+
+
+class FakeContext:
+    Process = FakeProcess
+
+
+class TestSettingsLauncher(unittest.TestCase):
+    def test_window_runs_in_a_child_and_master_reloads_after(self):
+        on_closed = MagicMock()
+        launcher = SettingsLauncher("/tmp/config.json", on_closed, context=FakeContext)
+        self.assertTrue(launcher.open(wait=True))
+        self.assertEqual(launcher.process.args, ("/tmp/config.json",))
+        on_closed.assert_called_once_with()
+
+    def test_only_one_window_at_a_time(self):
+        launcher = SettingsLauncher("/tmp/config.json", context=FakeContext)
+        launcher.process = FakeProcess(None, ())
+        launcher.process.start()
+        self.assertFalse(launcher.open())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.watch_backends import (AutoBackend, PollingBackend, WatchBackend, create_backend,
+                                 diff_snapshots, snapshot)
+
+
+def touch(path, mtime=None):
+    with open(path, "w") as f:
+        f.write("x")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestSnapshotDiff(unittest.TestCase):
+    def test_created_and_renamed(self):
+        old = {"a.zip.crdownload": (7, 10, 1), "keep.txt": (8, 1, 1)}
+        new = {"a.zip": (7, 10, 1), "keep.txt": (8, 1, 1), "b.pdf": (9, 5, 2)}
+        self.assertEqual(diff_snapshots(old, new),
+                         [("moved", "a.zip.crdownload", "a.zip"), ("created", "b.pdf")])
+        self.assertEqual(diff_snapshots(new, new), [])
+
+    def test_rename_matched_without_inodes(self):
+        old = {"a.part": (0, 10, 5)}
+        new = {"a": (0, 10, 5)}
+        self.assertEqual(diff_snapshots(old, new), [("moved", "a.part", "a")])
+
+
+class TestPollingBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.handler = MagicMock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _events(self):
+        return [(type(c.args[0]).__name__, os.path.basename(c.args[0].src_path),
+                 os.path.basename(getattr(c.args[0], "dest_path", "") or ""))
+                for c in self.handler.dispatch.call_args_list]
+
+    def test_poll_dispatches_and_adapts_interval(self):
+        touch(os.path.join(self.tmp.name, "old.txt"))
+        os.mkdir(os.path.join(self.tmp.name, "Documents"))
+        backend = PollingBackend(self.tmp.name, self.handler, min_interval=1, max_interval=4, backoff=2)
+        self.assertEqual(backend.poll(), 0)  # Baseline
+        self.assertEqual(backend.interval, 2)
+
+        touch(os.path.join(self.tmp.name, "new.pdf.part"))
+        backend.poll()
+        os.rename(os.path.join(self.tmp.name, "new.pdf.part"), os.path.join(self.tmp.name, "new.pdf"))
+        self.assertEqual(backend.poll(), 1)
+        self.assertEqual(backend.interval, 1)
+        self.assertEqual(self._events(), [("FileCreatedEvent", "new.pdf.part", ""),
+                                          ("FileMovedEvent", "new.pdf.part", "new.pdf")])
+        self.assertEqual(sorted(snapshot(self.tmp.name)), ["new.pdf", "old.txt"])
+
+        backend.poll(), backend.poll(), backend.poll()
+        self.assertEqual(backend.interval, 4)
+
+    def test_first_poll_reports_files_newer_than_since(self):
+        touch(os.path.join(self.tmp.name, "seen.txt"), mtime=time.time() - 100)
+        touch(os.path.join(self.tmp.name, "missed.txt"))
+        backend = PollingBackend(self.tmp.name, self.handler, since=time.time() - 50)
+        self.assertEqual(backend.poll(), 1)
+        self.assertEqual(self._events(), [("FileCreatedEvent", "missed.txt", "")])
+
+    def test_entries_without_file_id_are_restatted(self):
+        with open(os.path.join(self.tmp.name, "a.zip.crdownload"), "w") as f:
+            f.write("grown since first seen")
+        touch(os.path.join(self.tmp.name, "keep.txt"))
+        stale = {"a.zip.crdownload": (0, 1, 1), "keep.txt": (42, 1, 1)}
+        current = snapshot(self.tmp.name, stale)
+        # No file ID: size must be the current one, or the finished file never matches
+        self.assertEqual(current["a.zip.crdownload"][1], len("grown since first seen"))
+        self.assertEqual(current["keep.txt"], (42, 1, 1))
+
+    def test_backend_must_implement_start_and_stop(self):
+        with self.assertRaises(TypeError):
+            WatchBackend(self.tmp.name, self.handler)
+
+
+class TestAutoBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.handler = MagicMock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_healthy_native_stays(self):
+        backend = AutoBackend(self.tmp.name, self.handler, health_interval=60)
+        backend.active.start()
+        try:
+            self.assertTrue(backend.check_health())
+            self.assertEqual(backend.mode, "native")
+        finally:
+            backend.stop()
+
+    def test_switches_to_polling_when_events_stop(self):
+        backend = AutoBackend(self.tmp.name, self.handler, health_interval=60, min_interval=60)
+        backend.active.is_alive = lambda: True  # An observer that runs but hears nothing
+        try:
+            # The folder changed a while ago, yet no event arrived since the last check
+            touch(os.path.join(self.tmp.name, "missed.zip"))
+            past = time.time() - 10
+            os.utime(self.tmp.name, (past, past))
+            backend._last_check = past - 5
+            backend._tap.last_event = past - 20
+
+            self.assertFalse(backend.check_health())
+            self.assertEqual(backend.mode, "polling")
+            backend.active.poll()
+            self.assertEqual(os.path.basename(self.handler.dispatch.call_args.args[0].src_path),
+                             "missed.zip")
+        finally:
+            backend.stop()
+
+    def test_dead_observer_switches_to_polling(self):
+        backend = AutoBackend(self.tmp.name, self.handler, health_interval=60, min_interval=60)
+        try:
+            self.assertFalse(backend.check_health())  # Never started, so not alive
+            self.assertEqual(backend.mode, "polling")
+        finally:
+            backend.stop()
+
+    def wait_for(self, condition):
+        give_up = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), give_up, "timed out")
+            time.sleep(0.01)
+
+    def polling_backend(self):
+        backend = AutoBackend(self.tmp.name, self.handler, health_interval=60,
+                              reprobe_min=60, reprobe_max=240, min_interval=60)
+        self.assertFalse(backend.check_health())  # Never started: falls back to polling
+        self.wait_for(lambda: backend.active._previous is not None)  # Baseline poll done
+        backend._next_probe = 0  # Probe due now
+        self.assertFalse(backend.check_probe())
+        self.assertIsNotNone(backend._probe)
+        return backend
+
+    def age_folder(self):
+        """Settle the folder's mtime in the past, as if the change happened a while ago."""
+        past = time.time() - 10
+        os.utime(self.tmp.name, (past, past))
+
+    def test_returns_to_native_once_probe_hears_changes(self):
+        backend = self.polling_backend()
+        try:
+            touch(os.path.join(self.tmp.name, "probe_sees_this.zip"))
+            self.wait_for(lambda: backend._probe[1].events)
+            self.handler.dispatch.assert_not_called()  # The probe only listens
+            self.age_folder()
+
+            self.assertTrue(backend.check_probe())
+            self.assertEqual(backend.mode, "native")
+            self.assertEqual(backend.reprobe_interval, 60)
+            touch(os.path.join(self.tmp.name, "after_switch.pdf"))
+            self.wait_for(lambda: self.handler.dispatch.called)
+        finally:
+            backend.stop()
+
+    def test_deaf_probe_backs_off(self):
+        backend = self.polling_backend()
+        try:
+            backend._probe[0].observer.unschedule_all()  # Runs, but hears nothing
+            touch(os.path.join(self.tmp.name, "missed.zip"))
+            self.age_folder()
+
+            self.assertFalse(backend.check_probe())
+            self.assertEqual(backend.mode, "polling")
+            self.assertIsNone(backend._probe)
+            self.assertEqual(backend.reprobe_interval, 120)
+            self.assertGreater(backend._next_probe, time.time() + 100)
+        finally:
+            backend.stop()
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend("kqueue", self.tmp.name, self.handler)
+
+
+if __name__ == '__main__':
+    unittest.main()
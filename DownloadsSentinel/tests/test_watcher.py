@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.watcher import DownloadHandler
+
+
+def moved(src, dest):
+    return SimpleNamespace(is_directory=False, src_path=src, dest_path=dest)
+
+
+class TestRenameFastPath(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.final = os.path.join(self.tmp.name, "report.pdf")
+        open(self.final, "w").close()
+        self.callback = MagicMock()
+        self.handler = DownloadHandler(self.callback)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_temp_to_final_rename_skips_lock_probe(self):
+        with patch.object(self.handler, "_wait_for_file_ready") as probe:
+            self.handler.on_moved(moved(self.final + ".crdownload", self.final))
+            self.handler.on_moved(moved(self.final + ".PART", self.final))
+        probe.assert_not_called()
+        self.assertEqual(self.callback.call_count, 2)
+        stats = self.handler.fast_path_stats()
+        self.assertEqual((stats["fast"], stats["slow"], stats["fast_share"]), (2, 0, 1.0))
+
+    def test_other_events_use_lock_probe(self):
+        with patch.object(self.handler, "_wait_for_file_ready", return_value=True) as probe:
+            # Chrome's "Unconfirmed 123.crdownload" → "report.pdf.crdownload" is still in flight
+            self.handler.on_moved(moved(os.path.join(self.tmp.name, "Unconfirmed 1.crdownload"),
+                                        self.final + ".crdownload"))
+            self.handler.on_moved(moved(os.path.join(self.tmp.name, "old.pdf"), self.final))
+            self.handler.on_created(SimpleNamespace(is_directory=False, src_path=self.final))
+        self.assertEqual(probe.call_count, 2)
+        self.assertEqual(self.callback.call_count, 2)
+        self.assertEqual(self.handler.fast_path_stats()["fast"], 0)
+
+    def test_configured_patterns_and_disabled_fast_path(self):
+        handler = DownloadHandler(self.callback, {"custom": ["*.inprogress"]})
+        self.assertEqual(handler.temp_browser("a.zip.InProgress"), "custom")
+        self.assertFalse(handler.is_temp_file("a.zip.crdownload"))
+
+        handler = DownloadHandler(self.callback, fast_path=False)
+        with patch.object(handler, "_wait_for_file_ready", return_value=True) as probe:
+            handler.on_moved(moved(self.final + ".crdownload", self.final))
+        probe.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
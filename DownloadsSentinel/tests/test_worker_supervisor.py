@@ -0,0 +1,260 @@
+import unittest
+import sys
+import os
+import queue
+import signal
+import itertools
+import multiprocessing
+from unittest.mock import MagicMock
+
+# Adjust path to import src
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.metrics import MetricsAggregator, registry
+from core.sentinel_worker import SentinelWorker, warm_modules, worker_process_entry
+from core.worker_supervisor import WorkerSupervisor
+
+
+class FakeProcess:
+    pids = itertools.count(1000)
+
+    def __init__(self, target, args, daemon=False):
+        self.target, self.args = target, args
+        self.pid = None
+        self.alive = False
+        self.exitcode = None
+
+    def start(self):
+        self.pid = next(self.pids)
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def exit(self, code=0):
+        self.alive, self.exitcode = False, code
+
+    def kill(self):
+        self.exit(-9)
+
+    def join(self, timeout=None):
+        pass
+
+
+class FakeContext:
+    Queue = queue.Queue
+    Process = FakeProcess
+    RawArray = staticmethod(multiprocessing.RawArray)
+
+
+def on_demand(**worker):
+    return {"worker": dict({"lifecycle": "on_demand", "idle_exit_seconds": 300}, **worker)}
+
+
+class TestWorkerSupervisor(unittest.TestCase):
+    def make(self, config):
+        return WorkerSupervisor(config, {}, queue.Queue(), context=FakeContext)
+
+    def test_persistent_spawns_at_start_and_respawns_dead_worker(self):
+        supervisor = self.make({})
+        supervisor.start()
+        first = supervisor.process
+        self.assertTrue(first.is_alive())
+
+        first.alive = False  # Crashed
+        supervisor.put(("a.pdf", 0))
+        self.assertIsNot(supervisor.process, first)
+        self.assertEqual(supervisor.job_queue.get_nowait(), ("a.pdf", 0))
+
+    def test_on_demand_spawns_on_first_task_only(self):
+        supervisor = self.make(on_demand())
+        supervisor.start()
+        self.assertIsNone(supervisor.process)
+        supervisor.put(("a.pdf", 0))
+        supervisor.put(("b.pdf", 0))
+        worker = supervisor.process
+        self.assertTrue(worker.is_alive())
+        self.assertEqual(supervisor.job_queue.qsize(), 2)
+
+        supervisor.handle_message("ready", worker.pid, supervisor._spawned_at[worker.pid] + 0.2)
+        self.assertNotIn(worker.pid, supervisor._spawned_at)
+
+    def test_idle_handshake(self):
+        supervisor = self.make(on_demand())
+        supervisor.put(("a.pdf", 0))
+        worker, control = supervisor.process, supervisor.control_queue
+
+        # Something was queued recently: the idle report is stale, keep the worker
+        supervisor.handle_message("idle", worker.pid, 300)
+        self.assertIs(supervisor.process, worker)
+
+        supervisor._last_put -= 301
+        supervisor.handle_message("idle", worker.pid, 300)
+        self.assertIsNone(supervisor.process)
+        self.assertEqual(control.get_nowait(), ("exit", None))
+
+        # A job after retiring spawns a fresh worker
+        supervisor.put(("b.pdf", 0))
+        self.assertIsNot(supervisor.process, worker)
+
+    def test_prewarmed_spare_becomes_the_worker(self):
+        config = dict(on_demand(prewarm_spare=True), privacy={"mode": "LOCAL"}, ai={"enabled": True})
+        supervisor = self.make(config)
+        supervisor.start()
+        spare, activation, _ = supervisor._spare
+        self.assertIn("ai.local_client", spare.args[5])
+
+        supervisor.put(("a.pdf", 0))
+        self.assertIs(supervisor.process, spare)
+        self.assertEqual(activation.get_nowait(), (config, {}))
+        self.assertIsNone(supervisor._spare)
+
+        # After the worker retires and exits, a new spare is prewarmed
+        supervisor._last_put -= 301
+        supervisor.handle_message("idle", spare.pid, 300)
+        spare.alive = False
+        supervisor.handle_message("exited", spare.pid, None)
+        self.assertIsNotNone(supervisor._spare)
+        self.assertEqual(supervisor._retiring, [])
+
+    def test_drain_asks_worker_and_spare_to_finish(self):
+        supervisor = self.make(on_demand(prewarm_spare=True))
+        supervisor.start()
+        spare, activation, _ = supervisor._spare
+        supervisor.drain(timeout=0)
+        self.assertIsNone(activation.get_nowait())  # Told to quit without activating
+        self.assertFalse(spare.is_alive())
+
+        # Jobs queued but no worker yet (on_demand): one is started to drain them
+        supervisor = self.make(on_demand())
+        supervisor.job_queue.put(("a.pdf", 0))
+        self.assertFalse(supervisor.drain(timeout=0))  # The fake worker never exits by itself
+        self.assertIsNone(supervisor.process)
+
+    def test_drain_terminates_worker_that_overruns(self):
+        supervisor = self.make({})
+        supervisor.start()
+        worker, control = supervisor.process, supervisor.control_queue
+        self.assertFalse(supervisor.drain(timeout=0))
+        self.assertEqual(control.get_nowait(), ("drain", None))
+        self.assertFalse(worker.is_alive())
+
+    def test_drain_is_clean_only_after_worker_reports_exit(self):
+        supervisor = self.make({})
+        supervisor.start()
+        supervisor.process.exit(0)
+        supervisor.handle_message("exited", supervisor.process.pid, None)
+        self.assertTrue(supervisor.drain(timeout=0))
+
+        # Exit code 0 but no "exited": killed before the drain finished
+        supervisor = self.make({})
+        supervisor.EXITED_GRACE = 0
+        supervisor.start()
+        supervisor.process.exit(0)
+        self.assertFalse(supervisor.drain(timeout=0))
+
+        supervisor = self.make({})
+        supervisor.start()
+        supervisor.process.exit(1)
+        supervisor.handle_message("exited", supervisor.process.pid, None)
+        self.assertFalse(supervisor.drain(timeout=0))
+
+    def test_profiling_toggle_replayed_to_new_workers(self):
+        supervisor = self.make(on_demand())
+        supervisor.send_control("profiling", True)
+        supervisor.put(("a.pdf", 0))
+        self.assertTrue(supervisor.process.args[1]["profiling"]["enabled"])
+
+
+class TestWorkerIdleExit(unittest.TestCase):
+    def test_reports_idle_once_and_exits_on_command(self):
+        result_queue, control_queue = queue.Queue(), queue.Queue()
+        worker = SentinelWorker(MagicMock(), on_demand(idle_exit_seconds=1), {},
+                                result_queue=result_queue, control_queue=control_queue)
+        worker._check_idle_exit()
+        self.assertTrue(result_queue.empty())
+
+        worker.last_job_time -= 2
+        worker._check_idle_exit()
+        worker._check_idle_exit()
+        self.assertEqual(result_queue.qsize(), 1)
+        self.assertEqual(result_queue.get_nowait()[0], "idle")
+
+        worker.is_running = True
+        control_queue.put(("exit", None))
+        worker._poll_control()
+        self.assertFalse(worker.is_running)
+
+    def test_drain_exits_once_queue_is_empty(self):
+        job_queue, control_queue = queue.Queue(), queue.Queue()
+        worker = SentinelWorker(job_queue, {}, {}, result_queue=queue.Queue(), control_queue=control_queue)
+        worker.handle_task = MagicMock()
+        worker.perform_cleanup = MagicMock()
+        worker._setup_logging = MagicMock()
+        worker.logger = MagicMock()
+        job_queue.put(("a.pdf", 0))
+        control_queue.put(("drain", None))
+        worker.run_worker_loop()  # Returns instead of waiting for more work
+        worker.handle_task.assert_called_once_with("a.pdf", 0)
+
+    def test_persistent_never_reports_idle(self):
+        result_queue = queue.Queue()
+        worker = SentinelWorker(MagicMock(), {}, {}, result_queue=result_queue)
+        worker.last_job_time -= 10**6
+        worker._check_idle_exit()
+        self.assertTrue(result_queue.empty())
+        self.assertEqual(warm_modules({"ai": {"learned_enabled": False}}), ["ai.workflow_engine"])
+
+
+
+@unittest.skipUnless(hasattr(os, "killpg"), "needs POSIX fork and process groups")
+class TestForkedWorker(unittest.TestCase):
+    def setUp(self):
+        # Fork, as the supervisor's default context does on Linux
+        context = multiprocessing.get_context("fork")
+        self.result_queue, self.control_queue = context.Queue(), context.Queue()
+        self.process = context.Process(target=worker_process_entry,
+                                       args=(context.Queue(), {}, {}, self.result_queue,
+                                             self.control_queue, context.Queue()),
+                                       daemon=True)
+
+    def tearDown(self):
+        if self.process.is_alive():
+            self.process.kill()
+
+    def drain(self) -> list:
+        """Ask the worker to drain; returns its messages up to "exited"."""
+        self.control_queue.put(("drain", None))
+        messages = []
+        while not messages or messages[-1][0] != "exited":
+            messages.append(self.result_queue.get(timeout=10))
+        self.process.join(timeout=10)
+        self.assertEqual(self.process.exitcode, 0)
+        return messages
+
+    def test_worker_survives_group_signals_and_drains(self):
+        self.process.start()
+        # Own process group, so killpg reaches the worker as systemd's
+        # KillMode=control-group or a terminal's Ctrl-C would, but not this test
+        os.setpgid(self.process.pid, self.process.pid)
+        self.assertEqual(self.result_queue.get(timeout=10)[0], "ready")
+
+        os.killpg(self.process.pid, signal.SIGTERM)
+        os.killpg(self.process.pid, signal.SIGINT)
+        self.process.join(timeout=0.5)
+        self.assertTrue(self.process.is_alive())
+        self.drain()
+
+    def test_forked_worker_does_not_report_master_metrics(self):
+        registry.counter("sentinel_test_master_total").inc(300)
+        aggregator = MetricsAggregator()
+        self.process.start()
+        for kind, pid, payload in self.drain():
+            if kind == "metrics":
+                aggregator.update(str(pid), payload)
+
+        totals = {name: value for name, _, value in aggregator.combined()["counters"]}
+        self.assertEqual(totals["sentinel_test_master_total"], registry.counter("sentinel_test_master_total").value)
+
+if __name__ == '__main__':
+    unittest.main()
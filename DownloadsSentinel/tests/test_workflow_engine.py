@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import tempfile
+import threading
 from unittest.mock import MagicMock
 
 # Mock dependencies before import
@@ -12,6 +14,8 @@ sys.modules['requests'] = MagicMock()
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from ai.workflow_engine import WorkflowEngine
+from ai.resilience import AIUnavailableError
+from ai.deadline import DeadlineExceeded
 
 # Mock config
 MOCK_CONFIG = {
@@ -20,9 +24,11 @@ MOCK_CONFIG = {
         "sensitive_keywords": ["tax", "bank"]
     },
     "ai": {
+        "enabled": True,  # Tier 3 is skipped when AI is off; test_tier3_local_fallback needs it
         "local_url": "foo",
         "text_model": "test-model",
-        "vision_model": "test-vision"
+        "vision_model": "test-vision",
+        "learned_enabled": False
     }
 }
 MOCK_SECRETS = {}
@@ -52,5 +58,124 @@ class TestWorkflowEngine(unittest.TestCase):
         # Mode is LOCAL in MOCK_CONFIG
         self.assertEqual(engine.route_to_engine("unknown_file.xyz")[0], "Documents")
 
+    def test_tier3_cloud_unavailable_defers(self):
+        config = dict(MOCK_CONFIG, privacy={"mode": "CLOUD", "sensitive_keywords": []})
+        engine = WorkflowEngine(config, MOCK_SECRETS)
+
+        mock_client = MagicMock()
+        mock_client.can_analyze_content.return_value = True
+        mock_client.classify_with_content.side_effect = AIUnavailableError("circuit open")
+        engine._gemini_client = mock_client
+
+        # Outage must not turn into a misfiled "Other"
+        self.assertEqual(engine.route_to_engine("unknown_file.xyz"), (None, "Tier3_Cloud_Deferred"))
+
+    def test_tier3_deadline_uses_sniffed_type(self):
+        engine = WorkflowEngine(MOCK_CONFIG, MOCK_SECRETS)
+        mock_client = MagicMock()
+        mock_client.classify.side_effect = DeadlineExceeded()
+        engine._local_client = mock_client
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "download")
+            with open(path, "wb") as f:
+                f.write(b"%PDF-1.7 ...")
+            self.assertEqual(engine.route_to_engine(path), ("Documents", "Deadline_Sniffed"))
+
+        self.assertEqual(engine.route_to_engine("unknown_file.xyz"), ("Other", "Deadline_Fallback"))
+
+    def test_tier2_learns_from_tier3(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ai_config = dict(MOCK_CONFIG["ai"], learned_enabled=True, learned_min_samples=4,
+                             learned_save_every=4,
+                             learned_model_path=os.path.join(tmp, "model.npz"))
+            engine = WorkflowEngine(dict(MOCK_CONFIG, ai=ai_config), MOCK_SECRETS)
+            if engine.learned_model is None:
+                self.skipTest("numpy not installed")
+            mock_client = MagicMock()
+            mock_client.classify.side_effect = lambda name, deadline=None: (
+                "Images" if name.startswith("Screenshot") else "Code")
+            engine._local_client = mock_client
+
+            for name in ["Screenshot 2026-01-02 at 10.11.12", "Screenshot 2026-03-04 at 09.08.07",
+                         "build_script_1", "build_script_2"]:
+                self.assertEqual(engine.route_to_engine(name)[1], "Tier3_Local")
+
+            self.assertEqual(engine.route_to_engine("Screenshot 2026-10-19 at 21.22.23"),
+                             ("Images", "Tier2_Learned"))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "model.npz")))
+
+    def test_tier3_cascade_escalates_low_confidence(self):
+        config = dict(MOCK_CONFIG, privacy={"mode": "CASCADE", "sensitive_keywords": []})
+        engine = WorkflowEngine(config, MOCK_SECRETS)
+
+        local = MagicMock()
+        local.classify_with_confidence.side_effect = lambda name, deadline=None: (
+            ("Code", 0.95) if name == "main.xyz" else ("Other", 0.2))
+        cloud = MagicMock()
+        cloud.can_analyze_content.return_value = True
+        cloud.classify_with_content.return_value = "Documents"
+        engine._local_client = local
+        engine._gemini_client = cloud
+
+        self.assertEqual(engine.route_to_engine("main.xyz"), ("Code", "Tier3_Local"))
+        self.assertEqual(engine.route_to_engine("scan_0001.xyz"),
+                         ("Documents", "Tier3_Cloud_Content_Escalated"))
+        cloud.classify_with_content.assert_called_once()
+
+        # Outage keeps the local answer
+        cloud.classify_with_content.side_effect = AIUnavailableError("circuit open")
+        self.assertEqual(engine.route_to_engine("scan_0002.xyz"), ("Other", "Tier3_Local"))
+
+        self.assertEqual(engine.tier_metrics(),
+                         {"Tier3_Local": 2, "Tier3_Cloud_Content_Escalated": 1})
+
+    def test_background_reclassify_is_pending_work(self):
+        engine = WorkflowEngine(MOCK_CONFIG, MOCK_SECRETS)
+        release = threading.Event()
+        mock_client = MagicMock()
+        mock_client.classify.side_effect = lambda name, deadline=None: release.wait(5) and "Documents"
+        engine._local_client = mock_client
+
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "Other"))
+            open(os.path.join(tmp, "Other", "unknown_file.xyz"), "w").close()
+            self.assertFalse(engine.has_pending_work())
+            engine._schedule_reclassify(os.path.join(tmp, "unknown_file.xyz"), "Other")
+            self.assertTrue(engine.has_pending_work())
+
+            release.set()
+            engine._reclassify_queue.join()
+            self.assertFalse(engine.has_pending_work())
+            self.assertTrue(os.path.exists(os.path.join(tmp, "Documents", "unknown_file.xyz")))
+
+    def test_root_rules_come_before_tier1(self):
+        general = {"downloads_path": ["/data/Downloads",
+                                      {"path": "/data/Scans", "rules": {"*.pdf": "Scans"}}]}
+        engine = WorkflowEngine(dict(MOCK_CONFIG, general=general), MOCK_SECRETS)
+        self.assertEqual(engine.route_to_engine("/data/Scans/page.pdf"), ("Scans", "Tier1_RootRules"))
+        self.assertEqual(engine.route_to_engine("/data/Downloads/page.pdf"), ("Documents", "Tier1_Rules"))
+        # Privacy still wins
+        self.assertEqual(engine.route_to_engine("/data/Scans/tax.pdf"), ("Secure_Vault", "Tier0_Privacy"))
+
+    def test_apply_config_rebuilds_only_changed_components(self):
+        engine = WorkflowEngine(MOCK_CONFIG, MOCK_SECRETS)
+        local = MagicMock()
+        engine._local_client = local
+        self.assertEqual(engine.route_to_engine("salary.pdf"), ("Documents", "Tier1_Rules"))
+
+        privacy = dict(MOCK_CONFIG["privacy"], sensitive_keywords=["salary"], mode="CASCADE")
+        rebuilt = engine.apply_config(dict(MOCK_CONFIG, privacy=privacy),
+                                      ["privacy.mode", "privacy.sensitive_keywords"])
+        self.assertEqual(rebuilt, ["privacy_filter"])
+        self.assertEqual(engine.ai_mode, "CASCADE")
+        self.assertIs(engine._local_client, local)  # loaded models survive
+        self.assertEqual(engine.route_to_engine("salary.pdf"), ("Secure_Vault", "Tier0_Privacy"))
+
+        ai_config = dict(MOCK_CONFIG["ai"], text_model="other-model")
+        rebuilt = engine.apply_config(dict(MOCK_CONFIG, ai=ai_config), ["ai.text_model"])
+        self.assertEqual(rebuilt, ["local_client"])
+        self.assertIsNone(engine._local_client)
+
 if __name__ == '__main__':
     unittest.main()